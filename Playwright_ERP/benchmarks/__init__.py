@@ -0,0 +1,5 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 基准测试（不在默认 testpaths 中，通过 python -m Playwright_ERP.benchmarks.<模块> 运行）
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 基准测量插件：记录页面 fixture 的建立/销毁耗时、各阶段耗时与进程树内存，写入 ERP_BENCH_OUTPUT
+
+import json
+import os
+import time
+from typing import Dict, List
+
+import pytest
+
+from Playwright_ERP.benchmarks.fixture_scopes import BENCH_SCOPE, SCOPE_FIXTURES, process_tree_rss
+
+
+class FixtureScopeBenchmark:
+    """
+    - 页面 fixture：pytest_fixture_setup 计时建立；在其 yield 之后的清理前挂一个标记，post_finalizer 时计时销毁
+    - 用例：setup / call / teardown 各阶段耗时；每个用例结束后采样一次进程树（含浏览器）内存
+    """
+
+    def __init__(self, output: str, fixture: str):
+        self.output = output
+        self.fixture = fixture
+        self.setup_ms: List[float] = []
+        self.teardown_ms: List[float] = []
+        self.phases: Dict[str, Dict[str, float]] = {}
+        self.rss: List[int] = []
+        self._teardown_started = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_fixture_setup(self, fixturedef, request):
+        if fixturedef.argname != self.fixture:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        self.setup_ms.append((time.perf_counter() - start) * 1000)
+        # 清理函数按注册的逆序执行：此标记晚于 fixture 自身的清理注册，因此最先执行
+        fixturedef.addfinalizer(self._mark_teardown)
+
+    def _mark_teardown(self):
+        self._teardown_started = time.perf_counter()
+
+    def pytest_fixture_post_finalizer(self, fixturedef, request):
+        if fixturedef.argname == self.fixture and self._teardown_started is not None:
+            self.teardown_ms.append((time.perf_counter() - self._teardown_started) * 1000)
+            self._teardown_started = None
+
+    def pytest_runtest_logreport(self, report):
+        self.phases.setdefault(report.nodeid, {})[report.when] = report.duration * 1000
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        rss = process_tree_rss()
+        if rss is not None:
+            self.rss.append(rss)
+
+    def pytest_sessionfinish(self, session):
+        tests = [phases for phases in self.phases.values() if "call" in phases]
+        # 单用例开销：setup + teardown 阶段耗时，去掉首个用例的 setup（浏览器启动、登录）与末个用例的 teardown（会话清理）
+        overhead = [p.get("setup", 0) for p in tests[1:]] + [p.get("teardown", 0) for p in tests[:-1]]
+        result = {
+            "scope": BENCH_SCOPE,
+            "fixture": self.fixture,
+            "tests": len(tests),
+            "fixture_setups": len(self.setup_ms),
+            "fixture_setup_ms": round(sum(self.setup_ms), 1),
+            "fixture_teardown_ms": round(sum(self.teardown_ms), 1),
+            "per_test_overhead_ms": round(sum(overhead) / max(len(tests) - 1, 1), 1) if tests else None,
+            "call_ms": round(sum(p["call"] for p in tests) / len(tests), 1) if tests else None,
+            "rss_growth_mb": round((self.rss[-1] - self.rss[0]) / 1024 / 1024, 1) if self.rss else None,
+            "rss_peak_mb": round(max(self.rss) / 1024 / 1024, 1) if self.rss else None,
+        }
+        with open(self.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+
+
+def pytest_configure(config):
+    output = os.getenv("ERP_BENCH_OUTPUT")
+    if output:
+        config.pluginmanager.register(FixtureScopeBenchmark(output, SCOPE_FIXTURES[BENCH_SCOPE]), "erp_fixture_bench")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 页面 fixture 作用域基准：对每种作用域在本地替身服务上跑同一组用例，对比建页/销毁耗时、单用例开销与内存增长
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional
+
+from Playwright_ERP.stub_erp import StubErpServer
+from Playwright_ERP.utils.settings import TEST_LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+# 作用域 -> conftest 中对应的页面 fixture；function-nopool 为关闭页面预热池的 function 作用域
+SCOPE_FIXTURES: Dict[str, str] = {
+    "function": "logged_in_page",
+    "function-nopool": "logged_in_page",
+    "class": "logged_in_page_class",
+    "module": "logged_in_page_module",
+    "session": "logged_in_page_session",
+}
+
+# 基准用例的作用域与规模（由 run_scope 通过环境变量传给 pytest 子进程）
+BENCH_SCOPE = os.getenv("ERP_BENCH_SCOPE", "session")
+BENCH_CLASSES = int(os.getenv("ERP_BENCH_CLASSES", "4"))
+BENCH_TESTS_PER_CLASS = int(os.getenv("ERP_BENCH_TESTS_PER_CLASS", "5"))
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPORT_DIR = os.path.join(TEST_LOG_DIR, "benchmarks")
+BASELINE_FILE = os.path.join(REPORT_DIR, "fixture_scopes_baseline.json")
+# 单用例开销超过基线的比例与绝对值都达到阈值才判定为退化
+REGRESSION_TOLERANCE = 0.2
+REGRESSION_MIN_DELTA_MS = 5.0
+
+
+def process_tree_rss(pid: Optional[int] = None) -> Optional[int]:
+    """进程及其全部子孙进程（浏览器等）的常驻内存字节数；非 Linux（无 /proc）时返回 None"""
+    pid = pid or os.getpid()
+    if not os.path.isdir("/proc"):
+        return None
+    children: Dict[int, List[int]] = {}
+    rss_pages: Dict[int, int] = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # comm 字段可能含空格，从最后一个 ')' 之后解析
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        children.setdefault(int(fields[1]), []).append(int(entry))
+        rss_pages[int(entry)] = int(fields[21])
+    total, stack = 0, [pid]
+    while stack:
+        current = stack.pop()
+        total += rss_pages.get(current, 0)
+        stack.extend(children.get(current, []))
+    return total * os.sysconf("SC_PAGE_SIZE")
+
+
+def run_scope(scope: str, base_url: str, output: str, classes: int, tests_per_class: int) -> dict:
+    """在 pytest 子进程中跑一遍指定作用域的基准用例，返回插件写出的测量结果"""
+    env = {
+        **os.environ,
+        "ERP_BASE_URL": base_url,
+        "ERP_API_BASE_URL": base_url,
+        "ERP_PROFILE": "perf",
+        "ERP_AUTH_CACHE": "off",
+        "ERP_BENCH_SCOPE": scope,
+        "ERP_BENCH_OUTPUT": output,
+        "ERP_BENCH_CLASSES": str(classes),
+        "ERP_BENCH_TESTS_PER_CLASS": str(tests_per_class),
+    }
+    if scope == "function-nopool":
+        env["ERP_PAGE_POOL_SIZE"] = "0"
+    command = [sys.executable, "-m", "pytest", os.path.join("benchmarks", "test_fixture_scopes.py"),
+               "-q", "-p", "no:cacheprovider"]
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if completed.returncode != 0 or not os.path.exists(output):
+        raise RuntimeError(f"作用域 {scope} 的基准运行失败（退出码 {completed.returncode}）:\n{completed.stdout[-3000:]}")
+    with open(output, encoding="utf-8") as f:
+        result = json.load(f)
+    result["wall_s"] = round(wall, 2)
+    return result
+
+
+def summarize(rounds: List[dict]) -> dict:
+    """多轮结果取中位数"""
+    keys = ("wall_s", "per_test_overhead_ms", "call_ms", "fixture_setup_ms", "fixture_teardown_ms",
+            "fixture_setups", "rss_growth_mb", "rss_peak_mb")
+    summary = {}
+    for key in keys:
+        values = [r[key] for r in rounds if r.get(key) is not None]
+        summary[key] = round(statistics.median(values), 2) if values else None
+    summary["tests"] = rounds[0]["tests"]
+    summary["rounds"] = len(rounds)
+    return summary
+
+
+def _fmt(value, spec: str = ".1f") -> str:
+    return "n/a" if value is None else format(value, spec)
+
+
+def render_report(results: Dict[str, dict], baseline: Dict[str, dict]) -> List[str]:
+    """Markdown 对比表（相对 function 作用域），并标出相对基线的退化"""
+    reference = results.get("function", {}).get("per_test_overhead_ms")
+    lines = [
+        "| scope | tests | fixture setups | setup ms (total) | teardown ms (total) | per-test overhead ms | "
+        "vs function | call ms | rss growth MB | rss peak MB | wall s | vs baseline |",
+        "|---|---|---|---|---|---|---|---|---|---|---|---|",
+    ]
+    for scope, data in results.items():
+        overhead = data["per_test_overhead_ms"]
+        relative = f"{overhead / reference:.2f}x" if reference and overhead is not None else "n/a"
+        previous = baseline.get(scope, {}).get("per_test_overhead_ms")
+        if previous is None or overhead is None:
+            verdict = "new"
+        else:
+            delta = overhead - previous
+            regressed = delta >= REGRESSION_MIN_DELTA_MS and delta > previous * REGRESSION_TOLERANCE
+            verdict = f"{delta:+.1f} ms{' REGRESSION' if regressed else ''}"
+        lines.append(
+            f"| {scope} | {data['tests']} | {_fmt(data['fixture_setups'], '.0f')} | {_fmt(data['fixture_setup_ms'])} | "
+            f"{_fmt(data['fixture_teardown_ms'])} | {_fmt(overhead)} | {relative} | {_fmt(data['call_ms'])} | "
+            f"{_fmt(data['rss_growth_mb'])} | {_fmt(data['rss_peak_mb'])} | {_fmt(data['wall_s'], '.2f')} | {verdict} |"
+        )
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行用法（在 Playwright_ERP 的上级目录执行）：
+      python -m Playwright_ERP.benchmarks.fixture_scopes --rounds 3
+      python -m Playwright_ERP.benchmarks.fixture_scopes --scopes function session --update-baseline
+    """
+    parser = argparse.ArgumentParser(prog="fixture_scopes", description="页面 fixture 作用域基准")
+    parser.add_argument("--scopes", nargs="+", choices=list(SCOPE_FIXTURES), default=list(SCOPE_FIXTURES))
+    parser.add_argument("--rounds", type=int, default=3, help="每个作用域运行的轮数（结果取中位数）")
+    parser.add_argument("--classes", type=int, default=BENCH_CLASSES, help="测试类数量")
+    parser.add_argument("--tests-per-class", type=int, default=BENCH_TESTS_PER_CLASS)
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    report_dir = os.path.join(PROJECT_DIR, REPORT_DIR)
+    os.makedirs(report_dir, exist_ok=True)
+    rounds: Dict[str, List[dict]] = {scope: [] for scope in args.scopes}
+    with StubErpServer() as server:
+        # 各作用域交替运行，减小机器负载漂移对对比的影响
+        for index in range(args.rounds):
+            for scope in args.scopes:
+                output = os.path.join(report_dir, f"raw_{scope}_{index}.json")
+                logger.info(f"⏱️ 第 {index + 1}/{args.rounds} 轮: {scope}")
+                rounds[scope].append(run_scope(scope, server.base_url, output, args.classes, args.tests_per_class))
+                os.remove(output)
+
+    results = {scope: summarize(data) for scope, data in rounds.items()}
+    baseline_path = os.path.join(PROJECT_DIR, BASELINE_FILE)
+    try:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        baseline = {}
+
+    lines = render_report(results, baseline)
+    with open(os.path.join(report_dir, "fixture_scopes.json"), "w", encoding="utf-8") as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(report_dir, "fixture_scopes.md"), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    print("\n".join(lines))
+
+    if args.update_baseline or not baseline:
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        logger.info(f"📌 基线已{'更新' if baseline else '创建'}: {baseline_path}")
+    return 1 if any("REGRESSION" in line for line in lines) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: fixture 作用域基准用例：每个用例打开角色列表页并等待表格渲染，页面 fixture 由 ERP_BENCH_SCOPE 决定
+
+import pytest
+from playwright.sync_api import Page
+
+from Playwright_ERP.benchmarks.fixture_scopes import BENCH_CLASSES, BENCH_SCOPE, BENCH_TESTS_PER_CLASS, SCOPE_FIXTURES
+from Playwright_ERP.utils.settings import url
+from Playwright_ERP.utils.step_timing import expect
+from Playwright_ERP.utils.waits import wait_for_api
+
+
+@pytest.fixture
+def bench_page(request) -> Page:
+    """按基准作用域取页面（class / module / session 作用域的页面照常在各自作用域结束时销毁）"""
+    return request.getfixturevalue(SCOPE_FIXTURES[BENCH_SCOPE])
+
+
+class _ScopeGroup:
+    @pytest.mark.parametrize("n", range(BENCH_TESTS_PER_CLASS))
+    def test_open_role_list(self, bench_page: Page, n):
+        with wait_for_api(bench_page, "role.list"):
+            bench_page.goto(url("/role"))
+        expect(bench_page.locator(".ant-table-row").first).to_be_visible()
+
+
+# 多个测试类，使 class 作用域的建页/销毁成本在结果中可见
+for _index in range(1, BENCH_CLASSES + 1):
+    globals()[f"TestScopeGroup{_index}"] = type(f"TestScopeGroup{_index}", (_ScopeGroup,), {})
@@ -11,114 +11,384 @@ from datetime import datetime
 from playwright.sync_api import Page, expect
 import allure
 
-# 全局日志配置
+from Playwright_ERP.utils.settings import (
+    AUTH_CACHE_ENABLED,
+    BLOCK_RESOURCES,
+    HOME_READY_SELECTOR,
+    PAGE_POOL_SIZE,
+    SCREENSHOT_MODE,
+    STUB_ENABLED,
+    STUB_PORT,
+    TRACE_LEVEL,
+    VIDEO_MODE,
+    VIDEO_PRESET,
+    VITALS_MODE,
+    load_accounts,
+    url,
+)
+from Playwright_ERP.utils.log_setup import LogContextPlugin, setup_logging
+from Playwright_ERP.utils.page_pool import PagePool
+from Playwright_ERP.utils.reporting import StatsReportPlugin, item_failed
+from Playwright_ERP.utils.api_client import EntityFactory, ErpApiClient
+from Playwright_ERP.utils.bulk_seed import BulkSeeder
+from Playwright_ERP.utils.asset_cache import flush_asset_cache, install_asset_cache
+from Playwright_ERP.utils.resource_policy import ResourcePolicy
+from Playwright_ERP.utils.screenshots import CAPTURE_MODES, flush_screenshots, screenshot_service
+from Playwright_ERP.utils.video import VIDEO_MODES, VIDEO_PRESETS, flush_videos
+from Playwright_ERP.utils.tracing import TRACE_LEVELS, flush_traces, trace_recorder
+from Playwright_ERP.utils.step_timing import flush_step_timings
+from Playwright_ERP.utils.api_latency import api_latency_observer, flush_api_latency
+from Playwright_ERP.utils.web_vitals import VITALS_MODES, flush_web_vitals, web_vitals_monitor
+from Playwright_ERP.utils.selector_cache import flush_selector_cache, save_selector_ranking
+from Playwright_ERP.utils.auth_cache import AuthStateCache, extract_token
+from Playwright_ERP.utils.profiles import PROFILES, activate_profile, active_profile, resolve_profile_name
+from Playwright_ERP.utils.parallel import ParallelRunStats, is_xdist_worker, pick_account, worker_id
+from Playwright_ERP.stub_erp import StubErpServer
+
+# 全局日志配置：每个进程初始化一次，日志只在测试线程入队，由后台线程写文件/控制台/JSON Lines（见 utils/log_setup.py）
 test_logdir = "test_log"
 os.makedirs(test_logdir, exist_ok=True)
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(test_logdir, 'test_global.log'), encoding='utf-8'),
-        logging.StreamHandler()
-    ]
-)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 新增：全局缓存登录后的 token（供 API 用例复用）
 AUTH_TOKEN = None
 
+# 已登录上下文的资源屏蔽策略（ERP_BLOCK_RESOURCES=off 关闭）
+RESOURCE_POLICY = ResourcePolicy() if BLOCK_RESOURCES else None
+
+# 本地替身 ERP 服务（ERP_STUB=on 时由主进程启动，xdist worker 通过同一端口访问）
+STUB_SERVER = None
+
+
+# ================= 并行执行（pytest-xdist）统计 =================
+# 用法：pytest -n 4 --dist loadscope
+# - 每个 worker 是独立进程，session 级 fixture 在每个 worker 内各执行一次，
+#   因此每个 worker 拥有自己的浏览器和登录上下文
+# - 主进程汇总各 worker 的用例耗时，结束时输出 1 -> N worker 的加速比
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--profile",
+        action="store",
+        default=None,
+        choices=sorted(PROFILES),
+        help="运行配置档：debug（有头慢放，默认）/ ci（无头，保留 trace）/ perf（无头，关闭所有诊断），"
+             "也可通过环境变量 ERP_PROFILE 指定",
+    )
+
+
+def pytest_sessionfinish(session):
+    """
+    会话结束：等待后台截图落盘、录屏清理完成，上报各项统计（在 StatsReportPlugin 把统计发回主进程之前执行）；
+    主进程此时已收齐各 worker 的统计，写回选择器排名
+    """
+    flush_screenshots()
+    flush_videos()
+    flush_traces()
+    flush_step_timings()
+    flush_api_latency()
+    flush_web_vitals()
+    flush_selector_cache()
+    if not is_xdist_worker(session.config):
+        save_selector_ranking()
+    if RESOURCE_POLICY:
+        RESOURCE_POLICY.flush()
+    flush_asset_cache()
+
+
+def pytest_configure(config):
+    try:
+        profile = activate_profile(resolve_profile_name(config.getoption("--profile")))
+    except ValueError as e:
+        raise pytest.UsageError(str(e))
+    if SCREENSHOT_MODE and SCREENSHOT_MODE not in CAPTURE_MODES:
+        raise pytest.UsageError(f"未知的截图策略 ERP_SCREENSHOT_MODE='{SCREENSHOT_MODE}'，可选: {', '.join(CAPTURE_MODES)}")
+    if VIDEO_MODE and VIDEO_MODE not in VIDEO_MODES:
+        raise pytest.UsageError(f"未知的录屏策略 ERP_VIDEO_MODE='{VIDEO_MODE}'，可选: {', '.join(VIDEO_MODES)}")
+    if VIDEO_PRESET not in VIDEO_PRESETS:
+        raise pytest.UsageError(f"未知的录屏分辨率预设 ERP_VIDEO_PRESET='{VIDEO_PRESET}'，可选: {', '.join(VIDEO_PRESETS)}")
+    if TRACE_LEVEL and TRACE_LEVEL not in TRACE_LEVELS:
+        raise pytest.UsageError(f"未知的 trace 级别 ERP_TRACE_LEVEL='{TRACE_LEVEL}'，可选: {', '.join(TRACE_LEVELS)}")
+    if VITALS_MODE and VITALS_MODE not in VITALS_MODES:
+        raise pytest.UsageError(f"未知的页面性能预算模式 ERP_VITALS_MODE='{VITALS_MODE}'，可选: {', '.join(VITALS_MODES)}")
+    config.pluginmanager.register(LogContextPlugin(), "erp_log_context")
+    config.pluginmanager.register(StatsReportPlugin(config), "erp_stats_report")
+    if not is_xdist_worker(config):
+        config.pluginmanager.register(ParallelRunStats(profile.name), "erp_parallel_stats")
+        if STUB_ENABLED:
+            _start_stub_server()
+
+
+def _start_stub_server():
+    global STUB_SERVER
+    try:
+        STUB_SERVER = StubErpServer(port=STUB_PORT).start()
+    except OSError as e:
+        raise pytest.UsageError(f"替身 ERP 服务启动失败（端口 {STUB_PORT}）: {e}，可通过 ERP_STUB_PORT 换一个端口")
+    except ValueError as e:
+        raise pytest.UsageError(f"替身 ERP 服务的故障注入配置错误: {e}")
+
+
+def pytest_unconfigure(config):
+    global STUB_SERVER
+    if STUB_SERVER is not None:
+        STUB_SERVER.stop()
+        STUB_SERVER = None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    """
+    把各阶段的测试报告挂到 item 上（item.rep_setup / rep_call / rep_teardown），供 fixture 判断用例成败；
+    用例失败时保存截图环形缓冲与失败现场（此时页面尚未被 fixture 关闭），结束时清空缓冲；
+    call 阶段结束时采集各页面当前文档的性能指标
+    """
+    outcome = yield
+    rep = outcome.get_result()
+    setattr(item, "rep_" + rep.when, rep)
+    if rep.when == "call":
+        web_vitals_monitor().collect_test(item)
+    if rep.failed and rep.when in ("setup", "call"):
+        screenshot_service().on_test_failed(item)
+    elif rep.when == "teardown":
+        screenshot_service().end_test()
+
+
 # Session级别的浏览器fixture
 @pytest.fixture(scope="session")
 def browser(playwright):
-    """Session级别的浏览器，整个测试会话共享"""
-    logger.info("🚀 Session Setup: Starting Chromium browser session")
-    # 注意：不使用 channel="chrome"，避免额外原生窗口
+    """Session级别的浏览器，整个测试会话共享（有头/慢放等由运行配置档决定）"""
+    profile = active_profile()
+    logger.info(f"🚀 Session Setup: Starting Chromium browser session "
+                f"(worker={worker_id()}, profile={profile.name})")
+    # 注意：默认不使用 channel="chrome"，避免额外原生窗口
     browser = playwright.chromium.launch(
-        headless=False,
-        slow_mo=300
+        headless=profile.headless,
+        slow_mo=profile.slow_mo,
+        channel=profile.channel,
     )
     yield browser
     logger.info("🧹 Session Teardown: Closing browser session")
     browser.close()
 
-@pytest.fixture(scope="session")
-def logged_in_context(browser):
-    """
-    Session级别的已登录上下文：
-    - 只登录一次（会话级）
-    - 后续所有页面均复用该上下文，保证登录态一致
-    """
-    logger.info("🚀 Session Setup: Creating logged-in context")
-    context = browser.new_context(viewport={"width": 1280, "height": 800})
-
+def _ui_login(context, account):
+    """在给定上下文中走一遍 UI 登录流程，返回提取到的 token"""
     # 使用临时页面执行一次登录
     page = context.new_page()
     logger.info("🔐 执行登录流程...")
-    page.goto("http://localhost:8080/user/login")
-    page.wait_for_load_state("networkidle")
+    page.goto(url("/user/login"))
 
-    # 输入登录信息并提交
-    page.locator(".ant-form-item").first.locator("input").fill("001")
-    page.locator(".ant-form-item").nth(1).locator("input").fill("admin")
-    page.locator("input[type='password']").fill("Lx123456")
+    # 输入登录信息并提交（fill 自带可操作性等待，无需 networkidle）
+    page.locator(".ant-form-item").first.locator("input").fill(account.company)
+    page.locator(".ant-form-item").nth(1).locator("input").fill(account.username)
+    page.locator("input[type='password']").fill(account.password)
     page.get_by_text("登 录").click()
-    page.wait_for_load_state("networkidle")
 
-    # 验证登录成功
-    expect(page).to_have_url("http://localhost:8080/home")
+    # 验证登录成功：跳转到首页即说明登录接口已返回
+    expect(page).to_have_url(url("/home"))
     logger.info("✅ 登录成功，上下文已准备就绪")
 
-    # 提取并缓存登录后的 token（优先 localStorage，其次 cookie）
+    # 提取登录后的 token（优先 localStorage，其次 cookie）
+    token = extract_token(page, context)
+
+    # 关闭临时页面，保留已登录的上下文
+    # page.close()
+    return token
+
+
+@pytest.fixture(scope="session")
+def logged_in_context(browser):
+    """
+    Session级别的已登录上下文：
+    - 只登录一次（会话级；并行时每个 worker 各登录一次）
+    - 后续所有页面均复用该上下文，保证登录态一致
+    - 并行时从账号池（ERP_ACCOUNTS）按 worker 分配账号
+    - 登录态（cookie + localStorage + token）缓存到磁盘，未过期且校验接口通过时直接复用，
+      跳过 UI 登录；设置 ERP_AUTH_CACHE=off 可强制每次重新登录
+    """
+    account = pick_account(load_accounts())
+    logger.info(f"🚀 Session Setup: Creating logged-in context (worker={worker_id()}, user={account.username})")
+
     global AUTH_TOKEN
-    try:
-        token = page.evaluate('window.localStorage.getItem("token")')
-    except Exception:
-        token = None
-    if not token:
-        try:
-            for c in context.cookies():
-                if c.get("name") in ("access","token", "auth_token", "Authorization"):
-                    token = c.get("value")
-                    break
-        except Exception:
-            token = None
-    AUTH_TOKEN = token
+    cache = AuthStateCache(account)
+    with cache.lock():
+        cached = cache.load_valid() if AUTH_CACHE_ENABLED else None
+        if cached:
+            logger.info(f"♻️ 复用缓存的登录态: {cache.path}")
+            context = browser.new_context(viewport={"width": 1280, "height": 800},
+                                          storage_state=cached.storage_state)
+            AUTH_TOKEN = cached.token
+        else:
+            context = browser.new_context(viewport={"width": 1280, "height": 800})
+            AUTH_TOKEN = _ui_login(context, account)
+            if AUTH_CACHE_ENABLED:
+                cache.save(context.storage_state(), AUTH_TOKEN)
+
     if AUTH_TOKEN:
         logger.info(f"🔑 已获取到认证token: {AUTH_TOKEN[:20]}...")
     else:
         logger.warning("⚠️ 未在localStorage或cookie中发现token，请确认实际存储键名")
 
-    # 关闭临时页面，保留已登录的上下文
-    # page.close()
+    # 登录完成后再安装资源屏蔽，登录页本身不受影响；
+    # 静态资源缓存后安装、先执行（Playwright 按注册的逆序调用路由处理器）
+    if RESOURCE_POLICY:
+        RESOURCE_POLICY.install(context)
+    install_asset_cache(context)
+
+    # 按配置档的 trace 级别开启追踪；每个用例一个 chunk，只保存失败/不稳定用例（见 _trace_chunk）
+    trace_recorder().start_session(context)
+    # 记录该上下文发出的所有后端接口调用（方法、接口、状态码、大小、各阶段耗时）
+    api_latency_observer().attach(context)
+    # 注入页面性能采集脚本（导航耗时、LCP、CLS、长任务、JS 堆），按路由对比预算（见 _web_vitals_budget）
+    web_vitals_monitor().install(context)
 
     yield context
 
+    trace_recorder().stop_session(context)
     logger.info("🧹 Session Teardown: Closing logged-in context")
     context.close()
 
+
+@pytest.fixture(autouse=True)
+def _trace_chunk(request):
+    """使用已登录上下文的用例各录一个 trace chunk：失败或重跑后通过才写出 zip，其余丢弃"""
+    if "logged_in_context" not in request.fixturenames:
+        yield
+        return
+    context = request.getfixturevalue("logged_in_context")
+    recorder = trace_recorder()
+    recorder.start_test(context, request.node)
+    yield
+    recorder.stop_test(context, request.node)
+
+
+@pytest.fixture(autouse=True)
+def _web_vitals_budget(request):
+    """使用已登录上下文的用例：页面超出性能预算时告警；预算模式为 fail 时判为失败"""
+    if "logged_in_context" not in request.fixturenames:
+        yield
+        return
+    monitor = web_vitals_monitor()
+    monitor.pop_violations()
+    yield
+    violations = monitor.pop_violations()
+    if violations and monitor.mode == "fail":
+        pytest.fail("页面超出性能预算:\n" + "\n".join(violations), pytrace=False)
+
+
+@pytest.fixture(autouse=True)
+def _allow_resources_marker(request):
+    """
+    @pytest.mark.allow_resources("image", "font")：该用例期间放行指定类型的资源（视觉类用例）
+    @pytest.mark.allow_resources()：该用例期间放行全部资源
+    """
+    marker = request.node.get_closest_marker("allow_resources")
+    if marker is None or RESOURCE_POLICY is None:
+        yield
+        return
+    RESOURCE_POLICY.allow_for_test(marker.args)
+    yield
+    RESOURCE_POLICY.reset_for_test()
+
 # 提供一个 session 级别的 token fixture，供 API 用例直接注入使用
 @pytest.fixture(scope="session")
 def auth_token(logged_in_context):
     """会话级 token，API 测试直接使用"""
     return AUTH_TOKEN
 
+# ================= 接口造数（前置数据走 HTTP，UI 只测被测页面） =================
+
+@pytest.fixture(scope="session")
+def api_client(auth_token):
+    """会话级接口客户端：复用登录 token，连接池 + keep-alive"""
+    client = ErpApiClient(auth_token)
+    yield client
+    client.close()
+
+
+def _entity_factory(api_client, module):
+    factory = EntityFactory(api_client, module)
+    yield factory
+    factory.cleanup()
+
+
+@pytest.fixture
+def role_factory(api_client):
+    """通过接口创建角色：role = role_factory()，用例结束自动删除"""
+    yield from _entity_factory(api_client, "role")
+
+
+@pytest.fixture
+def user_factory(api_client):
+    """通过接口创建用户：user = user_factory(name="张三")，用例结束自动删除"""
+    yield from _entity_factory(api_client, "user")
+
+
+@pytest.fixture
+def goods_category_factory(api_client):
+    """通过接口创建商品分类：category = goods_category_factory()，用例结束自动删除"""
+    yield from _entity_factory(api_client, "goods_category")
+
+
+@pytest.fixture
+def warehouse_factory(api_client):
+    """通过接口创建仓库：warehouse = warehouse_factory()，用例结束自动删除"""
+    yield from _entity_factory(api_client, "warehouse")
+
+
+@pytest.fixture(scope="session")
+def bulk_seeder(auth_token):
+    """
+    大数据量场景批量造数（见 utils/bulk_seed.py）：
+    bulk_seeder.seed("user", 10000) 并发创建，会话结束按台账并发删除本 worker 创建的数据
+    """
+    ledger = os.path.join(test_logdir, f"seed_ledger_{worker_id()}.jsonl")
+    seeder = BulkSeeder(auth_token, ledger_path=ledger, run_id=f"{worker_id()}_{datetime.now().strftime('%H%M%S')}")
+    yield seeder
+    seeder.purge(run_id=seeder.run_id)
+    seeder.close()
+
 # ================= 页面复用的不同粒度（按需选择） =================
 
+@pytest.fixture(scope="session")
+def page_pool(logged_in_context):
+    """
+    Session级页面预热池（见 utils/page_pool.py）：
+    - 池中页面已打开首页，用例拿到即可使用，省去建页 + 首页加载
+    - ERP_PAGE_POOL_SIZE=0 可关闭
+    """
+    pool = PagePool(logged_in_context, url("/home"), size=PAGE_POOL_SIZE,
+                    viewport={"width": 1280, "height": 800}, ready_selector=HOME_READY_SELECTOR)
+    if PAGE_POOL_SIZE > 0:
+        pool.warm()
+    yield pool
+    pool.close()
+
+
 @pytest.fixture(scope="function")
-def logged_in_page(logged_in_context):
+def logged_in_page(request, logged_in_context, page_pool):
     """
     Function级页面（保留隔离性，推荐用于“容易脏”的用例）：
-    - 每个测试函数新建一个页面
-    - 复用 session 级上下文（已登录）
+    - 每个测试函数独占一个页面，复用 session 级上下文（已登录）
+    - 页面从预热池借出，用例结束后重置回首页再归还；用例失败的页面直接丢弃
+    - 需要全新页面（如注册了 page.on 监听器）的用例可加 @pytest.mark.fresh_page
     """
-    logger.info("🚀 Function Setup: Creating new page from logged-in context")
-    page = logged_in_context.new_page()
-    page.goto("http://localhost:8080/home")
-    page.wait_for_load_state("networkidle")
+    if PAGE_POOL_SIZE <= 0 or request.node.get_closest_marker("fresh_page"):
+        logger.info("🚀 Function Setup: Creating new page from logged-in context")
+        page = logged_in_context.new_page()
+        page.goto(url("/home"))
+        yield page
+        logger.info("🧹 Function Teardown: Closing page")
+        page.close()
+        return
+
+    logger.info("🚀 Function Setup: Acquiring warm page from page pool")
+    page = page_pool.acquire()
     yield page
-    logger.info("🧹 Function Teardown: Closing page")
-    page.close()
+    logger.info("🧹 Function Teardown: Resetting page and returning it to the pool")
+    page_pool.release(page, discard=item_failed(request.node))
 
 @pytest.fixture(scope="class")
 def logged_in_page_class(logged_in_context):
@@ -129,8 +399,7 @@ def logged_in_page_class(logged_in_context):
     """
     logger.info("🚀 Class Setup: Creating shared page for test class")
     page = logged_in_context.new_page()
-    page.goto("http://localhost:8080/home")
-    page.wait_for_load_state("networkidle")
+    page.goto(url("/home"))
     yield page
     logger.info("🧹 Class Teardown: Closing shared page")
     page.close()
@@ -143,8 +412,7 @@ def logged_in_page_module(logged_in_context):
     """
     logger.info("🚀 Module Setup: Creating shared page for test module")
     page = logged_in_context.new_page()
-    page.goto("http://localhost:8080/home")
-    page.wait_for_load_state("networkidle")
+    page.goto(url("/home"))
     yield page
     logger.info("🧹 Module Teardown: Closing shared page")
     page.close()
@@ -153,13 +421,12 @@ def logged_in_page_module(logged_in_context):
 def logged_in_page_session(logged_in_context):
     """
     Session级页面（整个会话共享一个页面）：
-    - 单窗口贯穿所有用例（性能最好）
+    - 单窗口贯穿所有用例（性能最好；各作用域的实测对比见 benchmarks/fixture_scopes.py）
     - 注意：跨用例状态需谨慎重置，适合演示或非常稳定的场景
     """
     logger.info("🚀 Session Setup: Creating one shared page for all tests")
     page = logged_in_context.new_page()
-    page.goto("http://localhost:8080/home")
-    page.wait_for_load_state("networkidle")
+    page.goto(url("/home"))
     yield page
     logger.info("🧹 Session Teardown: Closing session shared page")
     # page.close()
@@ -173,6 +440,7 @@ def fresh_page(browser):
     - 独立上下文，避免污染已登录上下文
     """
     context = browser.new_context(viewport={"width": 1280, "height": 800})
+    install_asset_cache(context)
     page = context.new_page()
     yield page
     page.close()
@@ -116,6 +116,12 @@ run_tests() {
         "--capture=no"                # 不捕获输出
         "tests/"                      # 测试目录
     )
+
+    # 并行执行：WORKERS=4 bash run_all_tests.sh（依赖 pytest-xdist）
+    if [ -n "${WORKERS:-}" ] && [ "${WORKERS}" != "1" ]; then
+        log_info "并行模式: ${WORKERS} 个 worker"
+        PYTEST_ARGS+=("-n" "${WORKERS}" "--dist" "loadscope")
+    fi
     
     # 执行测试
     if pytest "${PYTEST_ARGS[@]}"; then
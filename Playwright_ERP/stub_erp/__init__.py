@@ -0,0 +1,9 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 本地替身 ERP 服务（ERP_STUB=on 时由 conftest 自动启动，也可 python -m Playwright_ERP.stub_erp 单独运行）
+
+from Playwright_ERP.stub_erp.server import ErpStore, FaultConfig, StubErpServer
+
+__all__ = ["ErpStore", "FaultConfig", "StubErpServer"]
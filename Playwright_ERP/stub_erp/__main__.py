@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 命令行启动替身 ERP 服务：python -m Playwright_ERP.stub_erp --port 18080 --latency-ms 20-80 --error-rate 0.05
+
+import argparse
+import logging
+import sys
+import threading
+from typing import List, Optional
+
+from Playwright_ERP.stub_erp.server import FaultConfig, StubErpServer
+from Playwright_ERP.utils.settings import STUB_PORT
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    defaults = FaultConfig.from_settings()
+    parser = argparse.ArgumentParser(prog="stub_erp", description="本地替身 ERP 服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=STUB_PORT)
+    parser.add_argument("--latency-ms", default=None, help='接口延迟（毫秒），固定值如 "50" 或区间如 "20-80"')
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate, help="接口错误比例（0 ~ 1）")
+    parser.add_argument("--error-status", type=int, default=defaults.error_status, help="注入错误的状态码")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="故障注入的随机种子")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    changes = {"error_rate": args.error_rate, "error_status": args.error_status, "seed": args.seed}
+    if args.latency_ms is not None:
+        changes["latency_ms"] = args.latency_ms
+    try:
+        faults = defaults.merged(changes)
+    except ValueError as e:
+        parser.error(str(e))
+    with StubErpServer(args.host, args.port, faults=faults):
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
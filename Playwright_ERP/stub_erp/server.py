@@ -0,0 +1,457 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 本地替身 ERP 服务：内存数据 + DRF 风格 JSON 接口 + ant-design 结构的单页前端，支持延迟与错误注入
+
+import json
+import logging
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from Playwright_ERP.utils.settings import (
+    API_PREFIX,
+    RESOURCES,
+    STUB_ERROR_RATE,
+    STUB_ERROR_STATUS,
+    STUB_FAULT_PATHS,
+    STUB_LATENCY_MS,
+    STUB_SEED,
+    ErpAccount,
+    load_accounts,
+)
+
+logger = logging.getLogger(__name__)
+
+# 前端单页应用（所有非接口路径都返回它，由前端按路径渲染）
+_APP_HTML_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.html")
+# 前端读取的配置占位符（接口前缀、资源路径与 settings 保持一致）
+_CONFIG_PLACEHOLDER = "/*__ERP_STUB_CONFIG__*/null"
+
+# 替身服务自身的控制接口（不受故障注入影响）
+CONTROL_PREFIX = "/__stub__/"
+
+# 默认分页大小（与 DRF PageNumberPagination 的参数一致：page / page_size）
+DEFAULT_PAGE_SIZE = 10
+MAX_PAGE_SIZE = 1000
+
+# 页面模块 -> 字段约定（与 utils/api_client 中各实体的请求体一致）：
+# required 必填、unique 不可重复、search 参与 search 参数模糊匹配、defaults 未提交时的默认值
+SCHEMAS: Dict[str, dict] = {
+    "role": {"required": ("name",), "unique": ("name",), "search": ("name", "remark"),
+             "defaults": {"remark": "", "permissions": []}},
+    "user": {"required": ("username",), "unique": ("username",), "search": ("username", "name"),
+             "defaults": {"name": "", "sex": "男", "roles": [], "is_active": True}},
+    "goods_category": {"required": ("name",), "unique": ("name",), "search": ("name", "remark"),
+                       "defaults": {"remark": ""}},
+    "warehouse": {"required": ("name",), "unique": ("number", "name"), "search": ("number", "name", "remark"),
+                  "defaults": {"number": "", "remark": "", "is_active": True}},
+}
+
+# 初始数据（每次启动 / reset 后完全一致）
+SEED_DATA: Dict[str, List[dict]] = {
+    "role": [
+        {"name": "管理员", "remark": "拥有全部权限"},
+        {"name": "仓库管理员", "remark": "负责出入库"},
+        {"name": "销售员", "remark": "负责销售开单"},
+        {"name": "采购员", "remark": "负责采购入库"},
+        {"name": "财务", "remark": "负责收付款"},
+    ],
+    "user": [
+        {"username": "admin", "name": "系统管理员", "sex": "男", "roles": [1]},
+        {"username": "zhangsan", "name": "张三", "sex": "男", "roles": [2]},
+        {"username": "lisi", "name": "李四", "sex": "女", "roles": [3]},
+    ],
+    "goods_category": [
+        {"name": "原材料", "remark": ""},
+        {"name": "半成品", "remark": ""},
+        {"name": "成品", "remark": ""},
+        {"name": "办公用品", "remark": "非生产物料"},
+    ],
+    "warehouse": [
+        {"number": "CK0001", "name": "主仓库", "remark": ""},
+        {"number": "CK0002", "name": "成品仓", "remark": ""},
+        {"number": "CK0003", "name": "退货仓", "remark": "", "is_active": False},
+    ],
+}
+
+
+class StubApiError(Exception):
+    """接口处理失败：状态码 + DRF 风格的错误体"""
+
+    def __init__(self, status: int, body: Any):
+        self.status = status
+        self.body = body if isinstance(body, dict) else {"detail": body}
+        super().__init__(f"{status}: {self.body}")
+
+
+def issue_token(account: ErpAccount) -> str:
+    """登录 token：由账号确定（非 JWT），替身服务重启后登录态缓存仍然有效"""
+    return f"stub-{account.company}-{account.username}"
+
+
+class ErpStore:
+    """
+    内存数据（线程安全）：
+    - 按页面模块分表，id 在所有表内单调递增，列表按 id 倒序（新建的记录排在最前）
+    - reset() 恢复到 SEED_DATA，保证每次运行的初始数据一致
+    """
+
+    def __init__(self, accounts: Optional[List[ErpAccount]] = None):
+        self.accounts = accounts if accounts is not None else load_accounts()
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[int, dict]] = {}
+        self._next_id = 1
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._tables = {module: {} for module in SCHEMAS}
+            self._next_id = 1
+        for module, rows in SEED_DATA.items():
+            for row in rows:
+                self.create(module, row)
+
+    # ================= 账号 =================
+
+    def login(self, data: dict) -> dict:
+        for account in self.accounts:
+            if (str(data.get("number", "")) == account.company and data.get("username") == account.username
+                    and data.get("password") == account.password):
+                token = issue_token(account)
+                return {"access": token, "refresh": token}
+        raise StubApiError(400, {"non_field_errors": ["公司编号、用户名或密码错误"]})
+
+    def account_for(self, token: Optional[str]) -> Optional[ErpAccount]:
+        for account in self.accounts:
+            if token == issue_token(account):
+                return account
+        return None
+
+    # ================= 资源 =================
+
+    def _validate(self, module: str, data: dict, exclude_id: Optional[int] = None) -> None:
+        schema = SCHEMAS[module]
+        errors = {field: ["该字段是必填项。"] for field in schema["required"] if not str(data.get(field) or "").strip()}
+        for field in schema["unique"]:
+            value = data.get(field)
+            if field in errors or not value:
+                continue
+            if any(row[field] == value and row["id"] != exclude_id for row in self._tables[module].values()):
+                errors[field] = [f"{value} 已存在。"]
+        if errors:
+            raise StubApiError(400, errors)
+
+    def list(self, module: str, search: str = "") -> List[dict]:
+        fields = SCHEMAS[module]["search"]
+        keyword = search.strip().lower()
+        with self._lock:
+            rows = sorted(self._tables[module].values(), key=lambda row: row["id"], reverse=True)
+            return [dict(row) for row in rows
+                    if not keyword or any(keyword in str(row.get(field) or "").lower() for field in fields)]
+
+    def get(self, module: str, item_id: int) -> dict:
+        with self._lock:
+            row = self._tables[module].get(item_id)
+            if row is None:
+                raise StubApiError(404, "未找到。")
+            return dict(row)
+
+    def create(self, module: str, data: dict) -> dict:
+        schema = SCHEMAS[module]
+        with self._lock:
+            row = {**schema["defaults"], **{k: v for k, v in data.items() if k != "id"}}
+            item_id = self._next_id
+            if module == "warehouse" and not row.get("number"):
+                row["number"] = f"CK{item_id:04d}"
+            self._validate(module, row)
+            self._next_id += 1
+            row["id"] = item_id
+            row["create_time"] = time.strftime("%Y-%m-%d %H:%M:%S")
+            self._tables[module][item_id] = row
+            return dict(row)
+
+    def update(self, module: str, item_id: int, data: dict) -> dict:
+        with self._lock:
+            current = self._tables[module].get(item_id)
+            if current is None:
+                raise StubApiError(404, "未找到。")
+            row = {**current, **{k: v for k, v in data.items() if k not in ("id", "create_time")}}
+            self._validate(module, row, exclude_id=item_id)
+            self._tables[module][item_id] = row
+            return dict(row)
+
+    def delete(self, module: str, item_id: int) -> None:
+        with self._lock:
+            if self._tables[module].pop(item_id, None) is None:
+                raise StubApiError(404, "未找到。")
+
+
+def parse_latency(text: str) -> Tuple[float, float]:
+    """延迟配置："50" -> (50, 50)，"20-80" -> (20, 80)（毫秒）"""
+    parts = [float(p) for p in str(text).split("-", 1)] if str(text).strip() else [0.0]
+    low, high = parts[0], parts[-1]
+    if low < 0 or high < low:
+        raise ValueError(f"延迟配置错误: '{text}'，应为 毫秒数 或 最小值-最大值")
+    return low, high
+
+
+@dataclass
+class FaultConfig:
+    """故障注入配置：接口延迟（毫秒区间）、错误比例、错误状态码、注入范围（路径正则）、随机种子"""
+    latency_ms: Tuple[float, float] = (0.0, 0.0)
+    error_rate: float = 0.0
+    error_status: int = 503
+    paths: str = STUB_FAULT_PATHS
+    seed: int = STUB_SEED
+
+    @classmethod
+    def from_settings(cls) -> "FaultConfig":
+        return cls(latency_ms=parse_latency(STUB_LATENCY_MS), error_rate=STUB_ERROR_RATE,
+                   error_status=STUB_ERROR_STATUS, paths=STUB_FAULT_PATHS, seed=STUB_SEED)
+
+    def merged(self, changes: dict) -> "FaultConfig":
+        """应用控制接口提交的部分修改（latency_ms 可为 "20-80" 或 [20, 80]）"""
+        data = {**asdict(self), **changes}
+        latency = data["latency_ms"]
+        data["latency_ms"] = (parse_latency(latency) if isinstance(latency, (str, int, float))
+                              else (float(latency[0]), float(latency[-1])))
+        config = FaultConfig(**data)
+        if not 0 <= config.error_rate <= 1:
+            raise ValueError("error_rate 应在 0 ~ 1 之间")
+        re.compile(config.paths)
+        return config
+
+
+class FaultInjector:
+    """
+    按配置给接口请求注入延迟与错误：
+    - 随机数由固定种子生成，同样的请求序列在每次运行中命中相同的位置
+    - 各请求线程共用一个随机数生成器（加锁），并行请求时命中位置只与到达顺序有关
+    """
+
+    def __init__(self, config: Optional[FaultConfig] = None):
+        self._lock = threading.Lock()
+        self.configure(config or FaultConfig.from_settings())
+
+    def configure(self, config: FaultConfig) -> None:
+        with self._lock:
+            self.config = config
+            self._paths = re.compile(config.paths)
+            self._random = random.Random(config.seed)
+
+    def decide(self, path: str) -> Tuple[float, Optional[int]]:
+        """返回 (延迟秒数, 注入的错误状态码或 None)"""
+        with self._lock:
+            config = self.config
+            if not self._paths.search(path):
+                return 0.0, None
+            low, high = config.latency_ms
+            delay = (low if low == high else self._random.uniform(low, high)) / 1000
+            failed = config.error_rate > 0 and self._random.random() < config.error_rate
+        return delay, config.error_status if failed else None
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "_StubHttpServer"
+
+    def log_message(self, format, *args):
+        logger.debug("stub: " + format, *args)
+
+    # ================= 响应 =================
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _json(self, status: int, payload: Any = None) -> None:
+        if status == 204:
+            self._send(status, b"", "application/json")
+        else:
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), "application/json")
+
+    def _body(self) -> dict:
+        if not self._raw_body:
+            return {}
+        try:
+            data = json.loads(self._raw_body)
+        except ValueError:
+            raise StubApiError(400, "请求体不是合法的 JSON。")
+        if not isinstance(data, dict):
+            raise StubApiError(400, "请求体应为 JSON 对象。")
+        return data
+
+    # ================= 分发 =================
+
+    def _dispatch(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        # 先读完请求体：提前返回错误时 keep-alive 连接也能继续复用
+        length = int(self.headers.get("Content-Length") or 0)
+        self._raw_body = self.rfile.read(length) if length else b""
+        try:
+            if path.startswith(CONTROL_PREFIX):
+                self._json(200, self._control(path[len(CONTROL_PREFIX):].strip("/")))
+            elif path.startswith(API_PREFIX):
+                delay, error_status = self.server.faults.decide(path)
+                if delay:
+                    time.sleep(delay)
+                if error_status:
+                    raise StubApiError(error_status, "替身服务注入的错误。")
+                status, payload = self._api(path[len(API_PREFIX):].strip("/").split("/"), parse_qs(parsed.query))
+                self._json(status, payload)
+            elif self.command in ("GET", "HEAD"):
+                if path == "/favicon.ico":
+                    self._send(404, b"", "image/x-icon")
+                else:
+                    self._send(200, self.server.app_html, "text/html; charset=utf-8")
+            else:
+                raise StubApiError(405, "不支持的请求方法。")
+        except StubApiError as e:
+            self._json(e.status, e.body)
+
+    def _control(self, action: str) -> dict:
+        """替身服务控制接口：GET/POST /__stub__/faults 查看/修改故障注入配置，POST /__stub__/reset 恢复初始数据"""
+        if action == "faults":
+            if self.command == "POST":
+                try:
+                    self.server.faults.configure(self.server.faults.config.merged(self._body()))
+                except (TypeError, ValueError, re.error) as e:
+                    raise StubApiError(400, str(e))
+            return asdict(self.server.faults.config)
+        if action == "reset" and self.command == "POST":
+            self.server.store.reset()
+            self.server.faults.configure(self.server.faults.config)
+            return {"detail": "已恢复初始数据。"}
+        raise StubApiError(404, "未找到。")
+
+    def _api(self, parts: List[str], query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        store = self.server.store
+        method = self.command
+        if parts == ["user", "get_token"] and method == "POST":
+            return 200, store.login(self._body())
+
+        token = (self.headers.get("Authorization") or "").split(" ", 1)[-1].strip()
+        account = store.account_for(token)
+        if account is None:
+            raise StubApiError(401, "身份认证信息未提供或已失效。")
+        if parts == ["user", "info"] and method == "GET":
+            return 200, {"number": account.company, "username": account.username, "name": account.username}
+
+        module = self.server.modules.get(parts[0])
+        if module is None or len(parts) > 2:
+            raise StubApiError(404, "未找到。")
+        if len(parts) == 1:
+            if method == "GET":
+                return 200, self._page(store.list(module, query.get("search", [""])[0]), query)
+            if method == "POST":
+                return 201, store.create(module, self._body())
+        else:
+            if not parts[1].isdigit():
+                raise StubApiError(404, "未找到。")
+            item_id = int(parts[1])
+            if method == "GET":
+                return 200, store.get(module, item_id)
+            if method in ("PUT", "PATCH"):
+                return 200, store.update(module, item_id, self._body())
+            if method == "DELETE":
+                store.delete(module, item_id)
+                return 204, None
+        raise StubApiError(405, f"不支持的请求方法 {method}。")
+
+    @staticmethod
+    def _page(rows: List[dict], query: Dict[str, List[str]]) -> dict:
+        """DRF PageNumberPagination 风格的分页结果"""
+        try:
+            page = max(int(query.get("page", ["1"])[0]), 1)
+            size = min(max(int(query.get("page_size", [str(DEFAULT_PAGE_SIZE)])[0]), 1), MAX_PAGE_SIZE)
+        except ValueError:
+            raise StubApiError(400, "分页参数错误。")
+        start = (page - 1) * size
+        if rows and start >= len(rows):
+            raise StubApiError(404, "无效页面。")
+        return {"count": len(rows), "next": page + 1 if start + size < len(rows) else None,
+                "previous": page - 1 if page > 1 else None, "results": rows[start:start + size]}
+
+    do_GET = do_HEAD = do_POST = do_PUT = do_PATCH = do_DELETE = _dispatch
+
+
+class _StubHttpServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, store: ErpStore, faults: FaultInjector):
+        super().__init__(address, _Handler)
+        self.store = store
+        self.faults = faults
+        # 接口资源路径 -> 页面模块（与 settings.RESOURCES 相反的映射）
+        self.modules = {resource: module for module, resource in RESOURCES.items() if module in SCHEMAS}
+        with open(_APP_HTML_PATH, encoding="utf-8") as f:
+            config = {"apiPrefix": API_PREFIX, "resources": {m: RESOURCES[m] for m in self.modules.values()}}
+            self.app_html = f.read().replace(_CONFIG_PLACEHOLDER, json.dumps(config)).encode("utf-8")
+
+
+class StubErpServer:
+    """
+    本地替身 ERP 服务（后台线程运行），覆盖用例涉及的登录、角色、账号、商品分类、仓库：
+
+        with StubErpServer(port=0) as server:
+            os.environ["ERP_BASE_URL"] = server.base_url
+
+    端口被占用时构造即抛出 OSError；故障注入默认取自 ERP_STUB_* 环境变量，运行中可通过
+    server.configure_faults(...) 或 POST /__stub__/faults 调整
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, faults: Optional[FaultConfig] = None,
+                 accounts: Optional[List[ErpAccount]] = None):
+        self.store = ErpStore(accounts)
+        self.faults = FaultInjector(faults)
+        self._server = _StubHttpServer((host, port), self.store, self.faults)
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def configure_faults(self, **changes) -> FaultConfig:
+        config = self.faults.config.merged(changes)
+        self.faults.configure(config)
+        return config
+
+    def reset(self) -> None:
+        self.store.reset()
+        self.faults.configure(self.faults.config)
+
+    def start(self) -> "StubErpServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.1,), name="stub-erp", daemon=True)
+        self._thread.start()
+        config = self.faults.config
+        logger.info(f"🧪 替身 ERP 服务已启动: {self.base_url}（延迟 {config.latency_ms[0]:g}-{config.latency_ms[1]:g} ms，"
+                    f"错误率 {config.error_rate:.0%}）")
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        logger.info("🧪 替身 ERP 服务已停止")
+
+    def __enter__(self) -> "StubErpServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
@@ -7,87 +7,58 @@
 import pytest
 import requests
 import logging
-import os
-from datetime import datetime
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page
 import time
 import allure
 
+from Playwright_ERP.utils.asset_cache import install_asset_cache
+from Playwright_ERP.utils.profiles import highlight
+from Playwright_ERP.utils.reporting import item_failed
+from Playwright_ERP.utils.settings import url
+from Playwright_ERP.utils.waits import wait_for_api
+from Playwright_ERP.utils.screenshots import take_screenshot
+from Playwright_ERP.utils.video import video_recorder
+from Playwright_ERP.utils.step_timing import expect, timed_step
 
-# ==================== 全局Setup：测试环境初始化 ====================
-# 这部分代码在模块加载时执行，属于全局Setup
-test_logdir = "test_log"
-os.makedirs(test_logdir, exist_ok=True)  # Setup：创建日志目录
 
-# Setup：配置日志系统 - 为整个测试会话准备日志记录功能
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(os.path.join(test_logdir, 'test_login.log'), encoding='utf-8'),  # 文件日志 - 修复路径
-        logging.StreamHandler()  # 控制台日志
-    ]
-)
+# ==================== 全局Setup：测试环境初始化 ====================
+# 日志系统由全局 conftest.py 统一初始化（队列 + 后台线程写入，每个进程只初始化一次），这里只取 logger
 logger = logging.getLogger(__name__)
 
 
 # ==================== Session级别的Setup和Teardown ====================
-# scope="session" 表示整个测试会话只执行一次Setup和Teardown
-@pytest.fixture(scope="session")
-def browser(playwright):
-    """
-    Session级别的浏览器fixture
-    Setup: 启动浏览器 -> yield -> Teardown: 关闭浏览器
-    执行顺序: 第1个执行Setup，最后1个执行Teardown
-    """
-    # ========== Session Setup 开始 ==========
-    logger.info("🚀 Session Setup: Starting Chrome browser session")
-    browser = playwright.chromium.launch(
-        channel="chrome", 
-        headless=False,
-        slow_mo=500  # 添加操作延迟，便于观察
-    )
-    logger.info("✅ Session Setup完成: 浏览器已启动")
-    # ========== Session Setup 结束 ==========
-    
-    # yield 是分界线：yield前是Setup，yield后是Teardown
-    yield browser  # 将浏览器对象传递给依赖的fixture和测试函数
-    
-    # ========== Session Teardown 开始 ==========
-    logger.info("🧹 Session Teardown: Closing browser session")
-    browser.close()  # 关闭浏览器，释放系统资源
-    logger.info("✅ Session Teardown完成: 浏览器已关闭")
-    # ========== Session Teardown 结束 ==========
+# browser fixture 由全局 conftest.py 提供（scope="session"，整个测试会话只启动一次浏览器）
+# 有头/无头、slow_mo、浏览器渠道统一由运行配置档控制：pytest --profile debug|ci|perf
 
 
 # ==================== Function级别的Setup和Teardown ====================
 # scope="function" 表示每个测试函数都会执行一次Setup和Teardown
 @pytest.fixture(scope="function")
-def context(browser):
+def context(browser, request):
     """
     Function级别的浏览器上下文fixture
     Setup: 创建上下文和录制配置 -> yield -> Teardown: 关闭上下文
     执行顺序: 第2个执行Setup，倒数第2个执行Teardown
     """
     # ========== Function Setup 开始 ==========
-    logger.info("🚀 Function Setup: Creating browser context with recording enabled")
-    
-    # Setup步骤1: 创建录制目录
-    record_dir = "test_recordings"
-    os.makedirs(record_dir, exist_ok=True)
-    
-    # Setup步骤2: 生成录制文件名（带时间戳）
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    video_path = f"{record_dir}/login_test_{timestamp}.webm"
-    
-    # Setup步骤3: 创建浏览器上下文，配置录制参数
+    # 录屏策略由运行配置档决定（debug 失败才保留，ci/perf 不录），可用 ERP_VIDEO_MODE / ERP_VIDEO_PRESET 覆盖
+    recorder = video_recorder()
+    logger.info(f"🚀 Function Setup: Creating browser context (recording={recorder.mode}, preset={recorder.preset})")
+
+    # Setup步骤1: 创建浏览器上下文（录制目录与分辨率由录屏预设给出）
     context = browser.new_context(
         viewport={"width": 1280, "height": 800},  # 设置视窗大小
-        record_video_dir=record_dir,              # 录制目录
-        record_video_size={"width": 1280, "height": 800}  # 录制尺寸
+        **recorder.context_options()
     )
-    
-    logger.info(f"✅ Function Setup完成: Video recording will be saved to: {video_path}")
+    # 前端 JS/CSS 从本地磁盘缓存返回，新上下文不必重新下载整套打包产物
+    install_asset_cache(context)
+
+    # Setup步骤2: 记录每个页面的录屏对象（page fixture 会先于上下文关闭页面）
+    videos = []
+    context.on("page", lambda p: videos.append(p.video) if p.video else None)
+    started = time.monotonic()
+
+    logger.info("✅ Function Setup完成: 浏览器上下文已创建")
     # ========== Function Setup 结束 ==========
     
     # yield 分界线：传递上下文对象给依赖的fixture
@@ -95,8 +66,10 @@ def context(browser):
     
     # ========== Function Teardown 开始 ==========
     logger.info("🧹 Function Teardown: 关闭上下文并保存录制")
-    context.close()  # 关闭上下文，自动保存录制的视频文件
-    logger.info("✅ Function Teardown完成: Browser context closed, video saved")
+    context.close()  # 关闭上下文，录屏文件在此刻写完
+    # 通过的用例录屏在后台删除，失败的保留并挂到 Allure，不阻塞 teardown
+    recorder.finalize(videos, failed=item_failed(request.node), test_name=request.node.name, started=started)
+    logger.info("✅ Function Teardown完成: Browser context closed")
     # ========== Function Teardown 结束 ==========
 
 
@@ -184,87 +157,75 @@ def test_login(page: Page):
     """
     logger.info("🎯 开始执行登录测试 - 此时所有Setup已完成")
     
-    with allure.step('打开登录页面'):
+    with timed_step('打开登录页面'):
         logger.info("导航到登录页面")
-        page.goto("http://localhost:8080/user/login")
-        page.wait_for_load_state("networkidle")
+        page.goto(url("/user/login"))
+        # 等登录表单渲染出来即可截图，无需等待 networkidle
+        expect(page.locator(".ant-form-item").first).to_be_visible()
         
         # 截图：登录页面
-        screenshot_path = f"screenshots/login_page_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        os.makedirs("screenshots", exist_ok=True)
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="登录页面截图", attachment_type=allure.attachment_type.PNG)
-        logger.info(f"登录页面截图已保存: {screenshot_path}")
+        screenshot_path = take_screenshot(page, "登录页面截图", "login_page")
+        if screenshot_path:
+            logger.info(f"登录页面截图已保存: {screenshot_path}")
     
-    with allure.step('输入公司编号: 001'):
+    with timed_step('输入公司编号: 001'):
         logger.info("输入公司编号: 001")
         company_input = page.locator(".ant-form-item").first.locator("input")
-        company_input.highlight()  # 高亮显示元素
+        highlight(company_input)  # 高亮显示元素（仅 debug 配置档生效）
         company_input.fill("001")
         
         # 截图：输入公司编号后
-        screenshot_path = f"screenshots/company_filled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="输入公司编号后", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(page, "输入公司编号后", "company_filled")
         logger.info("公司编号输入完成")
     
-    with allure.step('输入用户名: admin'):
+    with timed_step('输入用户名: admin'):
         logger.info("输入用户名: admin")
         username_input = page.locator(".ant-form-item").nth(1).locator("input")
-        username_input.highlight()
+        highlight(username_input)
         username_input.fill("admin")
         
         # 截图：输入用户名后
-        screenshot_path = f"screenshots/username_filled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="输入用户名后", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(page, "输入用户名后", "username_filled")
         logger.info("用户名输入完成")
     
-    with allure.step('输入密码: ********'):
+    with timed_step('输入密码: ********'):
         logger.info("输入密码")
         password_input = page.locator("input[type='password']")
-        password_input.highlight()
+        highlight(password_input)
         password_input.fill("Lx123456")
         
         # 截图：输入密码后
-        screenshot_path = f"screenshots/password_filled_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="输入密码后", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(page, "输入密码后", "password_filled")
         logger.info("密码输入完成")
     
-    with allure.step('点击登录按钮'):
+    with timed_step('点击登录按钮'):
         logger.info("点击登录按钮")
         login_button = page.get_by_text("登 录")
-        login_button.highlight()
+        highlight(login_button)
         
         # 截图：点击登录前
-        screenshot_path = f"screenshots/before_login_click_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="点击登录前", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(page, "点击登录前", "before_login_click")
         
-        login_button.click()
+        # 等待登录接口返回（替代 networkidle），页面跳转由下一步的 URL 断言等待
+        with wait_for_api(page, "auth.login", table=False):
+            login_button.click()
         logger.info("登录按钮已点击")
-        
-        # 等待页面跳转
-        page.wait_for_load_state("networkidle")
     
-    with allure.step('验证登录成功 - 检查URL跳转'):
+    with timed_step('验证登录成功 - 检查URL跳转'):
         logger.info("验证页面URL是否跳转到首页")
         try:
             # 修复：登录成功后实际跳转到 /home 页面，而不是根路径
-            expect(page).to_have_url("http://localhost:8080/home")
+            expect(page).to_have_url(url("/home"))
             logger.info("URL验证成功：已跳转到首页(/home)")
             allure.attach(page.url, name="当前页面URL", attachment_type=allure.attachment_type.TEXT)
         except Exception as e:
             logger.error(f"URL验证失败: {e}")
             logger.info(f"当前实际URL: {page.url}")  # 添加实际URL的日志记录
             # 失败时截图
-            screenshot_path = f"screenshots/url_verification_failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            page.screenshot(path=screenshot_path)
-            allure.attach.file(screenshot_path, name="URL验证失败截图", attachment_type=allure.attachment_type.PNG)
+            take_screenshot(page, "URL验证失败截图", "url_verification_failed")
             raise
     
-    with allure.step('验证登录成功 - 检查首页元素'):
+    with timed_step('验证登录成功 - 检查首页元素'):
         logger.info("验证首页元素是否显示")
         try:
             home_element = page.get_by_text("首页")
@@ -272,16 +233,12 @@ def test_login(page: Page):
             logger.info("首页元素验证成功")
             
             # 成功截图
-            screenshot_path = f"screenshots/login_success_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            page.screenshot(path=screenshot_path)
-            allure.attach.file(screenshot_path, name="登录成功截图", attachment_type=allure.attachment_type.PNG)
+            take_screenshot(page, "登录成功截图", "login_success")
             
         except Exception as e:
             logger.error(f"首页元素验证失败: {e}")
             # 失败时截图
-            screenshot_path = f"screenshots/home_element_failed_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            page.screenshot(path=screenshot_path)
-            allure.attach.file(screenshot_path, name="首页元素验证失败截图", attachment_type=allure.attachment_type.PNG)
+            take_screenshot(page, "首页元素验证失败截图", "home_element_failed")
             raise
     
     logger.info("🎯 登录测试执行完成")
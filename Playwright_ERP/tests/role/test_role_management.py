@@ -6,11 +6,18 @@
 
 import pytest
 import allure
-from playwright.sync_api import Page, expect  # 修正：使用sync_api
+from playwright.sync_api import Page  # 修正：使用sync_api
 import re
-import datetime
 import logging
-import os
+
+from Playwright_ERP.utils.naming import unique_name
+from Playwright_ERP.utils.settings import url
+from Playwright_ERP.utils.waits import wait_for_api
+from Playwright_ERP.utils.screenshots import take_screenshot
+from Playwright_ERP.utils.step_timing import expect, timed_step
+from Playwright_ERP.utils.table import AntTable
+from Playwright_ERP.utils.batch_expect import expect_all, visible
+from Playwright_ERP.utils.forms import AntFormFiller
 
 logger = logging.getLogger(__name__)
 
@@ -26,11 +33,11 @@ def test_create_role(logged_in_page: Page):
     """测试创建角色功能 - 复用登录状态"""
     logger.info("🎯 开始执行角色创建测试")
     
-    with allure.step("导航到角色管理页面"):
-        logged_in_page.goto("http://localhost:8080/role")
-        logged_in_page.wait_for_load_state("networkidle")
+    with timed_step("导航到角色管理页面"):
+        with wait_for_api(logged_in_page, "role.list"):
+            logged_in_page.goto(url("/role"))
 
-    with allure.step("点击创建角色按钮"):
+    with timed_step("点击创建角色按钮"):
         # 使用最稳定的定位方法
         create_button = logged_in_page.get_by_text("新增角色")
         expect(create_button).to_be_visible()
@@ -40,73 +47,54 @@ def test_create_role(logged_in_page: Page):
         modal = logged_in_page.locator('.ant-modal')
         expect(modal).to_be_visible()
 
-    with allure.step("输入角色信息"):
-        role_name = f"auto_{datetime.datetime.now().strftime('%H%M%S')}"  # 修正：使用datetime.datetime
+    with timed_step("输入角色信息"):
+        role_name = unique_name()  # 带 worker 标识，并行运行时不冲突
         logger.info(f"创建角色名称: {role_name}")
         
-        # 使用最稳定的定位方法
-        name_input = logged_in_page.locator('.ant-form-item').filter(has_text="名称").locator('input[type="text"]')
-        expect(name_input).to_be_visible()
-        name_input.fill(role_name)  # 修正：使用fill()而不是filter()
-        
-        # 验证输入值
-        expect(name_input).to_have_value(role_name)
+        # 解析表单、填写并校验输入值
+        AntFormFiller(logged_in_page).fill({"名称": role_name})
 
-    with allure.step("点击确认按钮"):
+    with timed_step("点击确认按钮"):
         confirm_button = logged_in_page.get_by_role("button", name="确 定")  # 修正：通常是"确定"而不是"确认"
         expect(confirm_button).to_be_visible()
-        confirm_button.click()
+        # 等待创建接口返回（替代 networkidle）
+        with wait_for_api(logged_in_page, "role.create"):
+            confirm_button.click()
         
         # 等待弹窗关闭
         expect(modal).not_to_be_visible()
 
-    with allure.step("验证创建的角色是否在列表中"):
-        # 等待页面刷新
-        logged_in_page.wait_for_load_state("networkidle")
-        
+    with timed_step("验证创建的角色是否在列表中"):
         # 使用搜索功能验证角色是否创建成功
         search_input = logged_in_page.get_by_placeholder("名称, 备注")
         expect(search_input).to_be_visible()
         search_input.fill(role_name)
-        search_input.press("Enter")
-        
-        # 等待搜索结果
-        logged_in_page.wait_for_timeout(1000)
+        # 等待搜索接口返回且表格渲染稳定（替代固定等待）
+        with wait_for_api(logged_in_page, "role.search"):
+            search_input.press("Enter")
 
-    with allure.step("验证搜索结果"):
-        # 检查是否有搜索结果
-        table_rows = logged_in_page.locator('.ant-table-tbody tr')
-        rows_count = table_rows.count()
-        
-        if rows_count > 0:
-            # 获取第一行的角色名称
-            first_row_name_cell = table_rows.first.locator('td').nth(1)
-            expect(first_row_name_cell).to_be_visible()
-            first_row_text = first_row_name_cell.text_content().strip()
+    with timed_step("验证搜索结果"):
+        # 一次读出整张表格（表头、各行单元格文本），之后的判断都在快照上完成
+        snapshot = AntTable(logged_in_page).snapshot()
+
+        if len(snapshot) > 0:
+            # 按列名取第一行的角色名称（新增选择列、序号列时不受影响）
+            first_row_text = snapshot.first["名称"]
             
             # 修正：正确比较字符串
             if role_name == first_row_text:
                 logger.info(f"✅ 角色创建成功：找到角色 '{role_name}'")
             else:
                 logger.error(f"❌ 角色验证失败：期望 '{role_name}'，实际 '{first_row_text}'")
-                screenshot_path = f"screenshots/create_role_failed_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-                os.makedirs("screenshots", exist_ok=True)
-                logged_in_page.screenshot(path=screenshot_path)
-                allure.attach.file(screenshot_path, name="角色创建失败", attachment_type=allure.attachment_type.PNG)
+                take_screenshot(logged_in_page, "角色创建失败", "create_role_failed")
                 assert False, f"角色创建验证失败：期望 '{role_name}'，实际 '{first_row_text}'"
         else:
             logger.error(f"❌ 角色创建失败：没有找到角色 '{role_name}'")
-            screenshot_path = f"screenshots/no_role_found_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            os.makedirs("screenshots", exist_ok=True)
-            logged_in_page.screenshot(path=screenshot_path)
-            allure.attach.file(screenshot_path, name="未找到创建的角色", attachment_type=allure.attachment_type.PNG)
+            take_screenshot(logged_in_page, "未找到创建的角色", "no_role_found")
             assert False, f"角色创建失败：没有找到角色 '{role_name}'"
             
-    with allure.step("截图记录"):
-        screenshot_path = f"screenshots/role_created_{role_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        os.makedirs("screenshots", exist_ok=True)
-        logged_in_page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="角色创建成功", attachment_type=allure.attachment_type.PNG)
+    with timed_step("截图记录"):
+        take_screenshot(logged_in_page, "角色创建成功", f"role_created_{role_name}")
         
     logger.info("🎯 角色创建测试执行完成")
     return role_name
@@ -123,11 +111,11 @@ def test_role_list(logged_in_page: Page):
     logger.info("🎯 开始执行角色列表查看测试")
     page = logged_in_page
     
-    with allure.step("导航到角色管理页面"):
-        page.goto("http://localhost:8080/role")
-        page.wait_for_load_state("networkidle")
+    with timed_step("导航到角色管理页面"):
+        with wait_for_api(page, "role.list"):
+            page.goto(url("/role"))
 
-    with allure.step("验证页面加载"):
+    with timed_step("验证页面加载"):
         # 验证页面URL
         expect(page).to_have_url(re.compile(".*role.*"))
         
@@ -136,41 +124,31 @@ def test_role_list(logged_in_page: Page):
         if page_title.count() > 0:
             expect(page_title.first).to_be_visible()
 
-    with allure.step("验证角色列表表格"):
+    with timed_step("验证角色列表表格"):
         # 定位角色列表表格
         role_table = page.locator(".ant-table-tbody")
         expect(role_table).to_be_visible()
-        # 验证表格有数据（修正：应该检查不为空）
-        table_rows = role_table.locator('tr')
-        rows_count = table_rows.count()
+        # 一次读出表头与全部可见行（快照中只包含可见的数据行）
+        snapshot = AntTable(page).snapshot()
+        rows_count = len(snapshot)
         
         if rows_count > 0:
             logger.info(f"✅ 角色列表加载成功，共 {rows_count} 条数据")
             
-            # 验证第一行数据
-            first_row = table_rows.first
-            expect(first_row).to_be_visible()
-            
             # 验证表头和数据结构
-            table_headers = page.locator('.ant-table-thead th')
-            headers_count = table_headers.count()
-            logger.info(f"表格列数: {headers_count}")
+            logger.info(f"表格列数: {len(snapshot.headers)}，表头: {list(snapshot.headers)}")
             
         else:
             logger.warning("⚠️ 角色列表为空")
             
-    with allure.step("验证搜索功能"):
-        # 验证搜索框存在
-        search_input = page.get_by_placeholder("名称, 备注")
-        expect(search_input).to_be_visible()
+    with timed_step("验证搜索功能"):
+        # 搜索框与新增按钮一起断言（页面内同一个轮询循环，一次往返）
+        expect_all(page,
+                   visible('input[placeholder*="名称, 备注"]'),
+                   visible("button", has_text="新增角色"))
         
-        # 验证新增按钮存在
-        create_button = page.get_by_text("新增角色")
-        expect(create_button).to_be_visible()
-        
-    with allure.step("截图记录"):
-        screenshot_path = f"screenshots/role_list_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
+    with timed_step("截图记录"):
+        take_screenshot(page, "角色列表", "role_list")
         
     logger.info("🎯 角色列表查看测试执行完成")
 
@@ -187,11 +165,11 @@ def test_role_list_session(logged_in_page_session: Page):
     logger.info("🎯 开始执行角色列表查看测试")
     page = logged_in_page_session
 
-    with allure.step("导航到角色管理页面"):
-        page.goto("http://localhost:8080/role")
-        page.wait_for_load_state("networkidle")
+    with timed_step("导航到角色管理页面"):
+        with wait_for_api(page, "role.list"):
+            page.goto(url("/role"))
 
-    with allure.step("验证页面加载"):
+    with timed_step("验证页面加载"):
         # 验证页面URL
         expect(page).to_have_url(re.compile(".*role.*"))
 
@@ -200,41 +178,31 @@ def test_role_list_session(logged_in_page_session: Page):
         if page_title.count() > 0:
             expect(page_title.first).to_be_visible()
 
-    with allure.step("验证角色列表表格"):
+    with timed_step("验证角色列表表格"):
         # 定位角色列表表格
         role_table = page.locator(".ant-table-tbody")
         expect(role_table).to_be_visible()
-        # 验证表格有数据（修正：应该检查不为空）
-        table_rows = role_table.locator('tr')
-        rows_count = table_rows.count()
+        # 一次读出表头与全部可见行（快照中只包含可见的数据行）
+        snapshot = AntTable(page).snapshot()
+        rows_count = len(snapshot)
 
         if rows_count > 0:
             logger.info(f"✅ 角色列表加载成功，共 {rows_count} 条数据")
 
-            # 验证第一行数据
-            first_row = table_rows.first
-            expect(first_row).to_be_visible()
-
             # 验证表头和数据结构
-            table_headers = page.locator('.ant-table-thead th')
-            headers_count = table_headers.count()
-            logger.info(f"表格列数: {headers_count}")
+            logger.info(f"表格列数: {len(snapshot.headers)}，表头: {list(snapshot.headers)}")
 
         else:
             logger.warning("⚠️ 角色列表为空")
 
-    with allure.step("验证搜索功能"):
-        # 验证搜索框存在
-        search_input = page.get_by_placeholder("名称, 备注")
-        expect(search_input).to_be_visible()
-
-        # 验证新增按钮存在
-        create_button = page.get_by_text("新增角色")
-        expect(create_button).to_be_visible()
+    with timed_step("验证搜索功能"):
+        # 搜索框与新增按钮一起断言（页面内同一个轮询循环，一次往返）
+        expect_all(page,
+                   visible('input[placeholder*="名称, 备注"]'),
+                   visible("button", has_text="新增角色"))
 
-    with allure.step("截图记录"):
-        screenshot_path = f"screenshots/role_list_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        page.screenshot(path=screenshot_path)
+    with timed_step("截图记录"):
+        take_screenshot(page, "角色列表", "role_list")
 
     logger.info("🎯 角色列表查看测试执行完成")
 
@@ -245,29 +213,30 @@ def test_role_list_session(logged_in_page_session: Page):
 @allure.title("删除角色")
 @allure.description("测试角色列表页面的加载和数据显示")
 @allure.tag("role", "delete", "management")
-def test_delete_role_session(logged_in_page_session: Page):
+def test_delete_role_session(role_factory, logged_in_page_session: Page):
     """测试删除角色功能 - 复用登录状态"""
     logger.info("🎯 开始执行删除角色测试")
     page = logged_in_page_session
 
-    with allure.step("创建一个角色并获取名称"):
-        role_name = test_create_role(page)
+    with timed_step("通过接口创建一个角色并获取名称"):
+        role_name = role_factory()["name"]
         logger.info(f"待删除的角色：{role_name}")
 
-    with allure.step("导航到角色管理页面并搜索该角色"):
-        page.goto("http://localhost:8080/role")
-        page.wait_for_load_state("networkidle")
+    with timed_step("导航到角色管理页面并搜索该角色"):
+        with wait_for_api(page, "role.list"):
+            page.goto(url("/role"))
 
         search_input = page.get_by_placeholder("名称, 备注")
         expect(search_input).to_be_visible()
         search_input.fill(role_name)
-        search_input.press("Enter")
+        with wait_for_api(page, "role.search"):
+            search_input.press("Enter")
 
         table_rows = page.locator('.ant-table-tbody tr')
         target_row = table_rows.filter(has_text=role_name).first
         expect(target_row).to_be_visible()
 
-    with allure.step("点击该行的删除按钮"):
+    with timed_step("点击该行的删除按钮"):
         delete_button = target_row.get_by_role("button", name=re.compile("删除"))
         expect(delete_button).to_be_visible()
         delete_button.click()
@@ -277,32 +246,27 @@ def test_delete_role_session(logged_in_page_session: Page):
         # confirm_button = page.get_by_role("button", has_text="确 定")
         # confirm_button = page.locator("body > div:nth-child(7) > div > div > div > div.ant-popover-inner > div > div.ant-popover-buttons > button.ant-btn.ant-btn-primary.ant-btn-sm > span")
         expect(confirm_button).to_be_visible()
-        confirm_button.click()
+        with wait_for_api(page, "role.delete"):
+            confirm_button.click()
 
 
-    with allure.step("验证该角色已被删除"):
+    with timed_step("验证该角色已被删除"):
         # 重新搜索确保该记录不存在
         search_input = page.get_by_placeholder("名称, 备注")
         expect(search_input).to_be_visible()
         search_input.fill(role_name)
-        search_input.press("Enter")
-        page.wait_for_timeout(800)
+        with wait_for_api(page, "role.search"):
+            search_input.press("Enter")
 
         remaining = page.locator('.ant-table-tbody tr').filter(has_text=role_name).count()
         if remaining == 0:
             logger.info(f"✅ 角色删除成功：'{role_name}' 不在列表中")
         else:
             logger.error(f"❌ 角色删除失败：仍发现角色 '{role_name}'")
-            screenshot_path = f"screenshots/delete_role_failed_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-            os.makedirs("screenshots", exist_ok=True)
-            page.screenshot(path=screenshot_path)
-            allure.attach.file(screenshot_path, name="角色删除失败", attachment_type=allure.attachment_type.PNG)
+            take_screenshot(page, "角色删除失败", "delete_role_failed")
             assert False, f"角色删除失败：仍然存在 '{role_name}'"
-    with allure.step("截图记录删除结果"):
-        screenshot_path = f"screenshots/role_deleted_{role_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        os.makedirs("screenshots", exist_ok=True)
-        page.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="角色删除成功", attachment_type=allure.attachment_type.PNG)
+    with timed_step("截图记录删除结果"):
+        take_screenshot(page, "角色删除成功", f"role_deleted_{role_name}")
 
 
     logger.info("🎯 删除角色测试执行完成")
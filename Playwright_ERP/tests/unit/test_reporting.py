@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 统计汇总单元测试：最近秩法百分位（不启动浏览器）
+
+import pytest
+
+from Playwright_ERP.utils.reporting import percentile
+
+
+@pytest.mark.parametrize("pct, expected", [
+    (0, 1),
+    (10, 1),
+    (50, 5),
+    (90, 9),
+    (95, 10),
+    (100, 10),
+])
+def test_percentile_nearest_rank(pct, expected):
+    assert percentile([7, 3, 10, 1, 5, 2, 9, 4, 8, 6], pct) == expected
+
+
+def test_percentile_single_and_unsorted():
+    assert percentile([42.5], 99) == 42.5
+    assert percentile([300, 100, 200], 50) == 200
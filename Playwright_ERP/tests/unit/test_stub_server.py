@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 替身 ERP 服务单元测试：数据校验、分页、延迟配置解析、故障注入的可复现性（不启动浏览器）
+
+import pytest
+import requests
+
+from Playwright_ERP.stub_erp.server import (
+    DEFAULT_PAGE_SIZE,
+    ErpStore,
+    FaultConfig,
+    FaultInjector,
+    StubApiError,
+    StubErpServer,
+    issue_token,
+    parse_latency,
+)
+from Playwright_ERP.utils.settings import API_PREFIX, RESOURCES, ErpAccount
+
+ACCOUNT = ErpAccount("001", "tester", "Lx123456")
+
+
+@pytest.fixture
+def store():
+    return ErpStore([ACCOUNT])
+
+
+@pytest.fixture(scope="module")
+def server():
+    with StubErpServer(port=0, faults=FaultConfig(), accounts=[ACCOUNT]) as stub:
+        yield stub
+
+
+def _get(server, module: str, **params) -> requests.Response:
+    return requests.get(f"{server.base_url}{API_PREFIX}{RESOURCES[module]}/", params=params, timeout=5,
+                        headers={"Authorization": f"Bearer {issue_token(ACCOUNT)}"})
+
+
+# ================= ErpStore =================
+
+def test_create_requires_fields(store):
+    with pytest.raises(StubApiError) as e:
+        store.create("role", {"name": "  ", "remark": "空名称"})
+    assert e.value.status == 400
+    assert "name" in e.value.body
+
+
+def test_create_rejects_duplicates(store):
+    store.create("role", {"name": "质检员"})
+    with pytest.raises(StubApiError) as e:
+        store.create("role", {"name": "质检员"})
+    assert e.value.status == 400
+    assert e.value.body["name"] == ["质检员 已存在。"]
+
+
+def test_update_keeps_own_unique_value(store):
+    row = store.create("warehouse", {"name": "测试仓"})
+    assert store.update("warehouse", row["id"], {"name": "测试仓", "remark": "改备注"})["remark"] == "改备注"
+    with pytest.raises(StubApiError) as e:
+        store.update("warehouse", row["id"], {"name": "主仓库"})
+    assert e.value.status == 400
+
+
+def test_list_newest_first_and_search(store):
+    created = store.create("goods_category", {"name": "包装材料"})
+    assert store.list("goods_category")[0]["id"] == created["id"]
+    assert [row["name"] for row in store.list("goods_category", "包装")] == ["包装材料"]
+
+
+def test_missing_rows_are_404(store):
+    for call in (lambda: store.get("role", 9999), lambda: store.update("role", 9999, {"name": "x"}),
+                 lambda: store.delete("role", 9999)):
+        with pytest.raises(StubApiError) as e:
+            call()
+        assert e.value.status == 404
+
+
+def test_reset_restores_seed_data(store):
+    before = store.list("user")
+    store.create("user", {"username": "wangwu"})
+    store.reset()
+    assert store.list("user") == before
+
+
+# ================= 分页 =================
+
+def test_pagination(server):
+    data = _get(server, "role", page=1, page_size=2).json()
+    assert data["count"] >= 5 and len(data["results"]) == 2
+    assert data["next"] == 2 and data["previous"] is None
+    assert len(_get(server, "role").json()["results"]) == min(DEFAULT_PAGE_SIZE, data["count"])
+
+
+@pytest.mark.parametrize("params, status", [
+    ({"page": 99}, 404),
+    ({"page": "abc"}, 400),
+    ({"page_size": "x"}, 400),
+])
+def test_pagination_errors(server, params, status):
+    assert _get(server, "role", **params).status_code == status
+
+
+def test_api_requires_token(server):
+    resp = requests.get(f"{server.base_url}{API_PREFIX}{RESOURCES['role']}/", timeout=5)
+    assert resp.status_code == 401
+
+
+# ================= 故障注入 =================
+
+@pytest.mark.parametrize("text, expected", [
+    ("50", (50.0, 50.0)),
+    ("20-80", (20.0, 80.0)),
+    ("", (0.0, 0.0)),
+])
+def test_parse_latency(text, expected):
+    assert parse_latency(text) == expected
+
+
+@pytest.mark.parametrize("text", ["80-20", "-5", "abc"])
+def test_parse_latency_rejects_bad_values(text):
+    with pytest.raises(ValueError):
+        parse_latency(text)
+
+
+def test_fault_injection_is_deterministic():
+    config = FaultConfig(latency_ms=(10.0, 50.0), error_rate=0.3, paths=".*", seed=42)
+    injectors = [FaultInjector(config), FaultInjector(config)]
+    runs = [[injector.decide(f"/api/roles/{i}") for i in range(50)] for injector in injectors]
+    assert runs[0] == runs[1]
+    assert any(status for _, status in runs[0]) and not all(status for _, status in runs[0])
+    assert all(0.01 <= delay <= 0.05 for delay, _ in runs[0])
+
+
+def test_fault_injection_respects_paths():
+    injector = FaultInjector(FaultConfig(latency_ms=(30.0, 30.0), error_rate=1.0, paths=r"/roles/", seed=1))
+    assert injector.decide("/api/warehouse/") == (0.0, None)
+    assert injector.decide("/api/roles/") == (0.03, 503)
@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 表格快照单元测试：按列名 / 列序号取值、按列值与行 key 查找（不启动浏览器）
+
+import pytest
+
+from Playwright_ERP.utils.table import TableSnapshot
+
+HEADERS = ["", "名称", "备注", "名称", "操作"]
+ROWS = [
+    {"key": "12", "cells": ["", "原材料", "", "重复列", "编辑 删 除"], "actions": ["编辑", "删 除"]},
+    {"key": "11", "cells": ["", "办公用品", "非生产物料", "", "编辑"], "actions": ["编辑"]},
+    {"key": "10", "cells": ["", "原材料", "旧数据"], "actions": []},
+]
+
+
+@pytest.fixture
+def snapshot():
+    return TableSnapshot(HEADERS, ROWS)
+
+
+def test_columns_by_name(snapshot):
+    # 空表头不参与按名查找，重名列取第一个
+    assert snapshot.columns == {"名称": 1, "备注": 2, "操作": 4}
+    assert snapshot.first["名称"] == "原材料"
+    assert snapshot.first[3] == "重复列"
+    assert snapshot.column("备注") == ["", "非生产物料", "旧数据"]
+    # 单元格不足的行取空字符串
+    assert snapshot.column("操作") == ["编辑 删 除", "编辑", ""]
+
+
+def test_unknown_column_lists_existing(snapshot):
+    with pytest.raises(KeyError, match="备注"):
+        snapshot.first["状态"]
+    with pytest.raises(KeyError, match="状态"):
+        snapshot.find("状态", "x")
+    assert snapshot.rows[2].get("操作", "-") == "-"
+
+
+def test_find_by_column_value(snapshot):
+    assert [row.key for row in snapshot.rows_where("名称", "原材料")] == ["12", "10"]
+    assert snapshot.find("名称", "办公用品").key == "11"
+    assert snapshot.find("名称", "不存在") is None
+    assert snapshot.has("备注", "旧数据")
+    assert not snapshot.has("备注", "旧")
+
+
+def test_by_key_and_containing(snapshot):
+    assert snapshot.by_key(11)["备注"] == "非生产物料"
+    assert snapshot.by_key("99") is None
+    assert [row.key for row in snapshot.containing("数据")] == ["10"]
+
+
+def test_row_helpers(snapshot):
+    assert snapshot.first.has_action("删除")
+    assert not snapshot.rows[1].has_action("删除")
+    assert snapshot.rows[1].as_dict() == {"名称": "办公用品", "备注": "非生产物料", "操作": "编辑"}
+    assert len(snapshot) == 3 and TableSnapshot(HEADERS, []).first is None
@@ -6,16 +6,27 @@
 
 import pytest
 import allure
-from playwright.sync_api import Page, expect
+from playwright.sync_api import Page
 import re
-import datetime
 from faker import Faker
 import logging
-import os
 from typing import Optional
+
+from Playwright_ERP.utils.naming import unique_name
+from Playwright_ERP.utils.settings import url
+from Playwright_ERP.utils.waits import wait_for_api
+from Playwright_ERP.utils.screenshots import take_screenshot
+from Playwright_ERP.utils.selector_cache import fallback_locator, visible_fallback
+from Playwright_ERP.utils.forms import AntFormFiller
+from Playwright_ERP.utils.step_timing import expect
+
 fake = Faker("zh_CN")
 logger = logging.getLogger(__name__)
 
+# 搜索输入框的备选选择器（按优先级）
+SEARCH_INPUTS = ('input[placeholder*="名称"]', 'input[placeholder*="备注"]',
+                 'input[placeholder*="搜索"]', 'input[type="search"]', '.ant-input[placeholder]')
+
 
 class UserRowScope:
     """用户列表行的作用域（Scope Model），只在目标行内执行操作"""
@@ -24,15 +35,16 @@ class UserRowScope:
         self.row = row_locator
 
     def delete(self):
-        delete_btn = self.row.locator('button:has-text("删除"), [role="button"]:has-text("删除")').first
-        expect(delete_btn).to_be_visible()
+        delete_btn = visible_fallback(self.row, "user.row_delete",
+                                      'button:has-text("删除")', '[role="button"]:has-text("删除")')
         delete_btn.click()
 
         # 在当前可见的 Popconfirm 内确认
         confirm_pop = self.page.locator('.ant-popover:visible').first
         confirm_btn = confirm_pop.get_by_role("button", name=re.compile(r"确\s*定"))
         expect(confirm_btn).to_be_visible()
-        confirm_btn.click()
+        with wait_for_api(self.page, "user.delete"):
+            confirm_btn.click()
 
 
 class UserPage:
@@ -41,84 +53,55 @@ class UserPage:
         self.page = page
 
     def goto_account(self):
-        self.page.goto("http://localhost:8080/account")
-        self.page.wait_for_load_state("networkidle")
+        # 等用户列表接口返回并渲染完成，而不是等 networkidle
+        with wait_for_api(self.page, "user.list"):
+            self.page.goto(url("/account"))
 
     def goto_user_list(self):
-        self.page.goto("http://localhost:8080/account")
-        self.page.wait_for_load_state("networkidle")
+        with wait_for_api(self.page, "user.list"):
+            self.page.goto(url("/account"))
 
     def create_user(self, name: Optional[str] = None, employee_name: Optional[str] = None, gender: str = "女") -> str:
         """创建用户，返回创建的用户名"""
         self.goto_account()
 
         # 打开创建弹窗
-        create_btn = self.page.locator('button:has-text("新增账号"), button:has-text("新增用户")').first
-        expect(create_btn).to_be_visible()
+        create_btn = visible_fallback(self.page, "user.create_button",
+                                      'button:has-text("新增账号")', 'button:has-text("新增用户")')
         create_btn.click()
         modal = self.page.locator('.ant-modal:visible').first
         expect(modal).to_be_visible()
 
         # 数据准备
         if name is None:
-            name = f"auto_{datetime.datetime.now().strftime('%H%M%S')}"
+            name = unique_name()
         if employee_name is None:
             employee_name = fake.name()
         logger.info(f"创建用户名称: {name}")
 
-        # 用户名
-        user_name_input = self.page.locator('.ant-row.ant-form-item').filter(has_text="用户名").locator('input[type="text"]')
-        expect(user_name_input).to_be_visible()
-        user_name_input.fill(name)
-        expect(user_name_input).to_have_value(name)
-
-        # 员工姓名
-        employee_input = self.page.locator('.ant-row.ant-form-item').filter(has_text="员工姓名").locator('input[type="text"]')
-        expect(employee_input).to_be_visible()
-        employee_input.fill(employee_name)
-
-        # 性别选择（语义定位 + 浮层限定）
-        gender_item = self.page.locator('.ant-form-item').filter(has_text=re.compile(r"性别"))
-        gender_combobox = gender_item.get_by_role("combobox")
-        expect(gender_combobox).to_be_visible()
-        gender_combobox.click()
-
-        dropdown = self.page.locator('.ant-select-dropdown:visible').first
-        expect(dropdown).to_be_visible()
-        # 先 hover “男”，再选择目标性别
-        male_opt = dropdown.get_by_role('option', name='男')
-        expect(male_opt).to_be_visible()
-        male_opt.hover()
-
-        target_opt = dropdown.get_by_role('option', name=gender)
-        expect(target_opt).to_be_visible()
-        target_opt.click()
+        # 用户名、员工姓名、性别：一次解析全部表单项，文本框页面内直接写入，最后一次性校验
+        AntFormFiller(self.page).fill({"用户名": name, "员工姓名": employee_name, "性别": gender})
 
         # 提交
         confirm_btn = self.page.get_by_role("button", name=re.compile(r"确\s*定"))
         expect(confirm_btn).to_be_visible()
-        confirm_btn.click()
+        with wait_for_api(self.page, "user.create"):
+            confirm_btn.click()
         expect(modal).not_to_be_visible()
-        self.page.wait_for_load_state("networkidle")
 
         return name
 
     def _search_input(self):
-        """稳健定位搜索输入框"""
-        return self.page.locator(
-            'input[placeholder*="名称"], input[placeholder*="备注"], '
-            'input[placeholder*="搜索"], input[type="search"], '
-            '.ant-input[placeholder]'
-        ).first
+        """稳健定位搜索输入框（多个备选，优先使用上次命中的那个）"""
+        return fallback_locator(self.page, "user.search_input", *SEARCH_INPUTS).first
 
     def search_user(self, keyword: str):
         self.goto_user_list()
-        search_input = self._search_input()
-        if search_input.count() > 0:
-            expect(search_input).to_be_visible()
+        if self._search_input().count() > 0:
+            search_input = visible_fallback(self.page, "user.search_input", *SEARCH_INPUTS)
             search_input.fill(keyword)
-            search_input.press("Enter")
-        self.page.wait_for_load_state("networkidle")
+            with wait_for_api(self.page, "user.search"):
+                search_input.press("Enter")
         table_body = self.page.locator('.ant-table-tbody')
         if table_body.count() > 0:
             expect(table_body.first).to_be_visible()
@@ -164,23 +147,20 @@ class TestUsersManagement:
         expect(target_row).to_be_visible()
 
         # 记录截图
-        os.makedirs("screenshots", exist_ok=True)
-        screenshot_path = f"screenshots/user_created_{user_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        logged_in_page_class.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="用户创建成功", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(logged_in_page_class, "用户创建成功", f"user_created_{user_name}")
 
         logger.info("🎯 用户创建测试执行完成")
 
     @allure.story("用户删除")
     @allure.title("删除用户（先创建再删除）")
     @allure.tag("user", "delete", "management")
-    def test_delete_user_class(self, logged_in_page_class: Page):
+    def test_delete_user_class(self, user_factory, logged_in_page_class: Page):
         """企业常用删除逻辑：先创建 → 在列表中搜索 → 行作用域删除 → 验证不存在"""
         logger.info("🎯 开始执行删除用户测试")
         user_page = UserPage(logged_in_page_class)
 
-        # 先创建一个待删用户
-        user_name = user_page.create_user()
+        # 先通过接口创建一个待删用户（只在 UI 上测删除本身）
+        user_name = user_factory()["username"]
         logger.info(f"待删除的用户：{user_name}")
 
         # 行作用域删除
@@ -191,10 +171,7 @@ class TestUsersManagement:
         user_page.assert_user_not_exists(user_name)
 
         # 截图记录
-        os.makedirs("screenshots", exist_ok=True)
-        screenshot_path = f"screenshots/user_deleted_{user_name}_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
-        logged_in_page_class.screenshot(path=screenshot_path)
-        allure.attach.file(screenshot_path, name="用户删除成功", attachment_type=allure.attachment_type.PNG)
+        take_screenshot(logged_in_page_class, "用户删除成功", f"user_deleted_{user_name}")
 
         logger.info("🎯 删除用户测试执行完成")
 
@@ -3,13 +3,17 @@
 # @Author: 熊🐻来个🥬
 # @Date:  2025/11/20
 # @Description: [对文件功能等的简要描述（可自行添加）]
-import datetime
-
 import pytest
 import allure
-from playwright.sync_api import Page,expect
+from playwright.sync_api import Page
 import logging
 
+from Playwright_ERP.utils.naming import unique_name
+from Playwright_ERP.utils.settings import url
+from Playwright_ERP.utils.waits import wait_for_api
+from Playwright_ERP.utils.step_timing import expect, timed_step
+from Playwright_ERP.utils.forms import AntFormFiller
+
 @allure.epic("基础数据")
 @allure.feature("仓库管理")
 @allure.story("仓库创建")
@@ -20,50 +24,54 @@ def test_create_warehouses(logged_in_page_module: Page):
     logging.info("🎯 开始测试创建仓库")
     page = logged_in_page_module
 
-    with allure.step("导航到仓库页面"):
-        page.goto("http://localhost:8080/basicData/warehouse")
-        page.wait_for_selector("div.ant-table-content")
+    with timed_step("导航到仓库页面"):
+        with wait_for_api(page, "warehouse.list"):
+            page.goto(url("/basicData/warehouse"))
 
-    with allure.step("点击新增仓库"):
+    with timed_step("点击新增仓库"):
         # create_button = page.get_by_role("button",name="新增仓库")
         create_button = page.get_by_text("新增仓库")
         expect(create_button).to_be_visible()
         create_button.click()
 
-    with allure.step("输入新增仓库信息"):
-        warehouse_name = f"auto_{datetime.datetime.now().strftime('%H%M%S')}"
-        name_input = page.locator(".ant-row").filter(has_text="仓库名称").locator("input")
-        expect(name_input).to_be_visible()
-        name_input.fill(warehouse_name)
+    with timed_step("输入新增仓库信息"):
+        warehouse_name = unique_name()
+        AntFormFiller(page).fill({"仓库名称": warehouse_name})
 
-    with allure.step("点击确定按钮"):
+    with timed_step("点击确定按钮"):
         ok_button = page.get_by_role("button", name="确 定")
         expect(ok_button).to_be_visible()
-        ok_button.click()
+        with wait_for_api(page, "warehouse.create"):
+            ok_button.click()
 
     return warehouse_name
 
-def test_updata_warehouses(logged_in_page_module: Page):
+def test_updata_warehouses(warehouse_factory, logged_in_page_module: Page):
     """测试更新仓库的完整功能"""
-    logging.info("🎯 开始测试创建仓库")
+    logging.info("🎯 开始测试更新仓库")
     page = logged_in_page_module
 
-    with allure.step("创建一个仓库"):
-        resp_create_warehouses = test_create_warehouses(page)
+    with timed_step("通过接口创建一个仓库"):
+        resp_create_warehouses = warehouse_factory()["name"]
+
+    with timed_step("导航到仓库页面"):
+        with wait_for_api(page, "warehouse.list"):
+            page.goto(url("/basicData/warehouse"))
 
-    with allure.step("搜索新建的仓库"):
+    with timed_step("搜索新建的仓库"):
         page.get_by_placeholder("编号, 名称, 备注").fill(resp_create_warehouses)
 
-    with allure.step("点击查询"):
-        page.get_by_role("button",name="查询").click()
+    with timed_step("点击查询"):
+        with wait_for_api(page, "warehouse.search"):
+            page.get_by_role("button",name="查询").click()
 
-    with allure.step("点击编辑按钮"):
+    with timed_step("点击编辑按钮"):
         page.get_by_role("button",name="编辑").click()
 
-    with allure.step("编辑仓库名称"):
-        name_input = page.locator(".ant-row").filter(has_text="仓库名称").locator("input")
-        name_input.fill(resp_create_warehouses+"_up")
+    with timed_step("编辑仓库名称"):
+        AntFormFiller(page).fill({"仓库名称": resp_create_warehouses+"_up"})
 
-    with allure.step("点击确定按钮"):
+    with timed_step("点击确定按钮"):
         ok_button = page.get_by_role("button", name="确 定")
-        ok_button.click()
+        with wait_for_api(page, "warehouse.update"):
+            ok_button.click()
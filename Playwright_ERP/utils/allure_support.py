@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: Allure 辅助：在测试线程登记附件，附件内容交由后台线程写入
+
+import logging
+from typing import Optional
+from uuid import uuid4
+
+from allure_commons import plugin_manager
+
+logger = logging.getLogger(__name__)
+
+
+def allure_reporter():
+    """返回当前生效的 AllureReporter（未开启 --alluredir 时返回 None）"""
+    for plugin in plugin_manager.get_plugins():
+        reporter = getattr(plugin, "allure_logger", None)
+        if reporter is not None:
+            return reporter
+    return None
+
+
+def reserve_attachment(name: str, attachment_type) -> Optional[str]:
+    """
+    在测试线程中登记一个附件（挂到当前 step / 用例上），返回附件文件名
+    Allure 的“当前 step”与线程绑定，登记必须在测试线程完成；文件内容可稍后由任意线程写入
+    """
+    reporter = allure_reporter()
+    if reporter is None:
+        return None
+    try:
+        return reporter._attach(uuid4(), name=name, attachment_type=attachment_type)
+    except Exception as e:
+        # 不在用例执行期间（例如会话级 fixture 中）没有可挂载的节点
+        logger.debug(f"Allure 附件登记失败: {e}")
+        return None
+
+
+def write_attachment(file_name: Optional[str], body: bytes) -> None:
+    """写入 reserve_attachment 登记过的附件内容（可在后台线程调用）"""
+    if file_name:
+        plugin_manager.hook.report_attached_data(body=body, file_name=file_name)
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: ant-design 下拉选择：按选项文字选择，支持上千选项的虚拟滚动列表（输入过滤 + 键盘确认，页面内有上限的滚动查找兜底）
+
+import itertools
+import logging
+import time
+from typing import Union
+
+from playwright.sync_api import Frame, Locator, Page
+
+from Playwright_ERP.utils.batch_expect import DEFAULT_TIMEOUT
+from Playwright_ERP.utils.settings import SELECT_SCROLL_STEPS
+
+logger = logging.getLogger(__name__)
+
+# 每次选择使用不同的标记，避免命中上一次留下的 data-erp-option
+_tokens = itertools.count(1)
+# 输入过滤后列表内容保持不变多久（毫秒）即认为过滤 / 远程搜索已完成
+SETTLE_MS = 500
+
+# 在 .ant-select 根节点上执行：找到它展开的下拉层（优先按 aria-controls，否则取最后一个可见的下拉层），
+# 在已渲染的选项中按文字精确查找（最多等待 wait 毫秒，列表内容稳定 SETTLE_MS 后提前结束）；
+# scroll 为真时再从顶部按屏滚动虚拟列表查找（最多 maxSteps 屏，且整个查找不超过 timeout 毫秒）。
+# 找到后滚动到可见并打上 data-erp-option 标记；返回 {status: found / missing / closed, ...}
+_FIND_OPTION_JS = """
+async (select, { label, token, timeout, wait, scroll, maxSteps }) => {
+    const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const nextFrame = () => new Promise((done) => requestAnimationFrame(done));
+    const input = select.querySelector('input');
+    const searchable = select.classList.contains('ant-select-show-search') && !!input && !input.readOnly;
+    const dropdownOf = () => {
+        const listbox = input && input.getAttribute('aria-controls') && document.getElementById(input.getAttribute('aria-controls'));
+        const own = listbox && listbox.closest('.ant-select-dropdown');
+        if (own && !own.classList.contains('ant-select-dropdown-hidden') && visible(own)) return own;
+        const open = [...document.querySelectorAll('.ant-select-dropdown:not(.ant-select-dropdown-hidden)')].filter(visible);
+        return open[open.length - 1] || null;
+    };
+    const textOf = (option) => {
+        const content = option.querySelector('.ant-select-item-option-content');
+        return norm(content ? content.textContent : (option.getAttribute('title') || option.textContent));
+    };
+    const seen = new Set();
+    const match = (dropdown) => {
+        const options = [...dropdown.querySelectorAll('.ant-select-item-option, [role="option"]')].filter(visible);
+        options.forEach((option) => seen.add(textOf(option)));
+        return options.find((option) => textOf(option) === label) || null;
+    };
+
+    const deadline = performance.now() + timeout;
+    let dropdown = dropdownOf();
+    while (!dropdown && performance.now() < deadline) {
+        await nextFrame();
+        dropdown = dropdownOf();
+    }
+    if (!dropdown) return { status: 'closed', searchable };
+
+    // 列表状态（加载中返回 null）：选项数 + 是否显示空状态；持续不变视为过滤 / 远程搜索已完成
+    const listState = () => {
+        if (dropdown.querySelector('.ant-spin-spinning, .ant-select-item-option-loading')) return null;
+        const count = dropdown.querySelectorAll('.ant-select-item-option, [role="option"]').length;
+        const empty = !!dropdown.querySelector('.ant-select-item-empty, .ant-empty');
+        return count || empty ? `${count}|${empty}` : null;
+    };
+    const waitUntil = Math.min(performance.now() + wait, deadline);
+    let option = match(dropdown);
+    let state = listState();
+    let stableSince = performance.now();
+    while (!option && performance.now() < waitUntil
+           && (state === null || performance.now() - stableSince < """ + str(SETTLE_MS) + """)) {
+        await nextFrame();
+        option = match(dropdown);
+        const next = listState();
+        if (next !== state) stableSince = performance.now();
+        state = next;
+    }
+
+    let steps = 0;
+    let timedOut = false;
+    if (!option && scroll) {
+        const holder = dropdown.querySelector('.rc-virtual-list-holder')
+            || [...dropdown.querySelectorAll('*')].find((el) => el.scrollHeight > el.clientHeight + 1);
+        if (holder && holder.clientHeight > 0) {
+            holder.scrollTop = 0;
+            while (steps < maxSteps) {
+                if (performance.now() >= deadline) {
+                    timedOut = true;
+                    break;
+                }
+                // 虚拟列表在 scroll 事件后的下一帧才渲染新的行
+                await nextFrame();
+                await nextFrame();
+                option = match(dropdown);
+                if (option || holder.scrollTop + holder.clientHeight >= holder.scrollHeight - 1) break;
+                holder.scrollTop += holder.clientHeight;
+                steps += 1;
+            }
+        }
+    }
+    if (!option) {
+        return { status: 'missing', searchable, steps, timedOut, seen: seen.size, sample: [...seen].slice(0, 10) };
+    }
+
+    option.scrollIntoView({ block: 'nearest' });
+    option.setAttribute('data-erp-option', token);
+    return { status: 'found', searchable, steps, active: option.classList.contains('ant-select-item-option-active') };
+}
+"""
+
+
+class AntSelect:
+    """
+    ant-design 下拉选择（单选）：
+
+        AntSelect(page, '.ant-form-item:has-text("仓库") .ant-select').choose("北京一号仓")
+
+    - 展开后先在已渲染的选项中精确查找，小列表一次 evaluate 就能定位
+    - 可搜索的下拉（showSearch）：输入文字让列表过滤，目标成为激活项时直接回车确认，
+      否则点击带标记的选项；远程搜索的结果最多等待 timeout 毫秒（列表稳定 SETTLE_MS 后不再等待）；
+      过滤后仍找不到（如按 value 过滤）时清空输入，改为滚动整个列表查找
+    - 不可搜索或过滤后仍很长：在页面内从顶部按屏滚动虚拟列表查找（最多 SELECT_SCROLL_STEPS 屏、不超过 timeout，一次往返）
+    - 找不到时抛出 AssertionError，附上已查看的选项数与示例
+    """
+
+    def __init__(self, scope: Union[Page, Frame, Locator], selector: str):
+        self.page = scope if isinstance(scope, Page) else scope.page
+        self.root = scope.locator(selector).first
+
+    def _find(self, label: str, token: str, deadline: float, wait: bool, scroll: bool) -> dict:
+        """deadline 为 time.monotonic() 时刻，几次查找共用同一个总超时"""
+        remaining = max(0.0, (deadline - time.monotonic()) * 1000)
+        return self.root.evaluate(_FIND_OPTION_JS, {
+            "label": label, "token": token, "timeout": remaining, "wait": remaining if wait else 0,
+            "scroll": scroll, "maxSteps": SELECT_SCROLL_STEPS})
+
+    def choose(self, label, timeout: float = DEFAULT_TIMEOUT) -> None:
+        label = str(label)
+        token = f"o{next(_tokens)}"
+        self.root.locator(".ant-select-selector").click()
+        deadline = time.monotonic() + timeout / 1000
+
+        typed = False
+        result = self._find(label, token, deadline, wait=False, scroll=False)
+        if result["status"] == "missing" and result["searchable"]:
+            # 输入过滤：虚拟列表只剩匹配项，目标通常就在第一屏
+            search_input = self.root.locator("input").first
+            search_input.fill(label)
+            typed = True
+            result = self._find(label, token, deadline, wait=True, scroll=True)
+            if result["status"] == "missing":
+                # antd 默认按 value 过滤（optionFilterProp="value"），输入文字可能把选项全部过滤掉：
+                # 清空输入后不过滤，滚动整个列表查找
+                search_input.fill("")
+                typed = False
+                result = self._find(label, token, deadline, wait=False, scroll=True)
+        elif result["status"] == "missing":
+            result = self._find(label, token, deadline, wait=False, scroll=True)
+
+        if result["status"] == "closed":
+            raise AssertionError(f"下拉框在 {timeout:.0f}ms 内没有展开，无法选择 '{label}'")
+        if result["status"] == "missing":
+            reason = f"{timeout:.0f}ms 内" if result["timedOut"] else ""
+            raise AssertionError(f"下拉框中{reason}没有找到选项 '{label}'（滚动 {result['steps']} 屏，"
+                                 f"共查看 {result['seen']} 个选项，例如: {result['sample']}）")
+        if result["steps"]:
+            logger.debug(f"🔎 虚拟列表滚动 {result['steps']} 屏后找到选项: {label}")
+
+        if typed and result["active"]:
+            self.root.locator("input").first.press("Enter")
+        else:
+            self.page.locator(f'[data-erp-option="{token}"]').click()
+
+
+def choose_option(scope: Union[Page, Frame, Locator], selector: str, label, timeout: float = DEFAULT_TIMEOUT) -> None:
+    """AntSelect(scope, selector).choose(label, timeout) 的简写"""
+    AntSelect(scope, selector).choose(label, timeout)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: ERP 后端 HTTP 接口客户端（复用登录 token，连接池 + keep-alive），用于快速构造测试前置数据
+
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+import requests
+from faker import Faker
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from Playwright_ERP.utils.naming import unique_name
+from Playwright_ERP.utils.settings import API_BASE_URL, API_PREFIX, RESOURCES
+
+logger = logging.getLogger(__name__)
+fake = Faker("zh_CN")
+
+
+class ErpApiError(Exception):
+    """接口返回非 2xx 时抛出，携带状态码与响应内容"""
+
+    def __init__(self, method: str, url: str, status: int, body: str):
+        self.status = status
+        super().__init__(f"{method} {url} -> {status}: {body[:500]}")
+
+
+class ErpApiClient:
+    """
+    ERP 接口客户端：
+    - 基于 requests.Session，连接池 + keep-alive，同一会话内的请求复用 TCP 连接
+    - 使用登录后缓存的 token（Bearer）鉴权
+    - 资源名使用页面模块名（role / user / goods_category / warehouse），映射关系见 settings.RESOURCES
+    """
+
+    def __init__(self, token: Optional[str], base_url: str = API_BASE_URL,
+                 pool_size: int = 10, timeout: float = 10, max_retries: Optional[int] = None):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        # 幂等请求遇到网关错误时自动重试，POST 不重试避免重复创建；
+        # 调用方自己实现重试时（如 bulk_seed）传 max_retries=0 关闭这一层
+        if max_retries is None:
+            max_retries = Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504),
+                                allowed_methods=frozenset({"GET", "PUT", "DELETE"}))
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=max_retries)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+        if token:
+            self.session.headers["Authorization"] = f"Bearer {token}"
+
+    def _url(self, module: str, item_id: Any = None) -> str:
+        url = f"{self.base_url}{API_PREFIX}{RESOURCES[module]}/"
+        return f"{url}{item_id}/" if item_id is not None else url
+
+    def request(self, method: str, url: str, **kwargs) -> Any:
+        resp = self.session.request(method, url, timeout=self.timeout, **kwargs)
+        if not resp.ok:
+            raise ErpApiError(method, url, resp.status_code, resp.text)
+        return resp.json() if resp.content else None
+
+    def list(self, module: str, **params) -> List[dict]:
+        """查询列表，兼容分页（{"results": [...]}) 与不分页两种返回格式"""
+        data = self.request("GET", self._url(module), params=params)
+        return data.get("results", []) if isinstance(data, dict) else data
+
+    def find_by_name(self, module: str, name: str) -> Optional[dict]:
+        for item in self.list(module, search=name):
+            if item.get("name") == name or item.get("username") == name:
+                return item
+        return None
+
+    def create(self, module: str, payload: dict) -> dict:
+        return self.request("POST", self._url(module), json=payload)
+
+    def update(self, module: str, item_id: Any, payload: dict) -> dict:
+        return self.request("PATCH", self._url(module, item_id), json=payload)
+
+    def delete(self, module: str, item_id: Any) -> None:
+        self.request("DELETE", self._url(module, item_id))
+
+    def close(self) -> None:
+        self.session.close()
+
+
+# ================= 各实体的默认请求体（可通过关键字参数覆盖任意字段） =================
+
+def role_payload(**overrides) -> dict:
+    return {"name": unique_name(), "remark": "", "permissions": [], **overrides}
+
+
+def user_payload(**overrides) -> dict:
+    return {"username": unique_name(), "name": fake.name(), "sex": "女", "roles": [], "is_active": True,
+            **overrides}
+
+
+def goods_category_payload(**overrides) -> dict:
+    return {"name": unique_name(), "remark": "", **overrides}
+
+
+def warehouse_payload(**overrides) -> dict:
+    name = unique_name()
+    return {"number": name, "name": name, "remark": "", "is_active": True, **overrides}
+
+
+PAYLOAD_BUILDERS: Dict[str, Callable[..., dict]] = {
+    "role": role_payload,
+    "user": user_payload,
+    "goods_category": goods_category_payload,
+    "warehouse": warehouse_payload,
+}
+
+
+class EntityFactory:
+    """
+    测试数据工厂：通过接口创建实体并记录 ID，teardown 时逆序删除
+    用法（fixture 注入后）：role = role_factory(remark="xx") -> 返回接口创建结果（含 id、name）
+    """
+
+    def __init__(self, client: ErpApiClient, module: str):
+        self.client = client
+        self.module = module
+        self.created: List[Any] = []
+
+    def __call__(self, **overrides) -> dict:
+        item = self.client.create(self.module, PAYLOAD_BUILDERS[self.module](**overrides))
+        self.created.append(item["id"])
+        logger.info(f"🌱 通过接口创建 {self.module}: {item.get('name') or item.get('username')} (id={item['id']})")
+        return item
+
+    def cleanup(self) -> None:
+        while self.created:
+            item_id = self.created.pop()
+            try:
+                self.client.delete(self.module, item_id)
+            except ErpApiError as e:
+                # 用例本身已经删除（如删除类用例）时返回 404，属正常情况
+                if e.status != 404:
+                    logger.warning(f"⚠️ 清理 {self.module} (id={item_id}) 失败: {e}")
+            except requests.RequestException as e:
+                # 网络错误 / 重试耗尽：记录后继续清理剩余实体，不让 teardown 失败
+                logger.warning(f"⚠️ 清理 {self.module} (id={item_id}) 失败: {e}")
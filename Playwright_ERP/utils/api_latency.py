@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 后端接口耗时采集：已登录上下文上的网络监听，按接口输出 p50/p95/p99 并与基线对比
+
+import json
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Request, Response
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.log_setup import current_test
+from Playwright_ERP.utils.parallel import worker_id
+from Playwright_ERP.utils.reporting import percentile
+from Playwright_ERP.utils.settings import (
+    API_LATENCY_BASELINE_FILE,
+    API_LATENCY_DIR,
+    API_LATENCY_MIN_DELTA_MS,
+    API_LATENCY_TOLERANCE,
+    API_LATENCY_UPDATE_BASELINE,
+    API_PREFIX,
+)
+from Playwright_ERP.utils.waits import ENDPOINTS
+
+logger = logging.getLogger(__name__)
+
+SECTION = "api_latency"
+
+# 路径中的 id 段（数字 / uuid）统一替换为 {id}，同一接口的不同记录归到一起
+_ID_SEGMENT = re.compile(r"/(\d+|[0-9a-fA-F-]{32,36})(?=/|$)")
+
+
+def endpoint_key(method: str, path: str, query: str = "") -> str:
+    """接口标识：优先使用 waits.ENDPOINTS 中的动作名（如 GET role.list / GET role.search），否则为方法 + 归一化路径"""
+    for action, endpoint in ENDPOINTS.items():
+        if endpoint.matches_request(method, path, query):
+            return f"{method} {action}"
+    return f"{method} {_ID_SEGMENT.sub('/{id}', path)}"
+
+
+def _phase(timing: dict, start: str, end: str) -> Optional[float]:
+    """两个时间点之差（毫秒），任一时间点不可用（-1）时返回 None"""
+    begin, finish = timing.get(start, -1), timing.get(end, -1)
+    if begin is None or finish is None or begin < 0 or finish < 0:
+        return None
+    return round(finish - begin, 1)
+
+
+class ApiLatencyObserver:
+    """
+    接口耗时监听（每个进程一个实例）：
+    - attach()：在已登录上下文上监听 response / requestfinished / requestfailed 事件
+    - 只记录 API_PREFIX 下的请求：方法、接口、状态码、响应大小、各阶段耗时（DNS / 连接 / 等待首字节 / 下载）
+    - 事件处理中不发起任何额外的协议调用（大小取自 Content-Length），不拖慢用例
+    """
+
+    def __init__(self):
+        self.records: List[dict] = []
+        # 已收到响应、尚未结束的请求 -> (状态码, 响应大小)
+        self._responses: Dict[Request, tuple] = {}
+
+    def attach(self, context: BrowserContext) -> None:
+        context.on("response", self._on_response)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+
+    @staticmethod
+    def _api_path(request: Request) -> Optional[str]:
+        path = urlparse(request.url).path
+        return path if path.startswith(API_PREFIX) else None
+
+    def _on_response(self, response: Response) -> None:
+        if self._api_path(response.request) is None:
+            return
+        length = response.headers.get("content-length")
+        self._responses[response.request] = (response.status, int(length) if length and length.isdigit() else None)
+
+    def _on_finished(self, request: Request) -> None:
+        path = self._api_path(request)
+        if path is None:
+            return
+        status, size = self._responses.pop(request, (None, None))
+        self._record(request, path, status, size)
+
+    def _on_failed(self, request: Request) -> None:
+        path = self._api_path(request)
+        if path is None:
+            return
+        self._responses.pop(request, None)
+        self._record(request, path, None, None, error=request.failure)
+
+    def _record(self, request: Request, path: str, status: Optional[int], size: Optional[int],
+                error: Optional[str] = None) -> None:
+        timing = request.timing
+        record = {
+            "test": current_test(),
+            "worker": worker_id(),
+            "method": request.method,
+            "endpoint": endpoint_key(request.method, path, urlparse(request.url).query),
+            "path": path,
+            "status": status,
+            "size": size,
+            # responseEnd 是相对 startTime 的毫秒数，即请求总耗时
+            "total_ms": round(timing["responseEnd"], 1) if timing.get("responseEnd", -1) >= 0 else None,
+            "dns_ms": _phase(timing, "domainLookupStart", "domainLookupEnd"),
+            "connect_ms": _phase(timing, "connectStart", "connectEnd"),
+            "ttfb_ms": _phase(timing, "requestStart", "responseStart"),
+            "download_ms": _phase(timing, "responseStart", "responseEnd"),
+        }
+        if error:
+            record["error"] = error
+        self.records.append(record)
+
+    def flush(self) -> None:
+        """写出本进程的接口明细，并按接口上报耗时样本"""
+        if not self.records:
+            return
+        records, self.records = self.records, []
+        os.makedirs(API_LATENCY_DIR, exist_ok=True)
+        path = os.path.join(API_LATENCY_DIR, f"{worker_id()}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info(f"📡 接口耗时明细已写入: {path}（{len(records)} 次调用）")
+
+        endpoints: Dict[str, dict] = defaultdict(lambda: {"samples": [], "calls": 0, "errors": 0, "bytes": 0})
+        for record in records:
+            data = endpoints[record["endpoint"]]
+            data["calls"] += 1
+            data["bytes"] += record["size"] or 0
+            if record["total_ms"] is not None:
+                data["samples"].append(record["total_ms"])
+            if record["status"] is None or record["status"] >= 400:
+                data["errors"] += 1
+        reporting.publish(SECTION, {"endpoints": dict(endpoints)})
+
+
+# 进程内共享的接口耗时监听
+_observer: Optional[ApiLatencyObserver] = None
+
+
+def api_latency_observer() -> ApiLatencyObserver:
+    global _observer
+    if _observer is None:
+        _observer = ApiLatencyObserver()
+    return _observer
+
+
+def flush_api_latency() -> None:
+    if _observer is not None:
+        _observer.flush()
+
+
+def _load_baseline() -> Dict[str, dict]:
+    try:
+        with open(API_LATENCY_BASELINE_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_baseline(baseline: Dict[str, dict]) -> None:
+    os.makedirs(os.path.dirname(API_LATENCY_BASELINE_FILE) or ".", exist_ok=True)
+    with open(API_LATENCY_BASELINE_FILE, "w", encoding="utf-8") as f:
+        json.dump(baseline, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def render_summary(data: dict) -> List[str]:
+    endpoints = data.get("endpoints", {})
+    if not endpoints:
+        return []
+    baseline = _load_baseline()
+    lines = [f"{'endpoint':<36} {'calls':>5} {'err':>4} {'p50':>7} {'p95':>7} {'p99':>7}  vs baseline p95"]
+    regressions = 0
+    changed = False
+    for key in sorted(endpoints):
+        stats = endpoints[key]
+        samples = stats.get("samples", [])
+        if not samples:
+            lines.append(f"{key:<36} {stats.get('calls', 0):>5} {stats.get('errors', 0):>4}  (no timing)")
+            continue
+        current = {f"p{pct}": round(percentile(samples, pct), 1) for pct in (50, 95, 99)}
+        previous = baseline.get(key)
+        if previous:
+            delta = current["p95"] - previous["p95"]
+            regressed = delta >= API_LATENCY_MIN_DELTA_MS and delta > previous["p95"] * API_LATENCY_TOLERANCE
+            regressions += regressed
+            verdict = f"{previous['p95']:.0f} ms ({delta:+.0f} ms){'  REGRESSION' if regressed else ''}"
+        else:
+            verdict = "new"
+        lines.append(f"{key:<36} {stats.get('calls', 0):>5} {stats.get('errors', 0):>4} "
+                     f"{current['p50']:>7.0f} {current['p95']:>7.0f} {current['p99']:>7.0f}  {verdict}")
+        if previous is None or API_LATENCY_UPDATE_BASELINE:
+            baseline[key] = {**current, "samples": len(samples), "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+            changed = True
+
+    if regressions:
+        lines.append(f"{regressions} endpoint(s) regressed: p95 more than {API_LATENCY_TOLERANCE:.0%} "
+                     f"and {API_LATENCY_MIN_DELTA_MS:.0f} ms over baseline ({API_LATENCY_BASELINE_FILE})")
+    if changed:
+        _save_baseline(baseline)
+        lines.append(f"baseline {'updated' if API_LATENCY_UPDATE_BASELINE else 'extended with new endpoints'}: "
+                     f"{API_LATENCY_BASELINE_FILE}")
+    return lines
+
+
+reporting.register_summary(SECTION, "backend API latency (ms)", render_summary)
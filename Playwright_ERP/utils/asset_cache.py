@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 前端静态资源（JS/CSS）本地磁盘缓存，通过路由拦截直接从磁盘返回
+
+import hashlib
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import List, Optional
+from urllib.parse import urljoin, urlparse
+
+from playwright.sync_api import BrowserContext, Route
+from playwright.sync_api import Error as PlaywrightError
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.settings import ASSET_CACHE_DIR, ASSET_CACHE_ENABLED, BASE_URL
+
+logger = logging.getLogger(__name__)
+
+SECTION = "asset_cache"
+
+# 只缓存这两类静态资源
+_CACHEABLE_TYPES = ("script", "stylesheet")
+# 页面 HTML 中引用的 JS/CSS 地址
+_ASSET_REF = re.compile(r"""(?:src|href)\s*=\s*["']([^"']+?\.(?:js|css)(?:\?[^"']*)?)["']""", re.I)
+# 文件名中带内容哈希（如 app.3f9a1c2e.js / index-BfXk2a9Q.css），这类地址内容不可变；
+# 哈希段必须同时含数字和字母，app-frontend.js / lodash_debounce.js 这类普通文件名仍按 ETag 重新验证
+_HASHED_NAME = re.compile(r"[.\-_](?=[0-9a-zA-Z]*[0-9])(?=[0-9a-zA-Z]*[a-zA-Z])[0-9a-zA-Z]{8,}\.(?:js|css)$")
+# 从磁盘返回时保留的响应头
+_KEEP_HEADERS = ("content-type", "etag", "last-modified", "cache-control")
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class AssetCache:
+    """
+    内容寻址的静态资源缓存：
+    - 正文按内容哈希存储（<sha256>.bin，相同内容只存一份），元数据按 URL 存储（etag、响应头、正文哈希、所属版本）
+    - 版本指纹：页面 HTML 中引用的 JS/CSS 地址列表的哈希；打包产物一变（文件名哈希变化）指纹即变，旧缓存整体失效
+    - 文件名带内容哈希的资源在指纹不变时直接从磁盘返回，完全不走网络
+    - 文件名不带哈希的资源（如开发服务器的 app.js）每个会话用 If-None-Match 校验一次，304 后本会话内直接命中
+    - 多个 worker 共用同一缓存目录：所有写入都是“临时文件 + 原子替换”
+    """
+
+    def __init__(self, cache_dir: str = ASSET_CACHE_DIR, app_url: str = BASE_URL):
+        self.cache_dir = cache_dir
+        self.app_host = urlparse(app_url).netloc
+        self.manifest_path = os.path.join(cache_dir, "manifest.json")
+        self.fingerprint = self._read_json(self.manifest_path).get("fingerprint")
+        self._validated = set()
+        self.stats = Counter()
+        os.makedirs(cache_dir, exist_ok=True)
+
+    # ---------- 文件读写 ----------
+    @staticmethod
+    def _read_json(path: str) -> dict:
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _atomic_write(path: str, data: bytes) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _meta_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, _sha256(url.encode("utf-8")) + ".json")
+
+    def _body_path(self, body_hash: str) -> str:
+        return os.path.join(self.cache_dir, body_hash + ".bin")
+
+    def _load_entry(self, url: str) -> Optional[dict]:
+        entry = self._read_json(self._meta_path(url))
+        if not entry or entry.get("fingerprint") != self.fingerprint:
+            return None
+        if not os.path.exists(self._body_path(entry["body"])):
+            return None
+        return entry
+
+    def _store(self, url: str, headers: dict, body: bytes) -> None:
+        body_hash = _sha256(body)
+        body_path = self._body_path(body_hash)
+        if not os.path.exists(body_path):
+            self._atomic_write(body_path, body)
+        entry = {
+            "url": url,
+            "body": body_hash,
+            "fingerprint": self.fingerprint,
+            "headers": {k: v for k, v in headers.items() if k.lower() in _KEEP_HEADERS},
+        }
+        self._atomic_write(self._meta_path(url), json.dumps(entry).encode("utf-8"))
+
+    # ---------- 版本指纹 ----------
+    def _update_fingerprint(self, page_url: str, html: str) -> None:
+        assets = sorted({urljoin(page_url, ref) for ref in _ASSET_REF.findall(html)})
+        source = "\n".join(assets) if assets else html
+        fingerprint = _sha256(source.encode("utf-8"))[:16]
+        if fingerprint != self.fingerprint:
+            if self.fingerprint:
+                logger.info(f"📦 前端打包产物已变化，静态资源缓存失效（{self.fingerprint} -> {fingerprint}）")
+                self.stats["invalidations"] += 1
+            self.fingerprint = fingerprint
+            self._validated.clear()
+            self._atomic_write(self.manifest_path, json.dumps({"fingerprint": fingerprint}).encode("utf-8"))
+
+    # ---------- 路由处理 ----------
+    def handle(self, route: Route) -> None:
+        request = route.request
+        if urlparse(request.url).netloc != self.app_host or request.method != "GET":
+            route.fallback()
+            return
+        if request.resource_type == "document":
+            self._handle_document(route)
+        elif request.resource_type in _CACHEABLE_TYPES:
+            self._handle_asset(route)
+        else:
+            route.fallback()
+
+    def _handle_document(self, route: Route) -> None:
+        """
+        顶层页面 HTML 照常从网络获取，顺便计算版本指纹：
+        - iframe 中的文档不参与指纹，原样放行
+        - 不跟随重定向：3xx 原样交给浏览器处理（地址栏与后续相对路径都以浏览器的跳转为准）
+        - 获取失败（网络错误等）时放行，由浏览器自己请求并呈现错误
+        """
+        if route.request.frame.parent_frame is not None:
+            route.fallback()
+            return
+        try:
+            response = route.fetch(max_redirects=0)
+        except PlaywrightError as e:
+            logger.debug(f"⚠️ 页面获取失败，交由浏览器处理: {route.request.url} ({e})")
+            route.fallback()
+            return
+        if response.ok and "text/html" in response.headers.get("content-type", ""):
+            self._update_fingerprint(route.request.url, response.text())
+        route.fulfill(response=response)
+
+    def _handle_asset(self, route: Route) -> None:
+        url = route.request.url
+        entry = self._load_entry(url)
+
+        if entry and (url in self._validated or _HASHED_NAME.search(urlparse(url).path)):
+            self._fulfill_from_disk(route, entry)
+            self.stats["hits"] += 1
+            return
+
+        headers = dict(route.request.headers)
+        etag = entry and entry["headers"].get("etag")
+        if etag:
+            headers["if-none-match"] = etag
+        response = route.fetch(headers=headers)
+
+        if response.status == 304 and entry:
+            self._validated.add(url)
+            self._fulfill_from_disk(route, entry)
+            self.stats["revalidated"] += 1
+            return
+
+        body = response.body()
+        if response.status == 200 and "no-store" not in response.headers.get("cache-control", ""):
+            self._store(url, response.headers, body)
+            self._validated.add(url)
+        self.stats["misses"] += 1
+        self.stats["bytes_downloaded"] += len(body)
+        route.fulfill(response=response, body=body)
+
+    def _fulfill_from_disk(self, route: Route, entry: dict) -> None:
+        with open(self._body_path(entry["body"]), "rb") as f:
+            body = f.read()
+        self.stats["bytes_from_cache"] += len(body)
+        route.fulfill(status=200, headers=entry["headers"], body=body)
+
+    def install(self, context: BrowserContext) -> None:
+        context.route("**/*", self.handle)
+
+    def flush(self) -> None:
+        reporting.publish(SECTION, dict(self.stats))
+        self.stats.clear()
+
+
+# 进程内共享的缓存实例（同一进程内的所有上下文共用，统计也合在一起）
+_shared: Optional[AssetCache] = None
+
+
+def install_asset_cache(context: BrowserContext) -> None:
+    """为上下文安装静态资源缓存（ERP_ASSET_CACHE=off 时不做任何事）"""
+    global _shared
+    if not ASSET_CACHE_ENABLED:
+        return
+    if _shared is None:
+        _shared = AssetCache()
+    _shared.install(context)
+
+
+def flush_asset_cache() -> None:
+    if _shared is not None:
+        _shared.flush()
+
+
+def render_summary(data: dict) -> List[str]:
+    requests_total = data.get("hits", 0) + data.get("revalidated", 0) + data.get("misses", 0)
+    if not requests_total:
+        return []
+    lines = [
+        f"static asset requests: {requests_total} (hits={data.get('hits', 0)}, "
+        f"revalidated={data.get('revalidated', 0)}, misses={data.get('misses', 0)})",
+        f"served from disk: {data.get('bytes_from_cache', 0) / 1024 / 1024:.2f} MiB, "
+        f"downloaded: {data.get('bytes_downloaded', 0) / 1024 / 1024:.2f} MiB",
+    ]
+    if data.get("invalidations"):
+        lines.append(f"cache invalidations (bundle changed): {data['invalidations']}")
+    return lines
+
+
+reporting.register_summary(SECTION, "static asset cache summary", render_summary)
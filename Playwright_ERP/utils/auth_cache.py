@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 登录态磁盘缓存（storageState + token），一天只走一次 UI 登录
+
+import base64
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+import requests
+
+from Playwright_ERP.utils.settings import (
+    API_BASE_URL,
+    AUTH_CACHE_DIR,
+    AUTH_CACHE_TTL_HOURS,
+    AUTH_CHECK_PATH,
+    ErpAccount,
+)
+
+logger = logging.getLogger(__name__)
+
+# 认证校验接口的超时时间（秒），校验必须足够“轻”
+_CHECK_TIMEOUT = 3
+# 锁文件超过该时间仍未释放视为残留（上次运行被强杀）
+_STALE_LOCK_SECONDS = 120
+
+
+@dataclass
+class CachedAuth:
+    """磁盘上缓存的登录态"""
+    storage_state: dict
+    token: Optional[str]
+    saved_at: float
+    expires_at: float
+
+    @property
+    def expired(self) -> bool:
+        return time.time() >= self.expires_at
+
+
+def _jwt_expiry(token: Optional[str]) -> Optional[float]:
+    """尽力解析 JWT 的 exp（不校验签名），非 JWT 返回 None"""
+    if not token or token.count(".") != 2:
+        return None
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload))
+        return float(claims.get("exp")) if isinstance(claims, dict) else None
+    except (ValueError, TypeError):
+        return None
+
+
+def extract_token(page, context) -> Optional[str]:
+    """从已登录页面提取 token（优先 localStorage，其次 cookie）"""
+    try:
+        token = page.evaluate('window.localStorage.getItem("token")')
+    except Exception:
+        token = None
+    if not token:
+        try:
+            for c in context.cookies():
+                if c.get("name") in ("access", "token", "auth_token", "Authorization"):
+                    token = c.get("value")
+                    break
+        except Exception:
+            token = None
+    return token
+
+
+def auth_is_valid(token: Optional[str], storage_state: dict) -> bool:
+    """
+    用轻量认证接口校验缓存的登录态是否仍然有效：
+    - 同时携带 Bearer token 与缓存的 cookie，兼容两种鉴权方式
+    - 返回 2xx 且响应为 JSON 才视为有效（代理 / SPA 的 history 兜底会对未知路径返回 200 的 index.html）；
+      401/403、非 JSON、网络错误等一律视为无效，交由 UI 登录兜底
+    """
+    cookies = {c["name"]: c["value"] for c in storage_state.get("cookies", [])}
+    if not token and not cookies:
+        return False
+    headers = {"Authorization": f"Bearer {token}"} if token else {}
+    try:
+        resp = requests.get(API_BASE_URL + AUTH_CHECK_PATH, headers=headers, cookies=cookies, timeout=_CHECK_TIMEOUT)
+    except requests.RequestException as e:
+        logger.warning(f"⚠️ 登录态校验请求失败: {e}")
+        return False
+    if not resp.ok or "json" not in resp.headers.get("content-type", "").lower():
+        return False
+    try:
+        resp.json()
+    except ValueError:
+        return False
+    return True
+
+
+class AuthStateCache:
+    """
+    按账号缓存登录态：
+    - 文件：<AUTH_CACHE_DIR>/<公司编号_用户名>.json
+    - 过期时间：保存时刻 + ERP_AUTH_TTL_HOURS，且不晚于 JWT 自身的 exp
+    - 多个 worker 共用同一账号时通过锁文件串行化，只有第一个 worker 走 UI 登录
+    """
+
+    def __init__(self, account: ErpAccount, cache_dir: str = AUTH_CACHE_DIR):
+        self.account = account
+        self.path = os.path.join(cache_dir, f"{account.key}.json")
+        self.lock_path = self.path + ".lock"
+
+    def load(self) -> Optional[CachedAuth]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return CachedAuth(**json.load(f))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def load_valid(self) -> Optional[CachedAuth]:
+        """读取并校验缓存：未过期且认证接口确认 token 有效才返回"""
+        cached = self.load()
+        if cached is None:
+            return None
+        if cached.expired:
+            logger.info(f"⌛ 登录态缓存已过期: {self.path}")
+            return None
+        if not auth_is_valid(cached.token, cached.storage_state):
+            logger.info(f"🚫 登录态缓存校验未通过: {self.path}")
+            return None
+        return cached
+
+    def save(self, storage_state: dict, token: Optional[str]) -> CachedAuth:
+        now = time.time()
+        expires_at = now + AUTH_CACHE_TTL_HOURS * 3600
+        jwt_exp = _jwt_expiry(token)
+        if jwt_exp:
+            expires_at = min(expires_at, jwt_exp)
+        cached = CachedAuth(storage_state=storage_state, token=token, saved_at=now, expires_at=expires_at)
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # 先写临时文件再原子替换，避免其他 worker 读到半截文件
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cached.__dict__, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        logger.info(f"💾 登录态已缓存至 {self.path}，有效期至 {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(expires_at))}")
+        return cached
+
+    def invalidate(self) -> None:
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @contextmanager
+    def lock(self, timeout: float = 180):
+        """跨进程文件锁（O_EXCL 创建锁文件），保证同一账号同时只有一个进程在登录"""
+        os.makedirs(os.path.dirname(self.lock_path) or ".", exist_ok=True)
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fd = os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_path) > _STALE_LOCK_SECONDS:
+                        os.remove(self.lock_path)
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"等待登录锁超时: {self.lock_path}")
+                time.sleep(0.2)
+        try:
+            yield
+        finally:
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 批量断言：多个条件在页面内同一个轮询循环里一起等待，一次协议往返，失败时列出全部未满足的条件
+
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional, Union
+
+from playwright.sync_api import Frame, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+from Playwright_ERP.utils.step_timing import expect_timed
+
+# 与 Playwright expect 的默认超时一致（毫秒）
+DEFAULT_TIMEOUT = 5000
+
+# 在页面内判断每个条件，返回 [{ok, actual, count}]；定位规则与 locator 对应：
+# selector（CSS）-> has_text 过滤（忽略大小写与空白，同 filter(has_text=...)）-> inner 子选择器 -> 取第 nth 个
+_CHECK_JS = """
+(conditions) => {
+    const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    return conditions.map((c) => {
+        let elements = [...document.querySelectorAll(c.selector)];
+        if (c.has_text !== null) {
+            const needle = norm(c.has_text).toLowerCase();
+            elements = elements.filter((el) => norm(el.textContent).toLowerCase().includes(needle));
+        }
+        if (c.inner !== null) {
+            elements = [...new Set(elements.flatMap((el) => [...el.querySelectorAll(c.inner)]))];
+        }
+        const el = elements[c.nth];
+        const text = el ? norm(el.innerText || el.textContent) : null;
+        let ok, actual;
+        switch (c.check) {
+            case 'visible': ok = !!el && visible(el); actual = el ? (ok ? 'visible' : 'hidden') : 'not found'; break;
+            case 'hidden': ok = !el || !visible(el); actual = el ? (ok ? 'hidden' : 'visible') : 'not found'; break;
+            case 'enabled': ok = !!el && !el.disabled; actual = el ? (el.disabled ? 'disabled' : 'enabled') : 'not found'; break;
+            case 'value': actual = el && 'value' in el ? el.value : null; ok = actual === c.expected; break;
+            case 'text': actual = text; ok = text === c.expected; break;
+            case 'contains_text': actual = text; ok = text !== null && text.includes(c.expected); break;
+            case 'count': actual = elements.length; ok = actual === c.expected; break;
+            default: ok = false; actual = `unknown check ${c.check}`;
+        }
+        return { ok, actual, count: elements.length };
+    });
+}
+"""
+
+# 等待条件：全部满足时返回结果（truthy），否则返回 false 继续轮询
+_WAIT_JS = "(conditions) => { const results = (" + _CHECK_JS + ")(conditions); " \
+           "return results.every((r) => r.ok) ? results : false; }"
+
+
+@dataclass(frozen=True)
+class Condition:
+    """一个待断言的条件（用下面的 visible / value_is 等函数构造）"""
+    check: str
+    selector: str
+    expected: Any = None
+    has_text: Optional[str] = None
+    inner: Optional[str] = None
+    nth: int = 0
+    # 失败信息中显示的名称（如表单字段的标签），不参与页面内判断
+    label: Optional[str] = None
+
+    def describe(self) -> str:
+        target = self.selector
+        if self.has_text is not None:
+            target += f' >> has_text="{self.has_text}"'
+        if self.inner is not None:
+            target += f" >> {self.inner}"
+        if self.nth:
+            target += f" >> nth={self.nth}"
+        expected = "" if self.expected is None else f" {json.dumps(self.expected, ensure_ascii=False)}"
+        prefix = f"[{self.label}] " if self.label else ""
+        return f"{prefix}{self.check}{expected}: {target}"
+
+
+def visible(selector: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    return Condition("visible", selector, has_text=has_text, inner=inner, nth=nth)
+
+
+def hidden(selector: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    return Condition("hidden", selector, has_text=has_text, inner=inner, nth=nth)
+
+
+def enabled(selector: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    return Condition("enabled", selector, has_text=has_text, inner=inner, nth=nth)
+
+
+def value_is(selector: str, value: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    return Condition("value", selector, value, has_text=has_text, inner=inner, nth=nth)
+
+
+def text_is(selector: str, text: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    """元素文本（压缩空白后）与 text 完全一致"""
+    return Condition("text", selector, text, has_text=has_text, inner=inner, nth=nth)
+
+
+def text_contains(selector: str, text: str, *, has_text: str = None, inner: str = None, nth: int = 0) -> Condition:
+    return Condition("contains_text", selector, text, has_text=has_text, inner=inner, nth=nth)
+
+
+def count_is(selector: str, count: int, *, has_text: str = None, inner: str = None) -> Condition:
+    return Condition("count", selector, count, has_text=has_text, inner=inner)
+
+
+def _payload(conditions) -> List[dict]:
+    return [{"check": c.check, "selector": c.selector, "expected": c.expected, "has_text": c.has_text,
+             "inner": c.inner, "nth": c.nth} for c in conditions]
+
+
+@expect_timed
+def expect_all(scope: Union[Page, Frame], *conditions: Condition, timeout: float = DEFAULT_TIMEOUT) -> None:
+    """
+    一次等待多个条件（替代连续的 expect(...).to_be_visible() / to_have_value() 等）：
+
+        expect_all(page,
+                   visible(".ant-modal"),
+                   value_is(".ant-modal .ant-form-item", role_name, has_text="名称", inner='input[type="text"]'),
+                   visible("button", has_text="确 定"))
+
+    - 条件在页面内按帧（requestAnimationFrame）一起轮询，全部满足即返回，只有一次协议往返
+    - 超时后抛出 AssertionError，列出每一个未满足的条件及其实际状态
+    - 选择器为 CSS（在页面内用 querySelectorAll 求值），不支持 Playwright 专有的 :has-text / >> 语法
+    - 耗时计入当前 timed_step 的 expect 耗时
+    """
+    if not conditions:
+        return
+    payload = _payload(conditions)
+    try:
+        scope.wait_for_function(_WAIT_JS, arg=payload, timeout=timeout, polling="raf").dispose()
+        return
+    except PlaywrightTimeoutError:
+        results = scope.evaluate(_CHECK_JS, payload)
+
+    unmet = [(c, r) for c, r in zip(conditions, results) if not r["ok"]]
+    if not unmet:
+        # 超时后的最后一次检查恰好全部满足
+        return
+    lines = [f"{len(unmet)}/{len(conditions)} 个条件在 {timeout:.0f}ms 内未满足:"]
+    for condition, result in unmet:
+        actual = json.dumps(result["actual"], ensure_ascii=False)
+        lines.append(f"  ✗ {condition.describe()}  实际: {actual}（匹配 {result['count']} 个元素）")
+    raise AssertionError("\n".join(lines))
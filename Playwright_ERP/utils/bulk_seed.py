@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 大数据量场景的批量并发造数工具（限速 + 重试退避 + 进度 + ID 台账，清理同样并发）
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from Playwright_ERP.utils.api_client import PAYLOAD_BUILDERS, ErpApiClient, ErpApiError
+from Playwright_ERP.utils.settings import (
+    RESOURCES,
+    SEED_CONCURRENCY,
+    SEED_LEDGER_PATH,
+    SEED_RATE,
+    SEED_RETRIES,
+)
+
+logger = logging.getLogger(__name__)
+
+# 幂等请求（删除）可重试的状态码：限流与网关类错误
+_RETRYABLE_STATUS = (429, 502, 503, 504)
+# 创建请求只在确定未被处理时重试：502/504 可能在后端已提交后才返回，重试会造成台账外的重复数据
+_RETRYABLE_CREATE_STATUS = (429, 503)
+# 退避基数（秒）与上限
+_BACKOFF_BASE = 0.2
+_BACKOFF_MAX = 5.0
+# 进度日志的最小间隔（秒）
+_PROGRESS_INTERVAL = 2.0
+
+
+class RateLimiter:
+    """令牌桶限速：所有线程共享，rate<=0 表示不限速"""
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        self.rate = rate
+        self.capacity = burst or max(1, int(rate))
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _Progress:
+    """线程安全的进度计数，按固定间隔输出日志"""
+
+    def __init__(self, label: str, total: int):
+        self.label = label
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.started = time.monotonic()
+        self._last_log = 0.0
+        self._lock = threading.Lock()
+
+    def tick(self, ok: bool) -> None:
+        with self._lock:
+            self.done += 1
+            if not ok:
+                self.failed += 1
+            now = time.monotonic()
+            if self.done == self.total or now - self._last_log >= _PROGRESS_INTERVAL:
+                self._last_log = now
+                self._log(now)
+
+    def _log(self, now: float) -> None:
+        elapsed = max(now - self.started, 1e-6)
+        logger.info(f"🌱 {self.label} 进度 {self.done}/{self.total} ({self.done * 100 // max(self.total, 1)}%)，"
+                    f"{self.done / elapsed:.1f} 条/秒，失败 {self.failed}")
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+
+@dataclass
+class SeedResult:
+    """一次批量操作的结果"""
+    module: str
+    action: str
+    ids: List[Any] = field(default_factory=list)
+    failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rate(self) -> float:
+        return len(self.ids) / self.seconds if self.seconds else 0.0
+
+    def __str__(self) -> str:
+        return (f"{self.action} {self.module}: 成功 {len(self.ids)}，失败 {self.failed}，"
+                f"耗时 {self.seconds:.1f}s（{self.rate:.1f} 条/秒）")
+
+
+class BulkSeeder:
+    """
+    批量并发造数：
+    - 线程池并发（ERP_SEED_CONCURRENCY），每个线程独立的 ErpApiClient（各自的 keep-alive 连接）
+    - 全局令牌桶限速（ERP_SEED_RATE 请求/秒），避免把被测环境压垮
+    - 限流/网关错误按指数退避 + 抖动重试（ERP_SEED_RETRIES 次）
+    - 每条数据创建成功即把 ID 追加写入台账（JSONL），中断时取消排队中的创建，进程被杀也能按台账清理
+    - purge() 按台账并发删除，删除成功（或已不存在）的记录从台账移除
+    """
+
+    def __init__(self, token: Optional[str], concurrency: int = SEED_CONCURRENCY, rate: float = SEED_RATE,
+                 retries: int = SEED_RETRIES, ledger_path: str = SEED_LEDGER_PATH, run_id: Optional[str] = None):
+        self.token = token
+        self.concurrency = max(1, concurrency)
+        self.retries = retries
+        self.ledger_path = ledger_path
+        self.run_id = run_id or time.strftime("%Y%m%d%H%M%S")
+        self.limiter = RateLimiter(rate, burst=self.concurrency)
+        self._local = threading.local()
+        self._clients: List[ErpApiClient] = []
+        self._clients_lock = threading.Lock()
+        self._ledger_lock = threading.Lock()
+
+    # ---------------- 内部工具 ----------------
+
+    def _client(self) -> ErpApiClient:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            # 关闭客户端自带的重试，统一由 _call 限速退避，避免两层重试叠加
+            client = ErpApiClient(self.token, pool_size=2, max_retries=0)
+            self._local.client = client
+            with self._clients_lock:
+                self._clients.append(client)
+        return client
+
+    def _call(self, fn: Callable[[ErpApiClient], Any], idempotent: bool = True) -> Any:
+        """
+        限速后调用接口，可重试错误按指数退避重试
+        非幂等请求（创建）只在 429 / 503 时重试，网络错误与网关超时不重试，避免重复创建
+        """
+        retryable = _RETRYABLE_STATUS if idempotent else _RETRYABLE_CREATE_STATUS
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            try:
+                return fn(self._client())
+            except ErpApiError as e:
+                if e.status not in retryable or attempt == self.retries:
+                    raise
+                reason = e.status
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or attempt == self.retries:
+                    raise
+                reason = type(e).__name__
+            delay = min(_BACKOFF_MAX, _BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.5)
+            logger.debug(f"🔁 第 {attempt + 1} 次重试（{reason}），{delay:.2f}s 后重试")
+            time.sleep(delay)
+
+    def _create(self, module: str, payload: dict) -> dict:
+        """创建一条实体并立即写入台账：任何时刻中断，已创建的数据都能按台账清理"""
+        item = self._call(lambda c: c.create(module, payload), idempotent=False)
+        self._append_ledger(module, [item])
+        return item
+
+    def _append_ledger(self, module: str, items: Iterable[dict]) -> None:
+        lines = [json.dumps({"run": self.run_id, "module": module, "id": item["id"],
+                             "name": item.get("name") or item.get("username")}, ensure_ascii=False)
+                 for item in items]
+        if not lines:
+            return
+        with self._ledger_lock:
+            os.makedirs(os.path.dirname(self.ledger_path) or ".", exist_ok=True)
+            with open(self.ledger_path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+
+    def _read_ledger(self) -> List[dict]:
+        try:
+            with open(self.ledger_path, encoding="utf-8") as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def _write_ledger(self, entries: List[dict]) -> None:
+        with self._ledger_lock:
+            if not entries:
+                if os.path.exists(self.ledger_path):
+                    os.remove(self.ledger_path)
+                return
+            tmp_path = f"{self.ledger_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in entries)
+            os.replace(tmp_path, self.ledger_path)
+
+    # ---------------- 对外接口 ----------------
+
+    def seed(self, module: str, count: int, batch_size: int = 500, **overrides) -> SeedResult:
+        """
+        并发创建 count 条 module 实体，返回创建结果（含全部 ID）
+        overrides 会传给请求体构造函数，例如 seed("user", 10000, roles=[1])
+        """
+        if module not in PAYLOAD_BUILDERS:
+            raise ValueError(f"不支持的模块: {module}，可选: {', '.join(PAYLOAD_BUILDERS)}")
+        build = PAYLOAD_BUILDERS[module]
+        result = SeedResult(module, "create")
+        progress = _Progress(f"创建 {module}", count)
+        logger.info(f"🚜 开始批量创建 {module} x{count}（并发 {self.concurrency}，"
+                    f"限速 {self.limiter.rate or '不限'} 请求/秒，run={self.run_id}）")
+
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="seed") as pool:
+            for start in range(0, count, batch_size):
+                futures = [pool.submit(self._create, module, build(**overrides))
+                           for _ in range(min(batch_size, count - start))]
+                try:
+                    for future in as_completed(futures):
+                        try:
+                            result.ids.append(future.result()["id"])
+                            progress.tick(True)
+                        except Exception as e:
+                            result.failed += 1
+                            progress.tick(False)
+                            logger.warning(f"⚠️ 创建 {module} 失败: {e}")
+                except BaseException:
+                    # 中断（Ctrl+C 等）时取消尚未开始的创建，只等正在进行的请求结束（其结果已写入台账）
+                    for future in futures:
+                        future.cancel()
+                    raise
+
+        result.seconds = progress.elapsed
+        logger.info(f"✅ {result}")
+        return result
+
+    def purge(self, module: Optional[str] = None, run_id: Optional[str] = None) -> List[SeedResult]:
+        """
+        按台账并发删除已创建的数据（可按模块 / run 过滤）
+        已不存在（404）视为删除成功；删除失败的记录保留在台账中，下次继续清理
+        """
+        entries = self._read_ledger()
+        targets = [e for e in entries
+                   if (module is None or e["module"] == module) and (run_id is None or e["run"] == run_id)]
+        if not targets:
+            logger.info("🧹 台账中没有需要清理的数据")
+            return []
+
+        by_module: Dict[str, List[dict]] = {}
+        for e in targets:
+            by_module.setdefault(e["module"], []).append(e)
+
+        def delete(entry: dict) -> None:
+            try:
+                self._call(lambda c: c.delete(entry["module"], entry["id"]))
+            except ErpApiError as e:
+                if e.status != 404:
+                    raise
+
+        results, removed = [], set()
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="purge") as pool:
+            # 逆序按模块清理（后创建的先删，降低外键引用导致的删除失败）
+            for mod, items in reversed(list(by_module.items())):
+                result = SeedResult(mod, "delete")
+                progress = _Progress(f"删除 {mod}", len(items))
+                futures = {pool.submit(delete, e): e for e in items}
+                for future in as_completed(futures):
+                    entry = futures[future]
+                    try:
+                        future.result()
+                        removed.add((entry["module"], entry["id"]))
+                        result.ids.append(entry["id"])
+                        progress.tick(True)
+                    except Exception as e:
+                        result.failed += 1
+                        progress.tick(False)
+                        logger.warning(f"⚠️ 删除 {mod} (id={entry['id']}) 失败: {e}")
+                result.seconds = progress.elapsed
+                logger.info(f"✅ {result}")
+                results.append(result)
+
+        self._write_ledger([e for e in self._read_ledger() if (e["module"], e["id"]) not in removed])
+        return results
+
+    def close(self) -> None:
+        with self._clients_lock:
+            for client in self._clients:
+                client.close()
+            self._clients.clear()
+
+
+def _resolve_token(cli_token: Optional[str]) -> Optional[str]:
+    """token 优先级：命令行 > ERP_TOKEN 环境变量 > 第一个账号的登录态缓存"""
+    if cli_token or os.getenv("ERP_TOKEN"):
+        return cli_token or os.getenv("ERP_TOKEN")
+    from Playwright_ERP.utils.auth_cache import AuthStateCache
+    from Playwright_ERP.utils.settings import load_accounts
+    cached = AuthStateCache(load_accounts()[0]).load_valid()
+    return cached.token if cached else None
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    命令行用法：
+      python -m Playwright_ERP.utils.bulk_seed seed user 10000 --concurrency 16 --rate 100
+      python -m Playwright_ERP.utils.bulk_seed purge --module user
+    """
+    parser = argparse.ArgumentParser(prog="bulk_seed", description="ERP 批量并发造数 / 清理")
+    parser.add_argument("--token", help="接口 token（默认取 ERP_TOKEN 或登录态缓存）")
+    parser.add_argument("--concurrency", type=int, default=SEED_CONCURRENCY)
+    parser.add_argument("--rate", type=float, default=SEED_RATE, help="限速（请求/秒），0 表示不限速")
+    parser.add_argument("--retries", type=int, default=SEED_RETRIES)
+    parser.add_argument("--ledger", default=SEED_LEDGER_PATH, help="已创建 ID 台账路径")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    seed_cmd = sub.add_parser("seed", help="批量创建")
+    seed_cmd.add_argument("module", choices=sorted(RESOURCES))
+    seed_cmd.add_argument("count", type=int)
+    seed_cmd.add_argument("--batch-size", type=int, default=500)
+
+    purge_cmd = sub.add_parser("purge", help="按台账批量删除")
+    purge_cmd.add_argument("--module", choices=sorted(RESOURCES))
+    purge_cmd.add_argument("--run", help="只清理指定 run 创建的数据")
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+    token = _resolve_token(args.token)
+    if not token:
+        logger.error("❌ 未获取到 token：请通过 --token / ERP_TOKEN 指定，或先运行一次 UI 用例生成登录态缓存")
+        return 2
+
+    seeder = BulkSeeder(token, concurrency=args.concurrency, rate=args.rate,
+                        retries=args.retries, ledger_path=args.ledger)
+    try:
+        if args.command == "seed":
+            result = seeder.seed(args.module, args.count, batch_size=args.batch_size)
+            return 1 if result.failed else 0
+        results = seeder.purge(module=args.module, run_id=args.run)
+        return 1 if any(r.failed for r in results) else 0
+    finally:
+        seeder.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
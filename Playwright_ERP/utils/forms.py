@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: ant-design 表单一次性填写：按“标签 -> 值”解析全部表单项，文本框在页面内一次写入，下拉/日期逐个操作，最后一次性校验
+
+import dataclasses
+import itertools
+import logging
+from datetime import date
+from typing import Any, Dict, Mapping, Union
+
+from playwright.sync_api import Frame, Page
+
+from Playwright_ERP.utils.ant_select import AntSelect
+from Playwright_ERP.utils.batch_expect import DEFAULT_TIMEOUT, expect_all, text_is, value_is
+
+logger = logging.getLogger(__name__)
+
+# 表单所在的容器：取最后一个可见的弹窗 / 抽屉（最上层）
+FORM_ROOT = ".ant-modal, .ant-drawer"
+# 日期选择器输入的格式
+DATE_FORMAT = "%Y-%m-%d"
+
+# 每次填写使用不同的标记，避免命中上一次填写留下的 data-erp-field
+_tokens = itertools.count(1)
+
+# 在页面内：等待容器出现且全部标签都能找到（按帧轮询），给每个字段的控件打上 data-erp-field 标记，
+# 并直接写入可编辑的文本框（原生 value setter + input/change 事件，React 受控组件能感知到变化）；
+# 不可见、禁用或只读的文本框不在页面内写入（written 为 false），交给 Playwright fill() 做可操作性检查；
+# 标签先精确匹配，再按包含匹配；返回 {fields: {标签: {id, kind, written}}} 或 {error, missing, labels}
+_RESOLVE_AND_FILL_JS = """
+async ({ root, values, timeout, token }) => {
+    const norm = (s) => (s || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => {
+        const rect = el.getBoundingClientRect();
+        return rect.width > 0 && rect.height > 0 && getComputedStyle(el).visibility !== 'hidden';
+    };
+    const labelOf = (item) => {
+        const label = item.querySelector('.ant-form-item-label');
+        return norm(label ? label.textContent : item.textContent).replace(/[:：]$/, '');
+    };
+    const controlOf = (item) => {
+        const picker = item.querySelector('.ant-picker');
+        if (picker) return ['date', picker];
+        const select = item.querySelector('.ant-select');
+        if (select) return ['select', select];
+        const input = item.querySelector('textarea, input:not([type]), input[type="text"], input[type="number"], '
+                                         + 'input[type="password"], input[type="email"], input[type="tel"]');
+        return input ? ['text', input] : [null, null];
+    };
+    const resolve = () => {
+        const containers = [...document.querySelectorAll(root)].filter(visible);
+        const container = containers[containers.length - 1];
+        if (!container) return null;
+        const items = [...container.querySelectorAll('.ant-form-item')]
+            .filter((item) => !item.querySelector('.ant-form-item'))
+            .map((item) => [labelOf(item), item]);
+        const fields = {};
+        const missing = [];
+        for (const label of Object.keys(values)) {
+            const hit = items.find(([text]) => text === label) || items.find(([text]) => text.includes(label));
+            const [kind, control] = hit ? controlOf(hit[1]) : [null, null];
+            if (kind) fields[label] = { kind, control };
+            else missing.push(label);
+        }
+        return { fields, missing, labels: items.map(([text]) => text) };
+    };
+
+    const deadline = performance.now() + timeout;
+    let state = resolve();
+    while ((!state || state.missing.length) && performance.now() < deadline) {
+        await new Promise((done) => requestAnimationFrame(done));
+        state = resolve();
+    }
+    if (!state) return { error: 'root', missing: Object.keys(values), labels: [] };
+    if (state.missing.length) return { error: 'missing', missing: state.missing, labels: state.labels };
+
+    const fields = {};
+    Object.entries(state.fields).forEach(([label, { kind, control }], index) => {
+        const id = `${token}-${index}`;
+        control.setAttribute('data-erp-field', id);
+        const editable = kind === 'text' && visible(control) && !control.disabled && !control.readOnly
+            && !control.closest('fieldset[disabled], [aria-disabled="true"]');
+        if (editable) {
+            const proto = control instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+            Object.getOwnPropertyDescriptor(proto, 'value').set.call(control, values[label]);
+            control.dispatchEvent(new Event('input', { bubbles: true }));
+            control.dispatchEvent(new Event('change', { bubbles: true }));
+        }
+        fields[label] = { id, kind, written: editable };
+    });
+    return { fields };
+}
+"""
+
+
+def _display(value: Any) -> str:
+    """值在表单中显示的文本（日期按 DATE_FORMAT 格式化）"""
+    if isinstance(value, date):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
+
+
+class AntFormFiller:
+    """
+    ant-design 表单填写（默认填写最上层的弹窗 / 抽屉中的表单）：
+
+        AntFormFiller(page).fill({"用户名": name, "员工姓名": employee_name, "性别": "女"})
+
+    - 一次 evaluate 解析全部表单项（标签 -> 控件）并写入所有可编辑的文本框；
+      不可见 / 禁用 / 只读的文本框改由 Playwright fill() 填写，保留其可操作性检查（用户改不了的字段会报错）
+    - 下拉选择（.ant-select）：由 AntSelect 选择同名选项（支持虚拟滚动的长列表）；日期（.ant-picker）：输入日期后回车
+    - 最后用 expect_all 一次校验全部字段的值，失败时列出每个不一致的字段
+    - 找不到的标签一次性全部报出，并附上表单中现有的标签
+    """
+
+    def __init__(self, scope: Union[Page, Frame], root: str = FORM_ROOT, timeout: float = DEFAULT_TIMEOUT):
+        self.scope = scope
+        self.root = root
+        self.timeout = timeout
+
+    def fill(self, values: Mapping[str, Any]) -> Dict[str, str]:
+        """按标签填写，返回 标签 -> 字段选择器（供后续单独操作）"""
+        if not values:
+            return {}
+        texts = {label: _display(value) for label, value in values.items()}
+        result = self.scope.evaluate(_RESOLVE_AND_FILL_JS, {
+            "root": self.root, "values": texts, "timeout": self.timeout, "token": f"f{next(_tokens)}"})
+        if result.get("error") == "root":
+            raise AssertionError(f"{self.timeout:.0f}ms 内没有出现可见的表单容器: {self.root}")
+        if result.get("error"):
+            raise AssertionError(f"表单中找不到字段（或字段类型不支持）: {result['missing']}，现有字段: {result['labels']}")
+
+        selectors = {label: f'[data-erp-field="{field["id"]}"]' for label, field in result["fields"].items()}
+        conditions = []
+        for label, field in result["fields"].items():
+            selector, text = selectors[label], texts[label]
+            if field["kind"] == "select":
+                self._select(selector, text)
+                condition = text_is(f"{selector} .ant-select-selection-item", text)
+            elif field["kind"] == "date":
+                self._pick_date(selector, text)
+                condition = value_is(f"{selector} input", text)
+            else:
+                if not field["written"]:
+                    # 用户无法编辑的输入框：fill() 会等待其可见、可用、可编辑，超时即报错，不会被悄悄写入
+                    self.scope.locator(selector).fill(text, timeout=self.timeout)
+                condition = value_is(selector, text)
+            conditions.append(dataclasses.replace(condition, label=label))
+
+        expect_all(self.scope, *conditions, timeout=self.timeout)
+        logger.debug(f"📝 表单已填写: {texts}")
+        return selectors
+
+    def _select(self, selector: str, text: str) -> None:
+        AntSelect(self.scope, selector).choose(text, self.timeout)
+
+    def _pick_date(self, selector: str, text: str) -> None:
+        picker_input = self.scope.locator(f"{selector} input").first
+        picker_input.click()
+        picker_input.fill(text)
+        picker_input.press("Enter")
+
+
+def fill_form(scope: Union[Page, Frame], values: Mapping[str, Any], root: str = FORM_ROOT,
+              timeout: float = DEFAULT_TIMEOUT) -> Dict[str, str]:
+    """AntFormFiller(scope, root, timeout).fill(values) 的简写"""
+    return AntFormFiller(scope, root, timeout).fill(values)
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 非阻塞日志：QueueHandler 入队 + 后台 QueueListener 写文件/控制台/JSON Lines（带用例、worker、step 上下文）
+
+import atexit
+import json
+import logging
+import os
+import queue
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+import allure_commons
+import pytest
+
+from Playwright_ERP.utils.parallel import worker_id
+from Playwright_ERP.utils.settings import LOG_LEVEL, TEST_LOG_DIR
+
+# 文本日志格式（与原 basicConfig 保持一致）
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# 当前进程正在执行的用例与 allure step（同一进程内用例串行执行，后台线程的日志也归到当前用例）
+_current = {"test": None, "phase": None, "steps": []}
+_listener: Optional[QueueListener] = None
+
+
+class _ContextFilter(logging.Filter):
+    """在调用线程上（入队前）给日志记录补充用例 / worker / step 上下文"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.test_id = _current["test"]
+        record.phase = _current["phase"]
+        record.step = " > ".join(_current["steps"]) or None
+        record.worker = worker_id()
+        return True
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """一条日志一行 JSON，便于按用例 / worker / step 过滤与聚合"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "worker": getattr(record, "worker", None),
+            "test": getattr(record, "test_id", None),
+            "phase": getattr(record, "phase", None),
+            "step": getattr(record, "step", None),
+            "thread": record.threadName,
+        }
+        return json.dumps(data, ensure_ascii=False)
+
+
+def setup_logging(level: str = LOG_LEVEL, log_dir: str = TEST_LOG_DIR) -> None:
+    """
+    进程内只初始化一次：
+    - 根 logger 只挂一个 QueueHandler，业务线程只做入队
+    - 后台 QueueListener 负责写 test_global.log、控制台、以及每个 worker 一份的 JSON Lines（test_log/json/<worker>.jsonl）
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    os.makedirs(os.path.join(log_dir, "json"), exist_ok=True)
+    text_formatter = logging.Formatter(TEXT_FORMAT)
+    file_handler = logging.FileHandler(os.path.join(log_dir, "test_global.log"), encoding="utf-8")
+    file_handler.setFormatter(text_formatter)
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(text_formatter)
+    json_handler = logging.FileHandler(os.path.join(log_dir, "json", f"{worker_id()}.jsonl"), encoding="utf-8")
+    json_handler.setFormatter(JsonLinesFormatter())
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    # QueueHandler 入队前会把消息与异常堆栈格式化为文本，后台线程不再访问原始参数对象
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.addFilter(_ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(queue_handler)
+
+    _listener = QueueListener(log_queue, file_handler, stream_handler, json_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    allure_commons.plugin_manager.register(_StepTracker(), "erp_log_step_tracker")
+
+
+def current_test() -> Optional[str]:
+    """当前进程正在执行的用例 nodeid（不在用例中时为 None）"""
+    return _current["test"]
+
+
+def shutdown_logging() -> None:
+    """停止后台线程并写完队列中剩余的日志"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class _StepTracker:
+    """跟踪 allure.step 的嵌套，日志中的 step 字段为当前 step 路径"""
+
+    @allure_commons.hookimpl
+    def start_step(self, uuid, title, params):
+        _current["steps"].append(title)
+
+    @allure_commons.hookimpl
+    def stop_step(self, uuid, exc_type, exc_val, exc_tb):
+        if _current["steps"]:
+            _current["steps"].pop()
+
+
+class LogContextPlugin:
+    """pytest 插件：记录当前用例 nodeid 与执行阶段（setup / call / teardown）"""
+
+    def pytest_runtest_logstart(self, nodeid, location):
+        _current.update(test=nodeid, phase=None, steps=[])
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        _current.update(test=None, phase=None, steps=[])
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        _current["phase"] = "setup"
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_call(self, item):
+        _current["phase"] = "call"
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_teardown(self, item):
+        _current["phase"] = "teardown"
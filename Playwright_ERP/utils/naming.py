@@ -0,0 +1,26 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 测试数据命名工具（保证并行 worker 之间名称不冲突）
+
+import datetime
+import itertools
+import secrets
+
+from Playwright_ERP.utils.parallel import worker_id
+
+# 进程内自增序号，避免同一秒内多次生成相同名称
+_counter = itertools.count(1)
+
+
+def unique_name(prefix: str = "auto") -> str:
+    """
+    生成全局唯一的实体名称，例如：auto_gw1_153012_3_a9f2
+    - worker 标识：区分 pytest-xdist 的不同 worker 进程
+    - 时分秒 + 进程内序号：同一 worker 内不重复
+    - 随机后缀：跨多次运行/多台机器时也不重复
+    """
+    tag = worker_id()
+    timestamp = datetime.datetime.now().strftime("%H%M%S")
+    return f"{prefix}_{tag}_{timestamp}_{next(_counter)}_{secrets.token_hex(2)}"
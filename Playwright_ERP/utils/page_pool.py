@@ -0,0 +1,145 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 已登录页面的预热池（复用已加载 SPA 的页面，省去每个用例的建页 + 首页加载）
+
+import logging
+from collections import deque
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Page
+from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 在页面内把 SPA 切回首页：清理 sessionStorage，通过 history API + popstate 让前端路由切换，
+# 不重新下载/执行整套 bundle（vue-router / react-router 都监听 popstate）
+_SPA_RESET_JS = """
+(path) => {
+    try { window.sessionStorage.clear(); } catch (e) {}
+    if (window.location.pathname !== path) {
+        window.history.pushState(null, '', path);
+        window.dispatchEvent(new PopStateEvent('popstate', { state: null }));
+    }
+    window.scrollTo(0, 0);
+}
+"""
+
+# 首页已渲染：地址已是首页且标志元素可见（只看 URL 不够，pushState 后 URL 立即变化，前端可能并未重新渲染）
+_HOME_READY_JS = """
+({ path, selector }) => {
+    if (window.location.pathname !== path) return false;
+    const el = document.querySelector(selector);
+    if (!el) return false;
+    const rect = el.getBoundingClientRect();
+    return rect.width > 0 && rect.height > 0;
+}
+"""
+# 等待首页渲染的超时（毫秒）：路由切换是本地操作，不需要用例级别的超时
+_READY_TIMEOUT = 3000
+
+
+class PagePool:
+    """
+    页面预热池（挂在 session 级已登录上下文上）：
+    - acquire()：优先取出空闲的已预热页面（已停在首页），没有则新建并预热
+    - release()：用例结束后把页面重置回干净的 SPA 首页状态再放回池中，并等待首页标志元素（ready_selector）出现；
+      前端路由没有响应 popstate 时改为重新加载首页；
+      用例失败、页面已关闭、重置失败（首页仍未出现）或池已满时直接关闭，不复用“脏”页面
+    - 注意：用例自行注册的 page.on(...) 监听器无法被自动清理，此类用例请加 @pytest.mark.fresh_page
+    """
+
+    def __init__(self, context: BrowserContext, home_url: str, size: int = 1,
+                 viewport: dict = None, default_timeout: float = 30000, ready_selector: str = "body"):
+        self.context = context
+        self.home_url = home_url
+        self.home_path = urlparse(home_url).path or "/"
+        self.ready_selector = ready_selector
+        self.size = size
+        self.viewport = viewport or {"width": 1280, "height": 800}
+        self.default_timeout = default_timeout
+        self._idle = deque()
+        self._popups = {}
+        self.created = 0
+        self.reused = 0
+
+    def warm(self) -> None:
+        """预先创建页面直到池满"""
+        while len(self._idle) < self.size:
+            self._idle.append(self._new_page())
+
+    def _new_page(self) -> Page:
+        page = self.context.new_page()
+        self.created += 1
+        popups = self._popups.setdefault(id(page), [])
+        page.on("popup", popups.append)
+        # 首页不依赖列表接口，load 事件后即可交给用例（用例会立即导航到目标页面）
+        page.goto(self.home_url)
+        return page
+
+    def acquire(self) -> Page:
+        while self._idle:
+            page = self._idle.popleft()
+            if not page.is_closed():
+                self.reused += 1
+                return page
+        return self._new_page()
+
+    def release(self, page: Page, discard: bool = False) -> None:
+        if page.is_closed():
+            self._popups.pop(id(page), None)
+            return
+        if discard or len(self._idle) >= self.size or not self._reset(page):
+            self._close(page)
+            return
+        self._idle.append(page)
+
+    def _reset(self, page: Page) -> bool:
+        """把页面恢复到“刚预热完”的状态，失败返回 False（由调用方关闭页面）"""
+        try:
+            # 原地清空：popup 监听器持有的是同一个列表
+            popups = self._popups.setdefault(id(page), [])
+            for popup in popups:
+                if not popup.is_closed():
+                    popup.close()
+            popups.clear()
+            page.unroute_all(behavior="ignoreErrors")
+            page.set_default_timeout(self.default_timeout)
+            if page.viewport_size != self.viewport:
+                page.set_viewport_size(self.viewport)
+            # 已被登出、跳转到其他站点等情况不再复用
+            if urlparse(page.url).netloc != urlparse(self.home_url).netloc:
+                return False
+            page.evaluate(_SPA_RESET_JS, self.home_path)
+            if self._home_ready(page):
+                return True
+            logger.debug("🔄 前端路由未响应 popstate，重新加载首页")
+            page.goto(self.home_url)
+            if self._home_ready(page):
+                return True
+            logger.warning(f"⚠️ {_READY_TIMEOUT}ms 内首页未渲染（{self.ready_selector}），丢弃该页面")
+            return False
+        except Exception as e:
+            logger.warning(f"⚠️ 页面重置失败，丢弃该页面: {e}")
+            return False
+
+    def _home_ready(self, page: Page) -> bool:
+        try:
+            page.wait_for_function(_HOME_READY_JS, arg={"path": self.home_path, "selector": self.ready_selector},
+                                   timeout=_READY_TIMEOUT, polling="raf").dispose()
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    def _close(self, page: Page) -> None:
+        self._popups.pop(id(page), None)
+        try:
+            page.close()
+        except Exception:
+            pass
+
+    def close(self) -> None:
+        while self._idle:
+            self._close(self._idle.popleft())
+        logger.info(f"📊 页面池统计: 新建 {self.created} 个页面，复用 {self.reused} 次")
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 并行执行支持（pytest-xdist worker 信息、账号分配、加速比统计）
+
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional
+
+from Playwright_ERP.utils.settings import ErpAccount, TEST_LOG_DIR
+
+RUN_HISTORY_FILE = os.path.join(TEST_LOG_DIR, "run_history.json")
+# 每种运行组合最多保留的历史条数
+_MAX_HISTORY = 50
+
+
+def worker_id() -> str:
+    """当前 worker 标识：xdist 下为 gw0/gw1...，串行运行时为 master"""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def worker_index() -> int:
+    """当前 worker 序号：gw3 -> 3，串行运行时为 0"""
+    wid = worker_id()
+    return int(wid[2:]) if wid.startswith("gw") and wid[2:].isdigit() else 0
+
+
+def worker_count() -> int:
+    """worker 总数（仅 worker 进程内可用），串行运行时为 1"""
+    return int(os.getenv("PYTEST_XDIST_WORKER_COUNT", "1"))
+
+
+def is_xdist_worker(config) -> bool:
+    """判断当前 pytest 进程是否为 xdist 的 worker 进程"""
+    return hasattr(config, "workerinput")
+
+
+def pick_account(accounts: List[ErpAccount]) -> ErpAccount:
+    """
+    为当前 worker 分配账号：按 worker 序号轮询账号池
+    - 账号数 >= worker 数时，每个 worker 独占一个账号（互不踢下线）
+    - 账号不足时多个 worker 共享账号（依赖系统允许同账号多点登录）
+    """
+    if not accounts:
+        raise ValueError("账号池为空，请检查 ERP_ACCOUNTS 配置")
+    return accounts[worker_index() % len(accounts)]
+
+
+def selection_key(nodeids: Iterable[str]) -> str:
+    """根据本次收集到的用例集合生成指纹，只有同一批用例的耗时才有可比性"""
+    digest = hashlib.sha1("\n".join(sorted(nodeids)).encode("utf-8")).hexdigest()
+    return digest[:12]
+
+
+def _load_history() -> Dict[str, list]:
+    try:
+        with open(RUN_HISTORY_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def record_run(key: str, record: dict) -> None:
+    """追加一条运行记录（wall time、worker 数等），按用例集合指纹分组"""
+    history = _load_history()
+    runs = history.setdefault(key, [])
+    runs.append(dict(record, finished_at=time.strftime("%Y-%m-%d %H:%M:%S")))
+    history[key] = runs[-_MAX_HISTORY:]
+    os.makedirs(os.path.dirname(RUN_HISTORY_FILE), exist_ok=True)
+    with open(RUN_HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+
+
+def latest_run(key: str, **match) -> Optional[dict]:
+    """取同一用例集合下、字段匹配（如 workers=1）的最近一次运行记录"""
+    for run in reversed(_load_history().get(key, [])):
+        if all(run.get(k) == v for k, v in match.items()):
+            return run
+    return None
+
+
+class ParallelRunStats:
+    """
+    主进程（controller）上的运行统计插件（在 conftest 的 pytest_configure 中注册）：
+    - wall time：从会话开始到结束的真实耗时
+    - serial time：所有用例 setup/call/teardown 耗时之和（≈ 单 worker 串行耗时的估算）
+    - workers：实际上报过结果的 worker 数
+    """
+
+    def __init__(self, profile: str = "debug"):
+        self.profile = profile
+        self.started_at = time.perf_counter()
+        self.serial_time = 0.0
+        self.workers = set()
+        self.nodeids = set()
+
+    def pytest_runtest_logreport(self, report) -> None:
+        self.serial_time += report.duration
+        self.nodeids.add(report.nodeid)
+        node = getattr(report, "node", None)
+        gateway = getattr(node, "gateway", None)
+        self.workers.add(getattr(gateway, "id", "master"))
+
+    def pytest_terminal_summary(self, terminalreporter) -> None:
+        if not self.nodeids:
+            return
+        terminalreporter.write_sep("=", "run summary")
+        for line in self.summary_lines():
+            terminalreporter.write_line(line)
+
+    def summary_lines(self) -> List[str]:
+        """生成加速比报告，并把本次结果写入运行历史"""
+        wall = time.perf_counter() - self.started_at
+        workers = len(self.workers) or 1
+        key = selection_key(self.nodeids)
+
+        lines = [
+            f"profile: {self.profile}",
+            f"workers: {workers}",
+            f"wall time: {wall:.2f}s",
+            f"sum of test durations: {self.serial_time:.2f}s",
+        ]
+        if wall > 0:
+            lines.append(f"estimated speedup (sum / wall): {self.serial_time / wall:.2f}x")
+
+        baseline = latest_run(key, workers=1, profile=self.profile)
+        if workers > 1 and baseline:
+            lines.append(
+                f"measured speedup vs 1 worker ({baseline['wall']:.2f}s @ {baseline['finished_at']}): "
+                f"{baseline['wall'] / wall:.2f}x"
+            )
+        elif workers > 1:
+            lines.append("measured speedup: 暂无同一用例集合的单 worker 基线，可先执行一次不带 -n 的运行")
+
+        lines.extend(self._profile_savings_lines(key, workers, wall))
+
+        record_run(key, {"profile": self.profile, "workers": workers, "wall": round(wall, 3),
+                         "serial": round(self.serial_time, 3), "tests": len(self.nodeids)})
+        return lines
+
+    def _profile_savings_lines(self, key: str, workers: int, wall: float) -> List[str]:
+        """与同一用例集合、同样 worker 数下其他配置档的最近一次运行对比，输出节省的时间"""
+        lines = []
+        for run in reversed(_load_history().get(key, [])):
+            other = run.get("profile")
+            if not other or other == self.profile or run.get("workers") != workers:
+                continue
+            if any(line.startswith(f"time saved vs {other}") for line in lines):
+                continue
+            saved = run["wall"] - wall
+            lines.append(f"time saved vs {other} ({run['wall']:.2f}s): {saved:+.2f}s "
+                         f"({saved / run['wall']:+.0%})" if run["wall"] else f"time saved vs {other}: n/a")
+        return lines
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 运行配置档（debug / ci / perf），统一控制有头/无头、慢放、高亮、追踪、录屏与截图策略
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+# 未指定时的默认配置档（保持本地调试时的原有行为）
+DEFAULT_PROFILE = "debug"
+
+
+@dataclass(frozen=True)
+class RunProfile:
+    """一个运行配置档：所有“为了看得清楚而变慢”的开关都集中在这里"""
+    name: str
+    headless: bool
+    slow_mo: int          # 每个操作的人为延迟（毫秒）
+    highlight: bool       # 是否执行 locator.highlight()
+    tracing: str          # Playwright trace 级别：off / actions / screenshots / snapshots / full（见 utils/tracing.py）
+    video: str            # 录屏保留策略：off / on-failure / always（见 utils/video.py）
+    channel: Optional[str] = None  # 浏览器渠道，None 表示使用 Playwright 自带 Chromium
+    screenshots: str = "ring-buffer"  # 截图策略：always / on-failure / sampled / ring-buffer（见 utils/screenshots.py）
+    vitals: str = "warn"  # 页面性能预算：off / warn / fail（见 utils/web_vitals.py）
+
+
+PROFILES: Dict[str, RunProfile] = {
+    # 本地调试：有头 + 慢放 + 高亮 + 追踪 + 录屏，便于肉眼观察（慢放会拉长页面耗时，性能预算只告警）
+    "debug": RunProfile("debug", headless=False, slow_mo=300, highlight=True, tracing="full", video="on-failure",
+                        screenshots="always", vitals="warn"),
+    # 持续集成：无头、无人为延迟，失败用例保留 trace 便于排查；页面超出性能预算判为失败
+    "ci": RunProfile("ci", headless=True, slow_mo=0, highlight=False, tracing="full", video="off",
+                     screenshots="ring-buffer", vitals="fail"),
+    # 吞吐量/性能：关闭一切诊断开销，只跑业务断言
+    "perf": RunProfile("perf", headless=True, slow_mo=0, highlight=False, tracing="off", video="off",
+                       screenshots="on-failure"),
+}
+
+_active: RunProfile = PROFILES[DEFAULT_PROFILE]
+
+
+def resolve_profile_name(cli_value: Optional[str] = None) -> str:
+    """配置档选择优先级：命令行 --profile > 环境变量 ERP_PROFILE > 默认 debug"""
+    name = (cli_value or os.getenv("ERP_PROFILE") or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"未知的运行配置档: '{name}'，可选: {', '.join(PROFILES)}")
+    return name
+
+
+def activate_profile(name: str) -> RunProfile:
+    """设置当前进程生效的配置档（在 pytest_configure 中调用，xdist worker 同样会执行）"""
+    global _active
+    _active = PROFILES[name]
+    return _active
+
+
+def active_profile() -> RunProfile:
+    return _active
+
+
+def highlight(locator) -> None:
+    """按配置档决定是否高亮元素：debug 下高亮便于观察，ci/perf 下跳过以节省一次往返"""
+    if _active.highlight:
+        locator.highlight()
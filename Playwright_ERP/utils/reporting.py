@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 运行统计汇总（各 worker 的统计数据汇总到主进程，并在结束时输出报告）
+
+import math
+from typing import Callable, Dict, List
+
+import pytest
+
+# section -> 统计数据；数字累加、列表拼接、字典递归合并
+_stats: Dict[str, dict] = {}
+# section -> (标题, 渲染函数)，渲染函数把汇总后的数据转成若干行文本
+_renderers: Dict[str, tuple] = {}
+
+
+def merge(target: dict, data: dict) -> dict:
+    """合并统计数据：数字相加、列表拼接、字典递归合并，其它类型以新值覆盖"""
+    for key, value in data.items():
+        current = target.get(key)
+        if isinstance(value, dict):
+            target[key] = merge(current if isinstance(current, dict) else {}, value)
+        elif isinstance(value, list):
+            target[key] = (current if isinstance(current, list) else []) + value
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and isinstance(current, (int, float)):
+            target[key] = current + value
+        else:
+            target[key] = value
+    return target
+
+
+def publish(section: str, data: dict) -> None:
+    """上报一份统计数据（可多次调用，自动合并）"""
+    merge(_stats.setdefault(section, {}), data)
+
+
+def collected(section: str) -> dict:
+    return _stats.get(section, {})
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """最近秩法百分位"""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def item_failed(item) -> bool:
+    """用例在 setup 或 call 阶段是否失败（依赖 conftest 中 makereport 钩子挂上的 rep_setup / rep_call）"""
+    return any(getattr(getattr(item, f"rep_{when}", None), "failed", False) for when in ("setup", "call"))
+
+
+def register_summary(section: str, title: str, render: Callable[[dict], List[str]]) -> None:
+    """注册某个统计项在终端汇总中的输出方式"""
+    _renderers[section] = (title, render)
+
+
+class StatsReportPlugin:
+    """
+    统计汇总插件（在 conftest 的 pytest_configure 中注册）：
+    - xdist worker：会话结束时把本进程的统计放进 workeroutput，随 worker 下线传回主进程
+    - 主进程：合并各 worker 的统计，在终端汇总中按注册的渲染函数输出
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        workeroutput = getattr(session.config, "workeroutput", None)
+        if workeroutput is not None:
+            workeroutput["erp_stats"] = _stats
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        for section, data in getattr(node, "workeroutput", {}).get("erp_stats", {}).items():
+            publish(section, data)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        for section, (title, render) in _renderers.items():
+            data = _stats.get(section)
+            if not data:
+                continue
+            lines = render(data)
+            if not lines:
+                continue
+            terminalreporter.write_sep("=", title)
+            for line in lines:
+                terminalreporter.write_line(line)
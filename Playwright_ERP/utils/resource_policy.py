@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 资源拦截策略（通过 context.route 屏蔽图片/字体/媒体/统计脚本等与功能断言无关的请求）
+
+import json
+import logging
+import os
+import re
+from collections import Counter
+from typing import Iterable, List, Optional
+from urllib.parse import urlparse
+
+from playwright.sync_api import BrowserContext, Request, Response, Route
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.settings import BASE_URL, TEST_LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+# 默认屏蔽的资源类型（Playwright resource_type）
+DEFAULT_BLOCKED_TYPES = ("image", "media", "font")
+
+# 默认屏蔽的统计/埋点/监控地址
+DEFAULT_BLOCKED_URLS = (
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"hm\.baidu\.com",
+    r"cnzz\.com",
+    r"sentry\.io",
+    r"/collect(\?|$)",
+)
+
+# 资源体积记录：放行时学到的各地址大小，用于估算屏蔽后节省的流量
+RESOURCE_SIZES_FILE = os.path.join(TEST_LOG_DIR, "resource_sizes.json")
+
+SECTION = "resource_policy"
+
+
+def _strip_query(url: str) -> str:
+    return url.split("?", 1)[0].split("#", 1)[0]
+
+
+class ResourcePolicy:
+    """
+    声明式的资源屏蔽/放行策略：
+    - blocked_types：按资源类型屏蔽（默认 图片/媒体/字体，图标雪碧图属于 image）
+    - blocked_urls：按地址正则屏蔽（默认常见统计/埋点脚本）
+    - block_third_party_scripts：屏蔽非被测站点域名下的脚本
+    - allowed_urls：白名单，优先级最高
+    - 单个用例可通过 @pytest.mark.allow_resources(...) 临时放行（视觉类用例），见 allow_for_test()
+    """
+
+    def __init__(self,
+                 blocked_types: Iterable[str] = DEFAULT_BLOCKED_TYPES,
+                 blocked_urls: Iterable[str] = DEFAULT_BLOCKED_URLS,
+                 allowed_urls: Iterable[str] = (),
+                 block_third_party_scripts: bool = True,
+                 app_url: str = BASE_URL):
+        self.blocked_types = set(blocked_types)
+        self.blocked_urls = [re.compile(p) for p in blocked_urls]
+        self.allowed_urls = [re.compile(p) for p in allowed_urls]
+        self.block_third_party_scripts = block_third_party_scripts
+        self.app_host = urlparse(app_url).netloc
+        # 当前用例临时放行的资源类型；None 表示不放行，"*" 表示全部放行
+        self._test_allowed: Optional[set] = None
+
+        self.blocked = Counter()
+        self.blocked_bytes = 0
+        self.unknown_size = 0
+        self._sizes = self._load_sizes()
+        self._sizes_dirty = False
+
+    # ---------- 单用例放行 ----------
+    def allow_for_test(self, types: Iterable[str] = ()) -> None:
+        """当前用例放行指定资源类型（不传则全部放行），用例结束后调用 reset_for_test()"""
+        types = set(types)
+        self._test_allowed = types or {"*"}
+
+    def reset_for_test(self) -> None:
+        self._test_allowed = None
+
+    # ---------- 判定与拦截 ----------
+    def reason_to_block(self, request: Request) -> Optional[str]:
+        """返回屏蔽原因（用于统计分类），不屏蔽返回 None"""
+        url = request.url
+        if any(p.search(url) for p in self.allowed_urls):
+            return None
+        resource_type = request.resource_type
+        if self._test_allowed is not None and ("*" in self._test_allowed or resource_type in self._test_allowed):
+            return None
+        if resource_type in self.blocked_types:
+            return resource_type
+        if any(p.search(url) for p in self.blocked_urls):
+            return "analytics"
+        if (self.block_third_party_scripts and resource_type == "script"
+                and urlparse(url).netloc not in ("", self.app_host)):
+            return "third-party-script"
+        return None
+
+    def handle(self, route: Route) -> None:
+        reason = self.reason_to_block(route.request)
+        if reason is None:
+            # fallback 而不是 continue_，让其它路由处理器（如静态资源缓存）继续处理
+            route.fallback()
+            return
+        self.blocked[reason] += 1
+        size = self._sizes.get(_strip_query(route.request.url))
+        if size is None:
+            self.unknown_size += 1
+        else:
+            self.blocked_bytes += size
+        route.abort("blockedbyclient")
+
+    def _learn_size(self, response: Response) -> None:
+        """放行的同类资源记录体积（来自响应头，无额外协议往返），供之后估算节省量"""
+        request = response.request
+        if request.resource_type not in self.blocked_types:
+            return
+        length = response.headers.get("content-length")
+        if length and length.isdigit():
+            self._sizes[_strip_query(request.url)] = int(length)
+            self._sizes_dirty = True
+
+    def install(self, context: BrowserContext) -> None:
+        context.route("**/*", self.handle)
+        context.on("response", self._learn_size)
+
+    # ---------- 统计 ----------
+    def _load_sizes(self) -> dict:
+        try:
+            with open(RESOURCE_SIZES_FILE, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def flush(self) -> None:
+        """上下文关闭时调用：持久化学到的体积并上报统计"""
+        if self._sizes_dirty:
+            os.makedirs(os.path.dirname(RESOURCE_SIZES_FILE), exist_ok=True)
+            tmp_path = f"{RESOURCE_SIZES_FILE}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._sizes, f)
+            os.replace(tmp_path, RESOURCE_SIZES_FILE)
+            self._sizes_dirty = False
+        reporting.publish(SECTION, {"blocked": dict(self.blocked), "bytes": self.blocked_bytes,
+                                    "unknown_size": self.unknown_size})
+        self.blocked.clear()
+        self.blocked_bytes = 0
+        self.unknown_size = 0
+
+
+def render_summary(data: dict) -> List[str]:
+    blocked = data.get("blocked", {})
+    total = sum(blocked.values())
+    if not total:
+        return []
+    lines = [f"blocked requests: {total} ({', '.join(f'{k}={v}' for k, v in sorted(blocked.items()))})",
+             f"estimated bytes saved: {data.get('bytes', 0) / 1024 / 1024:.2f} MiB"]
+    if data.get("unknown_size"):
+        lines.append(f"requests without a known size: {data['unknown_size']} "
+                     f"(sizes are learned from runs where the resource was allowed)")
+    return lines
+
+
+reporting.register_summary(SECTION, "resource blocking summary", render_summary)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 截图服务：按策略决定是否截图/落盘，测试线程只等待截图本身，写盘与 Allure 附件交给后台线程池
+
+import hashlib
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Deque, List, Optional
+
+import allure
+from playwright.sync_api import Page
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.allure_support import reserve_attachment, write_attachment
+from Playwright_ERP.utils.profiles import active_profile
+from Playwright_ERP.utils.settings import (
+    SCREENSHOT_DIR,
+    SCREENSHOT_MODE,
+    SCREENSHOT_RING_SIZE,
+    SCREENSHOT_SAMPLE_RATE,
+    SCREENSHOT_TYPE,
+    SCREENSHOT_WORKERS,
+)
+
+logger = logging.getLogger(__name__)
+
+SECTION = "screenshots"
+
+# 截图策略：
+# - always：每次 take_screenshot 都截图并保存
+# - on-failure：步骤截图全部跳过，只在用例失败时保存失败现场
+# - sampled：按 ERP_SCREENSHOT_SAMPLE_RATE 比例抽样保存
+# - ring-buffer：最近 N 张截图留在内存，用例失败才写出，通过则丢弃
+CAPTURE_MODES = ("always", "on-failure", "sampled", "ring-buffer")
+
+_ATTACHMENT_TYPES = {"png": allure.attachment_type.PNG, "jpeg": allure.attachment_type.JPG}
+_EXTENSIONS = {"png": "png", "jpeg": "jpg"}
+# jpeg 截图质量（仅 ERP_SCREENSHOT_TYPE=jpeg 时生效）
+_JPEG_QUALITY = 80
+
+
+@dataclass
+class _Frame:
+    """环形缓冲中的一张截图"""
+    name: str
+    path: str
+    body: bytes
+
+
+class ScreenshotService:
+    """
+    截图流水线：
+    - 测试线程：page.screenshot() 直接拿到内存中的图片字节，并在当前 step 上登记 Allure 附件
+    - 后台线程：写入 screenshots/ 目录、写入 Allure 附件文件（不再“先写盘再读回来”）
+    - 策略：见 CAPTURE_MODES；与上一张内容完全相同（哈希一致）的截图直接丢弃
+    - 用例失败时（conftest 的 makereport 钩子）保存失败现场并写出环形缓冲
+    - 会话结束 flush() 等待所有后台任务完成，并上报统计
+    """
+
+    def __init__(self, directory: str = SCREENSHOT_DIR, workers: int = SCREENSHOT_WORKERS,
+                 image_type: str = SCREENSHOT_TYPE, mode: Optional[str] = None,
+                 ring_size: int = SCREENSHOT_RING_SIZE, sample_rate: float = SCREENSHOT_SAMPLE_RATE):
+        if image_type not in _EXTENSIONS:
+            raise ValueError(f"不支持的截图格式: {image_type}，可选: {', '.join(_EXTENSIONS)}")
+        self.mode = mode or SCREENSHOT_MODE or active_profile().screenshots
+        if self.mode not in CAPTURE_MODES:
+            raise ValueError(f"不支持的截图策略: {self.mode}，可选: {', '.join(CAPTURE_MODES)}")
+        self.directory = directory
+        self.workers = max(1, workers)
+        self.image_type = image_type
+        self.sample_rate = sample_rate
+        self.stats = Counter()
+        self._ring: Deque[_Frame] = deque(maxlen=max(1, ring_size))
+        self._last_digest: Optional[str] = None
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="screenshot")
+        return self._pool
+
+    def _path(self, stem: str) -> str:
+        # 精确到毫秒：环形缓冲写出时同一秒内会有多张同前缀的截图
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")[:-3]
+        return os.path.join(self.directory, f"{stem}_{timestamp}.{_EXTENSIONS[self.image_type]}")
+
+    def _grab(self, page: Page, full_page: bool) -> bytes:
+        options = {"type": self.image_type, "full_page": full_page}
+        if self.image_type == "jpeg":
+            options["quality"] = _JPEG_QUALITY
+        start = time.perf_counter()
+        body = page.screenshot(**options)
+        self.stats["captured"] += 1
+        self.stats["capture_ms"] += int((time.perf_counter() - start) * 1000)
+        return body
+
+    def _submit(self, name: str, path: str, body: bytes) -> None:
+        """登记附件（测试线程）+ 后台写盘/写附件"""
+        file_name = reserve_attachment(name, _ATTACHMENT_TYPES[self.image_type])
+        future = self._executor().submit(self._persist, body, path, file_name)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+            self.stats["written"] += 1
+            self.stats["bytes"] += len(body)
+
+    def capture(self, page: Page, name: str, stem: str, full_page: bool = False) -> Optional[str]:
+        """
+        按策略截图，返回截图文件路径（文件由后台线程写入，flush() 之后保证存在）；
+        策略跳过、与上一张相同、或暂存在环形缓冲中时返回 None
+        :param name: Allure 附件名称
+        :param stem: 文件名前缀，实际文件名为 <stem>_<时间戳>.<扩展名>
+        """
+        if self.mode == "on-failure" or (self.mode == "sampled" and random.random() >= self.sample_rate):
+            self.stats["skipped"] += 1
+            return None
+
+        body = self._grab(page, full_page)
+        digest = hashlib.sha1(body).hexdigest()
+        if digest == self._last_digest:
+            self.stats["deduplicated"] += 1
+            return None
+        self._last_digest = digest
+
+        path = self._path(stem)
+        if self.mode == "ring-buffer":
+            self._ring.append(_Frame(name, path, body))
+            return None
+        self._submit(name, path, body)
+        return path
+
+    def on_test_failed(self, item) -> None:
+        """用例失败：写出环形缓冲中的截图，并为用例用到的每个页面保存一张失败现场"""
+        frames = list(self._ring)
+        self._ring.clear()
+        for frame in frames:
+            self._submit(frame.name, frame.path, frame.body)
+
+        stem = "failed_" + re.sub(r"[^\w\-]+", "_", item.name)
+        for page in open_pages(item):
+            try:
+                body = self._grab(page, full_page=False)
+            except Exception as e:
+                logger.warning(f"⚠️ 失败现场截图失败: {e}")
+                continue
+            self._submit("失败现场", self._path(stem), body)
+        self.stats["failures"] += 1
+        logger.info(f"📸 用例失败，已保存 {len(frames)} 张缓冲截图及失败现场: {item.nodeid}")
+
+    def end_test(self) -> None:
+        """用例结束：丢弃通过用例的环形缓冲，重置去重基准"""
+        self.stats["discarded"] += len(self._ring)
+        self._ring.clear()
+        self._last_digest = None
+
+    def _persist(self, body: bytes, path: str, file_name: Optional[str]) -> None:
+        start = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(body)
+            write_attachment(file_name, body)
+        except Exception as e:
+            logger.warning(f"⚠️ 截图保存失败 {path}: {e}")
+            with self._lock:
+                self.stats["errors"] += 1
+        finally:
+            with self._lock:
+                self.stats["background_ms"] += int((time.perf_counter() - start) * 1000)
+
+    def flush(self) -> None:
+        """等待所有后台保存任务完成并上报统计"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+        if self.stats:
+            reporting.publish(SECTION, {"mode": self.mode, **self.stats})
+            self.stats.clear()
+
+    def close(self) -> None:
+        self.flush()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+
+def open_pages(item) -> List[Page]:
+    """用例参数中仍然打开的页面（去重）"""
+    pages = []
+    for value in getattr(item, "funcargs", {}).values():
+        if isinstance(value, Page) and value not in pages and not value.is_closed():
+            pages.append(value)
+    return pages
+
+
+# 进程内共享的截图服务
+_service: Optional[ScreenshotService] = None
+
+
+def screenshot_service() -> ScreenshotService:
+    global _service
+    if _service is None:
+        _service = ScreenshotService()
+    return _service
+
+
+def take_screenshot(page: Page, name: str, stem: str, full_page: bool = False) -> Optional[str]:
+    """按截图策略截图并挂到当前 Allure step：take_screenshot(page, "角色创建成功", f"role_created_{role_name}")"""
+    return screenshot_service().capture(page, name, stem, full_page=full_page)
+
+
+def flush_screenshots() -> None:
+    if _service is not None:
+        _service.close()
+
+
+def render_summary(data: dict) -> List[str]:
+    captured = data.get("captured", 0)
+    if not captured and not data.get("skipped"):
+        return []
+    lines = [
+        f"mode: {data.get('mode')}, captured: {captured}, written: {data.get('written', 0)} "
+        f"({data.get('bytes', 0) / 1024 / 1024:.2f} MiB), "
+        f"test-thread time: {data.get('capture_ms', 0) / max(captured, 1):.0f} ms avg",
+        f"skipped by policy: {data.get('skipped', 0)}, identical frames dropped: {data.get('deduplicated', 0)}, "
+        f"ring frames discarded (passed): {data.get('discarded', 0)}, failed tests flushed: {data.get('failures', 0)}",
+        f"offloaded disk + allure writes: {data.get('background_ms', 0) / 1000:.2f}s total",
+    ]
+    if data.get("errors"):
+        lines.append(f"failed writes: {data['errors']}")
+    return lines
+
+
+reporting.register_summary(SECTION, "screenshot pipeline summary", render_summary)
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 多选择器兜底定位的命中缓存：按页面路由记住实际命中的选择器，下次优先使用，失效时才逐个兜底
+
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+from playwright.sync_api import Locator, Page
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.batch_expect import DEFAULT_TIMEOUT
+from Playwright_ERP.utils.settings import SELECTOR_CACHE_DECAY, SELECTOR_CACHE_ENABLED, SELECTOR_CACHE_FILE
+from Playwright_ERP.utils.step_timing import expect
+
+logger = logging.getLogger(__name__)
+
+SECTION = "selector_cache"
+
+
+def _route(page: Page) -> str:
+    return urlparse(page.url).path.rstrip("/") or "/"
+
+
+def _load_scores(path: str = SELECTOR_CACHE_FILE) -> Dict[str, Dict[str, float]]:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class SelectorRegistry:
+    """
+    兜底选择器的命中排名（每个进程一个实例）：
+    - 键为 "<路由> <定位名>"，例如 "/account user.search_input"
+    - 排名来自 SELECTOR_CACHE_FILE（历次运行的命中得分），本进程内发生兜底后立即改用新的命中项
+    - locator()：不与页面交互，有命中记录时直接返回该选择器的 locator，否则返回全部备选的并集
+    - wait_visible()：等待任一备选可见（这正是调用方本来就要做的等待），再用一次非等待的检查确认排名第一的选择器是否可见；
+      不可见才对其余备选兜底，只认可实际出现的那个元素所匹配的备选；缓存项失效时不多等一个超时
+    """
+
+    def __init__(self, scores: Optional[Dict[str, Dict[str, float]]] = None):
+        self.scores = scores if scores is not None else _load_scores()
+        # 本进程内已确认的命中项（兜底后立即生效，不等下次运行）
+        self._winners: Dict[str, str] = {}
+        self.hits: Dict[str, Dict[str, int]] = {}
+        self.fallbacks: Dict[str, int] = {}
+        self.counts = {"cached": 0, "fallback": 0, "unmatched": 0}
+
+    def ranked(self, key: str, alternatives: Sequence[str]) -> List[str]:
+        """按历史得分排序（同分保持声明顺序），本进程确认过的命中项排最前"""
+        scores = self.scores.get(key, {})
+        order = sorted(alternatives, key=lambda s: -scores.get(s, 0))
+        winner = self._winners.get(key)
+        if winner in alternatives:
+            order.remove(winner)
+            order.insert(0, winner)
+        return order
+
+    def _key(self, scope: Union[Page, Locator], name: str) -> str:
+        page = scope if isinstance(scope, Page) else scope.page
+        return f"{_route(page)} {name}"
+
+    def _preferred(self, key: str, alternatives: Sequence[str]) -> Optional[str]:
+        """有命中记录（本进程或历史排名）时返回排名第一的选择器"""
+        if key not in self._winners and not any(self.scores.get(key, {}).get(s, 0) for s in alternatives):
+            return None
+        return self.ranked(key, alternatives)[0]
+
+    def _record(self, key: str, selector: str, kind: str) -> None:
+        self.counts[kind] += 1
+        self._winners[key] = selector
+        per_key = self.hits.setdefault(key, {})
+        per_key[selector] = per_key.get(selector, 0) + 1
+
+    def locator(self, scope: Union[Page, Locator], name: str, alternatives: Sequence[str]) -> Locator:
+        if not SELECTOR_CACHE_ENABLED or len(alternatives) == 1:
+            return scope.locator(", ".join(alternatives))
+        preferred = self._preferred(self._key(scope, name), alternatives)
+        return scope.locator(preferred or ", ".join(alternatives))
+
+    def wait_visible(self, scope: Union[Page, Locator], name: str, alternatives: Sequence[str],
+                     timeout: float = DEFAULT_TIMEOUT) -> Locator:
+        if not SELECTOR_CACHE_ENABLED or len(alternatives) == 1:
+            located = scope.locator(", ".join(alternatives)).first
+            expect(located).to_be_visible(timeout=timeout)
+            return located
+        key = self._key(scope, name)
+        ranked = self.ranked(key, alternatives)
+        preferred = self._preferred(key, alternatives)
+
+        # 等待任一备选可见（缓存项失效时不会先为它白等一个完整超时），再确认实际命中的是哪个备选
+        located = scope.locator(", ".join(ranked)).first
+        try:
+            expect(located).to_be_visible(timeout=timeout)
+        except AssertionError:
+            self.counts["unmatched"] += 1
+            raise
+        if preferred is not None:
+            cached = scope.locator(preferred).first
+            if cached.is_visible():
+                self._record(key, preferred, "cached")
+                return cached
+            ranked.remove(preferred)
+        for selector in ranked:
+            if located.and_(scope.locator(selector)).count() > 0:
+                if preferred is not None:
+                    self.fallbacks[key] = self.fallbacks.get(key, 0) + 1
+                    logger.info(f"🔁 缓存的选择器已失效，改用兜底命中项: {key} -> {selector}")
+                self._record(key, selector, "fallback")
+                return scope.locator(selector).first
+        return located
+
+    def flush(self) -> None:
+        """上报本进程的命中次数（由主进程在会话结束时合并写回排名文件，见 save_selector_ranking）"""
+        if not any(self.counts.values()):
+            return
+        reporting.publish(SECTION, {**self.counts, "hits": self.hits, "fallbacks": self.fallbacks})
+        self.hits, self.fallbacks = {}, {}
+        self.counts = dict.fromkeys(self.counts, 0)
+
+
+# 进程内共享的选择器排名
+_registry: Optional[SelectorRegistry] = None
+
+
+def selector_registry() -> SelectorRegistry:
+    global _registry
+    if _registry is None:
+        _registry = SelectorRegistry()
+    return _registry
+
+
+def flush_selector_cache() -> None:
+    if _registry is not None:
+        _registry.flush()
+
+
+def fallback_locator(scope: Union[Page, Locator], name: str, *alternatives: str) -> Locator:
+    """
+    多个备选选择器的定位（不与页面交互）：有命中记录时返回该选择器的 locator，否则返回全部备选的并集
+
+        search_input = fallback_locator(page, "user.search_input",
+                                        'input[placeholder*="名称"]', '.ant-input[placeholder]').first
+
+    name 在同一路由内唯一即可；命中记录由 visible_fallback 建立
+    """
+    return selector_registry().locator(scope, name, alternatives)
+
+
+def visible_fallback(scope: Union[Page, Locator], name: str, *alternatives: str,
+                     timeout: float = DEFAULT_TIMEOUT) -> Locator:
+    """
+    等待备选之一可见并返回其 locator（.first），替代 fallback_locator(...).first + expect(...).to_be_visible()：
+
+        create_btn = visible_fallback(page, "user.create_button",
+                                      'button:has-text("新增账号")', 'button:has-text("新增用户")')
+        create_btn.click()
+
+    返回的 locator 只含实际命中的选择器（有命中记录且可见时即为该选择器）；都不可见时抛出 AssertionError（同 expect）
+    """
+    return selector_registry().wait_visible(scope, name, alternatives, timeout)
+
+
+def _save_scores(hits: Dict[str, Dict[str, int]]) -> None:
+    """历史得分按 SELECTOR_CACHE_DECAY 衰减后加上本次命中次数，失效的选择器几次运行后自然掉出首位"""
+    scores = _load_scores()
+    for key in set(scores) | set(hits):
+        previous = scores.get(key, {})
+        current = hits.get(key, {})
+        merged = {s: round(previous.get(s, 0) * SELECTOR_CACHE_DECAY + current.get(s, 0), 3)
+                  for s in set(previous) | set(current)}
+        scores[key] = {s: v for s, v in merged.items() if v >= 0.01}
+    os.makedirs(os.path.dirname(SELECTOR_CACHE_FILE) or ".", exist_ok=True)
+    tmp_path = f"{SELECTOR_CACHE_FILE}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({k: v for k, v in scores.items() if v}, f, ensure_ascii=False, indent=2, sort_keys=True)
+    os.replace(tmp_path, SELECTOR_CACHE_FILE)
+
+
+def save_selector_ranking() -> None:
+    """主进程会话结束时调用（各 worker 的命中次数已汇总），把本次命中合并写回排名文件"""
+    hits = reporting.collected(SECTION).get("hits")
+    if hits:
+        _save_scores(hits)
+
+
+def render_summary(data: dict) -> List[str]:
+    total = data.get("cached", 0) + data.get("fallback", 0) + data.get("unmatched", 0)
+    if not total:
+        return []
+    lines = [f"waits: {total}, cached selector {data.get('cached', 0)}, fallback {data.get('fallback', 0)}, "
+             f"unmatched {data.get('unmatched', 0)}"]
+    for key, count in sorted(data.get("fallbacks", {}).items()):
+        lines.append(f"  cached selector stopped matching {count}x: {key}")
+    if data.get("hits"):
+        lines.append(f"ranking updated: {SELECTOR_CACHE_FILE}")
+    return lines
+
+
+reporting.register_summary(SECTION, "selector cache", render_summary)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 测试运行配置（统一从环境变量读取，提供默认值）
+
+import os
+from dataclasses import dataclass
+from typing import Dict, List
+
+# 本地替身服务（Playwright_ERP/stub_erp）：开启后由 conftest 启动，被测地址默认指向它，整套用例不依赖真实 ERP
+STUB_ENABLED = os.getenv("ERP_STUB", "off").lower() in ("1", "on", "true", "yes")
+STUB_PORT = int(os.getenv("ERP_STUB_PORT", "18080"))
+
+# 被测 ERP 前端地址
+BASE_URL = os.getenv("ERP_BASE_URL", f"http://127.0.0.1:{STUB_PORT}" if STUB_ENABLED else "http://localhost:8080").rstrip("/")
+
+# 后端接口前缀（前端开发服务器把该前缀代理到后端）
+API_PREFIX = "/" + os.getenv("ERP_API_PREFIX", "/api/").strip("/") + "/"
+# 直接调用后端接口时使用的地址（默认走前端开发服务器的代理，可直连后端省去一跳）
+API_BASE_URL = os.getenv("ERP_API_BASE_URL", BASE_URL).rstrip("/")
+
+# 页面模块 -> 后端资源路径（相对 API_PREFIX）
+RESOURCES: Dict[str, str] = {
+    "role": "roles",
+    "user": "users",
+    "goods_category": "goods_categories",
+    "warehouse": "warehouses",
+}
+
+# 日志/运行记录等产物目录（与 conftest 中的 test_log 保持一致）
+TEST_LOG_DIR = os.getenv("ERP_TEST_LOG_DIR", "test_log")
+
+# 日志级别（DEBUG / INFO / WARNING ...）
+LOG_LEVEL = os.getenv("ERP_LOG_LEVEL", "INFO").upper()
+
+# 登录态缓存：目录、有效期（小时）、校验接口（相对 API_BASE_URL，默认随 ERP_API_PREFIX）、开关（设为 off 强制每次 UI 登录）
+AUTH_CACHE_DIR = os.getenv("ERP_AUTH_CACHE_DIR", ".auth")
+AUTH_CACHE_TTL_HOURS = float(os.getenv("ERP_AUTH_TTL_HOURS", "24"))
+AUTH_CHECK_PATH = os.getenv("ERP_AUTH_CHECK_PATH", API_PREFIX + "user/info/")
+AUTH_CACHE_ENABLED = os.getenv("ERP_AUTH_CACHE", "on").lower() not in ("0", "off", "false", "no")
+
+# 已登录页面预热池大小，0 表示关闭页面池（每个用例新建页面）
+PAGE_POOL_SIZE = int(os.getenv("ERP_PAGE_POOL_SIZE", "1"))
+# 首页渲染完成的标志元素（页面归还时据此确认前端路由已切回首页）
+HOME_READY_SELECTOR = os.getenv("ERP_HOME_READY_SELECTOR", '.ant-menu-item-selected a[href="/home"]')
+
+# 已登录上下文是否屏蔽图片/字体/媒体/统计脚本等资源（设为 off 关闭）
+BLOCK_RESOURCES = os.getenv("ERP_BLOCK_RESOURCES", "on").lower() not in ("0", "off", "false", "no")
+
+# 前端静态资源（JS/CSS）本地磁盘缓存（设为 off 关闭）
+ASSET_CACHE_ENABLED = os.getenv("ERP_ASSET_CACHE", "on").lower() not in ("0", "off", "false", "no")
+ASSET_CACHE_DIR = os.getenv("ERP_ASSET_CACHE_DIR", os.path.join(".cache", "assets"))
+
+# 批量造数：并发线程数、限速（请求/秒，0 表示不限速）、单条失败重试次数、已创建 ID 台账
+SEED_CONCURRENCY = int(os.getenv("ERP_SEED_CONCURRENCY", "8"))
+SEED_RATE = float(os.getenv("ERP_SEED_RATE", "50"))
+SEED_RETRIES = int(os.getenv("ERP_SEED_RETRIES", "3"))
+SEED_LEDGER_PATH = os.getenv("ERP_SEED_LEDGER", os.path.join(TEST_LOG_DIR, "seed_ledger.jsonl"))
+
+# 截图：保存目录、后台写盘/写附件的线程数、图片格式（png / jpeg，jpeg 在浏览器端编码更快、体积更小）
+SCREENSHOT_DIR = os.getenv("ERP_SCREENSHOT_DIR", "screenshots")
+SCREENSHOT_WORKERS = int(os.getenv("ERP_SCREENSHOT_WORKERS", "2"))
+SCREENSHOT_TYPE = os.getenv("ERP_SCREENSHOT_TYPE", "png").lower()
+# 截图策略（always / on-failure / sampled / ring-buffer），未设置时跟随运行配置档；
+# 环形缓冲保留的最近截图数、抽样模式的抽样比例
+SCREENSHOT_MODE = os.getenv("ERP_SCREENSHOT_MODE", "").lower()
+SCREENSHOT_RING_SIZE = int(os.getenv("ERP_SCREENSHOT_RING_SIZE", "5"))
+SCREENSHOT_SAMPLE_RATE = float(os.getenv("ERP_SCREENSHOT_SAMPLE_RATE", "0.1"))
+
+# 录屏：保留策略（off / on-failure / always，未设置时跟随运行配置档）、分辨率预设（full / medium / low）、保存目录
+VIDEO_MODE = os.getenv("ERP_VIDEO_MODE", "").lower()
+VIDEO_PRESET = os.getenv("ERP_VIDEO_PRESET", "full").lower()
+VIDEO_DIR = os.getenv("ERP_VIDEO_DIR", "test_recordings")
+
+# Playwright trace：记录级别（off / actions / screenshots / snapshots / full，未设置时跟随运行配置档）、保存目录
+TRACE_LEVEL = os.getenv("ERP_TRACE_LEVEL", "").lower()
+TRACE_DIR = os.getenv("ERP_TRACE_DIR", os.path.join(TEST_LOG_DIR, "traces"))
+
+# 步骤耗时：明细输出目录（每个 worker 一份 JSON Lines）、运行结束时输出的最慢步骤数
+STEP_TIMING_DIR = os.getenv("ERP_STEP_TIMING_DIR", os.path.join(TEST_LOG_DIR, "step_timing"))
+STEP_TIMING_TOP = int(os.getenv("ERP_STEP_TIMING_TOP", "10"))
+
+# 接口耗时：明细输出目录、基线文件；p95 超过基线的比例与绝对值都达到阈值才判定为退化；
+# ERP_API_BASELINE=update 时用本次结果覆盖基线（默认只补充基线中没有的接口）
+API_LATENCY_DIR = os.getenv("ERP_API_LATENCY_DIR", os.path.join(TEST_LOG_DIR, "api_latency"))
+API_LATENCY_BASELINE_FILE = os.getenv("ERP_API_BASELINE_FILE", os.path.join(TEST_LOG_DIR, "api_latency_baseline.json"))
+API_LATENCY_TOLERANCE = float(os.getenv("ERP_API_LATENCY_TOLERANCE", "0.2"))
+API_LATENCY_MIN_DELTA_MS = float(os.getenv("ERP_API_LATENCY_MIN_DELTA_MS", "50"))
+API_LATENCY_UPDATE_BASELINE = os.getenv("ERP_API_BASELINE", "").lower() == "update"
+
+# 页面性能：预算模式（off / warn / fail，未设置时跟随运行配置档）、预算覆盖文件（JSON，可选）、明细输出目录
+VITALS_MODE = os.getenv("ERP_VITALS_MODE", "").lower()
+VITALS_BUDGETS_FILE = os.getenv("ERP_VITALS_BUDGETS", "")
+VITALS_DIR = os.getenv("ERP_VITALS_DIR", os.path.join(TEST_LOG_DIR, "web_vitals"))
+
+# 多选择器兜底定位的命中排名：排名文件、开关（设为 off 每次都用全部备选的并集）、历史得分每次运行的衰减系数
+SELECTOR_CACHE_FILE = os.getenv("ERP_SELECTOR_CACHE_FILE", os.path.join(TEST_LOG_DIR, "selector_ranking.json"))
+SELECTOR_CACHE_ENABLED = os.getenv("ERP_SELECTOR_CACHE", "on").lower() not in ("0", "off", "false", "no")
+SELECTOR_CACHE_DECAY = float(os.getenv("ERP_SELECTOR_CACHE_DECAY", "0.5"))
+
+# 虚拟滚动下拉框的兜底查找：最多滚动的屏数（每屏约为下拉列表可视高度，按帧滚动）
+SELECT_SCROLL_STEPS = int(os.getenv("ERP_SELECT_SCROLL_STEPS", "500"))
+
+# 替身服务的故障注入：接口延迟（毫秒，固定值如 "50" 或区间如 "20-80"）、错误比例与错误状态码、
+# 注入范围（路径正则，默认为登录以外的全部接口）、随机种子（固定后同样的请求序列注入位置一致）
+STUB_LATENCY_MS = os.getenv("ERP_STUB_LATENCY_MS", "0")
+STUB_ERROR_RATE = float(os.getenv("ERP_STUB_ERROR_RATE", "0"))
+STUB_ERROR_STATUS = int(os.getenv("ERP_STUB_ERROR_STATUS", "503"))
+STUB_FAULT_PATHS = os.getenv("ERP_STUB_FAULT_PATHS", "^" + API_PREFIX + "(?!user/get_token)")
+STUB_SEED = int(os.getenv("ERP_STUB_SEED", "2026"))
+
+
+def url(path: str) -> str:
+    """拼接完整地址：url("/role") -> http://localhost:8080/role"""
+    return f"{BASE_URL}/{path.lstrip('/')}"
+
+
+@dataclass(frozen=True)
+class ErpAccount:
+    """ERP 测试账号：公司编号 + 用户名 + 密码"""
+    company: str
+    username: str
+    password: str
+
+    @property
+    def key(self) -> str:
+        """账号唯一标识，用于缓存文件名等场景"""
+        return f"{self.company}_{self.username}"
+
+
+# 默认账号（与原 conftest 中写死的登录信息一致）
+DEFAULT_ACCOUNTS = [ErpAccount("001", "admin", "Lx123456")]
+
+
+def load_accounts() -> List[ErpAccount]:
+    """
+    读取测试账号池：
+    - 环境变量 ERP_ACCOUNTS，格式：公司编号:用户名:密码，多个账号用英文分号分隔
+      例如：ERP_ACCOUNTS="001:admin:Lx123456;001:tester01:Lx123456"
+    - 未配置时退回默认账号
+    """
+    raw = os.getenv("ERP_ACCOUNTS", "").strip()
+    if not raw:
+        return list(DEFAULT_ACCOUNTS)
+
+    accounts = []
+    for item in raw.split(";"):
+        item = item.strip()
+        if not item:
+            continue
+        parts = item.split(":", 2)
+        if len(parts) != 3:
+            raise ValueError(f"ERP_ACCOUNTS 配置格式错误: '{item}'，应为 公司编号:用户名:密码")
+        accounts.append(ErpAccount(*parts))
+    return accounts or list(DEFAULT_ACCOUNTS)
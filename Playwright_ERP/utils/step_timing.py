@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 步骤耗时：timed_step 替代 allure.step，记录总耗时 / expect 自动等待耗时 / 页面导航耗时
+
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import List
+
+import allure
+from allure_commons.model2 import Parameter
+from playwright.sync_api import Page
+from playwright.sync_api import expect as _playwright_expect
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.allure_support import allure_reporter
+from Playwright_ERP.utils.log_setup import current_test
+from Playwright_ERP.utils.parallel import worker_id
+from Playwright_ERP.utils.settings import STEP_TIMING_DIR, STEP_TIMING_TOP
+
+logger = logging.getLogger(__name__)
+
+SECTION = "step_timing"
+
+# 计入“导航耗时”的页面方法
+_NAVIGATION_METHODS = ("goto", "reload", "go_back", "go_forward", "wait_for_url", "wait_for_load_state")
+
+
+@dataclass
+class _StepFrame:
+    """一个正在执行的 timed_step"""
+    path: str
+    started: float
+    expect_s: float = 0.0
+    navigation_s: float = 0.0
+
+
+# 当前进程正在执行的 timed_step（嵌套时外层同样累计内层的等待耗时）
+_stack: List[_StepFrame] = []
+# 本进程已结束的步骤明细
+_records: List[dict] = []
+
+
+def _timed(kind: str, fn):
+    """包装一个阻塞调用：在 timed_step 内执行时，把耗时累计到所有进行中的步骤上"""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not _stack:
+            return fn(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            for frame in _stack:
+                setattr(frame, f"{kind}_s", getattr(frame, f"{kind}_s") + elapsed)
+
+    wrapper._erp_timed = True
+    return wrapper
+
+
+def _instrument_navigation() -> None:
+    """给 Page 的导航方法加上计时（只包装一次）"""
+    for name in _NAVIGATION_METHODS:
+        method = getattr(Page, name)
+        if not getattr(method, "_erp_timed", False):
+            setattr(Page, name, _timed("navigation", method))
+
+
+_instrument_navigation()
+
+
+class _TimedAssertions:
+    """expect(...) 返回的断言对象代理：to_xxx / not_to_xxx 的自动等待耗时计入当前步骤"""
+
+    def __init__(self, assertions):
+        self._assertions = assertions
+
+    def __getattr__(self, name):
+        attr = getattr(self._assertions, name)
+        if name.startswith("_") or not callable(attr):
+            return attr
+        return _timed("expect", attr)
+
+
+class _TimedExpect:
+    """与 playwright.sync_api.expect 用法一致：from Playwright_ERP.utils.step_timing import expect"""
+
+    def __call__(self, actual, message=None):
+        return _TimedAssertions(_playwright_expect(actual, message))
+
+    def set_options(self, **options) -> None:
+        _playwright_expect.set_options(**options)
+
+
+expect = _TimedExpect()
+
+
+def expect_timed(fn):
+    """装饰自定义的断言等待（如 batch_expect.expect_all），其耗时计入当前步骤的 expect 耗时"""
+    return _timed("expect", fn)
+
+
+def _annotate(step_uuid, values: dict) -> None:
+    """把耗时写到 Allure step 的参数中（须在 step 结束前调用）"""
+    reporter = allure_reporter()
+    step = reporter.get_item(step_uuid) if reporter is not None else None
+    if step is not None:
+        step.parameters.extend(Parameter(name=name, value=str(value)) for name, value in values.items())
+
+
+@contextmanager
+def timed_step(title: str):
+    """
+    带计时的 allure.step，可直接替换 `with allure.step("..."):`
+
+        with timed_step("导航到角色管理页面"):
+            ...
+
+    记录：步骤总耗时、expect 断言自动等待耗时（需使用本模块的 expect）、页面导航耗时（goto / reload / wait_for_url 等），
+    写入 Allure step 参数与 test_log/step_timing/<worker>.jsonl
+    """
+    frame = _StepFrame(path=" > ".join([f.path for f in _stack[-1:]] + [title]), started=time.perf_counter())
+    step = allure.step(title)
+    status = "passed"
+    with step:
+        _stack.append(frame)
+        try:
+            yield frame
+        except BaseException:
+            status = "failed"
+            raise
+        finally:
+            _stack.pop()
+            wall_ms = (time.perf_counter() - frame.started) * 1000
+            expect_ms = frame.expect_s * 1000
+            navigation_ms = frame.navigation_s * 1000
+            timing = {
+                "wall_ms": round(wall_ms, 1),
+                "expect_ms": round(expect_ms, 1),
+                "navigation_ms": round(navigation_ms, 1),
+                "other_ms": round(max(wall_ms - expect_ms - navigation_ms, 0), 1),
+            }
+            _annotate(step.uuid, timing)
+            _records.append({"test": current_test(), "worker": worker_id(), "step": frame.path,
+                             "status": status, **timing})
+
+
+def flush_step_timings() -> None:
+    """写出本进程的步骤耗时明细，并上报最慢的步骤"""
+    global _records
+    if not _records:
+        return
+    records, _records = _records, []
+    os.makedirs(STEP_TIMING_DIR, exist_ok=True)
+    path = os.path.join(STEP_TIMING_DIR, f"{worker_id()}.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    logger.info(f"⏱️ 步骤耗时明细已写入: {path}")
+
+    # 只统计最外层步骤的合计，避免嵌套步骤重复累加
+    top_level = [r for r in records if " > " not in r["step"]]
+    reporting.publish(SECTION, {
+        "steps": len(records),
+        "wall_ms": sum(r["wall_ms"] for r in top_level),
+        "expect_ms": sum(r["expect_ms"] for r in top_level),
+        "navigation_ms": sum(r["navigation_ms"] for r in top_level),
+        "slowest": sorted(records, key=lambda r: r["wall_ms"], reverse=True)[:STEP_TIMING_TOP],
+    })
+
+
+def render_summary(data: dict) -> List[str]:
+    if not data.get("steps"):
+        return []
+    wall = data.get("wall_ms", 0)
+    lines = [
+        f"timed steps: {data['steps']}, total {wall / 1000:.1f}s "
+        f"(expect waits {data.get('expect_ms', 0) / max(wall, 1):.0%}, "
+        f"navigation {data.get('navigation_ms', 0) / max(wall, 1):.0%})",
+        f"slowest {STEP_TIMING_TOP} steps:",
+    ]
+    slowest = sorted(data.get("slowest", []), key=lambda r: r["wall_ms"], reverse=True)[:STEP_TIMING_TOP]
+    for record in slowest:
+        lines.append(f"  {record['wall_ms']:>8.0f} ms  expect {record['expect_ms']:>6.0f}  "
+                     f"nav {record['navigation_ms']:>6.0f}  {record['step']}  [{record['test']}]")
+    return lines
+
+
+reporting.register_summary(SECTION, "slowest steps", render_summary)
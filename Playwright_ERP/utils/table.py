@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: ant-design 表格快照：一次 evaluate 读出表头、行 key、单元格文本与行内按钮，之后的查询与断言都在 Python 中完成
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+from playwright.sync_api import Locator, Page
+
+# 表格根节点（与 waits.py 中的表格选择器一致）
+TABLE_WRAPPER = ".ant-table-wrapper"
+
+# 在表格根节点上执行：只读可见的数据行（跳过 antd 的测量行 / 空数据占位行），文本统一压缩空白
+_SNAPSHOT_JS = """
+(wrapper) => {
+    const text = (el) => (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim();
+    const visible = (el) => el.getClientRects().length > 0;
+    const headers = [...wrapper.querySelectorAll('.ant-table-thead th')]
+        .filter((th) => !th.classList.contains('ant-table-cell-scrollbar'))
+        .map(text);
+    const rows = [...wrapper.querySelectorAll('.ant-table-tbody > tr')]
+        .filter((tr) => visible(tr) && !tr.classList.contains('ant-table-placeholder')
+                        && !tr.classList.contains('ant-table-measure-row') && tr.getAttribute('aria-hidden') !== 'true')
+        .map((tr) => ({
+            key: tr.getAttribute('data-row-key'),
+            cells: [...tr.querySelectorAll(':scope > td')].map(text),
+            actions: [...tr.querySelectorAll('button, a, [role="button"]')].filter(visible).map(text).filter(Boolean),
+        }));
+    return { headers, rows, loading: !!wrapper.querySelector('.ant-spin-spinning') };
+}
+"""
+
+
+@dataclass(frozen=True)
+class TableRow:
+    """快照中的一行：按列名或列序号取单元格文本"""
+    index: int
+    key: Optional[str]
+    cells: Tuple[str, ...]
+    actions: Tuple[str, ...]
+    columns: Dict[str, int] = field(repr=False, compare=False)
+
+    def __getitem__(self, column: Union[str, int]) -> str:
+        if not isinstance(column, int) and column not in self.columns:
+            raise KeyError(f"表格中没有列 '{column}'，现有列: {list(self.columns)}")
+        position = column if isinstance(column, int) else self.columns[column]
+        return self.cells[position]
+
+    def get(self, column: Union[str, int], default: Optional[str] = None) -> Optional[str]:
+        try:
+            return self[column]
+        except (KeyError, IndexError):
+            return default
+
+    def has_action(self, name: str) -> bool:
+        """行内是否有该按钮（忽略按钮文字中的空格，如“删 除”）"""
+        return name.replace(" ", "") in (action.replace(" ", "") for action in self.actions)
+
+    def as_dict(self) -> Dict[str, str]:
+        return {header: self.cells[i] for header, i in self.columns.items() if i < len(self.cells)}
+
+
+class TableSnapshot:
+    """
+    表格某一时刻的内容（只读）：
+    - headers / rows / loading，按列名取值、按列值查行都是字典查找
+    - 读取后不再与页面交互；需要点击行内按钮时用 AntTable.row_locator(row)
+    """
+
+    def __init__(self, headers: List[str], rows: List[dict], loading: bool = False):
+        self.headers: Tuple[str, ...] = tuple(headers)
+        # 列名 -> 序号（重名列取第一个，空表头不参与按名查找）
+        self.columns: Dict[str, int] = {}
+        for i, header in enumerate(self.headers):
+            if header:
+                self.columns.setdefault(header, i)
+        self.rows: Tuple[TableRow, ...] = tuple(
+            TableRow(index=i, key=row.get("key"), cells=tuple(row["cells"]), actions=tuple(row.get("actions", ())),
+                     columns=self.columns)
+            for i, row in enumerate(rows)
+        )
+        self.loading = loading
+        # 列 -> {单元格文本 -> 行}，首次按该列查找时建立
+        self._indexes: Dict[int, Dict[str, List[TableRow]]] = {}
+        self._by_key = {row.key: row for row in self.rows if row.key is not None}
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __iter__(self) -> Iterator[TableRow]:
+        return iter(self.rows)
+
+    def __repr__(self) -> str:
+        return f"TableSnapshot(headers={list(self.headers)}, rows={len(self.rows)}, loading={self.loading})"
+
+    @property
+    def first(self) -> Optional[TableRow]:
+        return self.rows[0] if self.rows else None
+
+    def _position(self, column: Union[str, int]) -> int:
+        if isinstance(column, int):
+            return column
+        if column not in self.columns:
+            raise KeyError(f"表格中没有列 '{column}'，现有列: {list(self.headers)}")
+        return self.columns[column]
+
+    def column(self, column: Union[str, int]) -> List[str]:
+        position = self._position(column)
+        return [row.cells[position] if position < len(row.cells) else "" for row in self.rows]
+
+    def rows_where(self, column: Union[str, int], value: str) -> List[TableRow]:
+        position = self._position(column)
+        index = self._indexes.get(position)
+        if index is None:
+            index = self._indexes[position] = {}
+            for row in self.rows:
+                if position < len(row.cells):
+                    index.setdefault(row.cells[position], []).append(row)
+        return index.get(value, [])
+
+    def find(self, column: Union[str, int], value: str) -> Optional[TableRow]:
+        matches = self.rows_where(column, value)
+        return matches[0] if matches else None
+
+    def has(self, column: Union[str, int], value: str) -> bool:
+        return bool(self.rows_where(column, value))
+
+    def by_key(self, key) -> Optional[TableRow]:
+        return self._by_key.get(str(key))
+
+    def containing(self, text: str) -> List[TableRow]:
+        """任一单元格包含该文本的行（与 locator.filter(has_text=...) 的语义一致）"""
+        return [row for row in self.rows if any(text in cell for cell in row.cells)]
+
+
+class AntTable:
+    """
+    ant-design 表格作用域：
+
+        table = AntTable(page)
+        snapshot = table.snapshot()            # 一次协议往返
+        assert snapshot.first["名称"] == role_name
+        table.row_locator(snapshot.find("名称", role_name)).get_by_role("button", name="编辑").click()
+    """
+
+    def __init__(self, scope: Union[Page, Locator], selector: str = TABLE_WRAPPER):
+        self.root = scope.locator(selector).first
+
+    def snapshot(self, timeout: Optional[float] = None) -> TableSnapshot:
+        data = self.root.evaluate(_SNAPSHOT_JS, timeout=timeout)
+        return TableSnapshot(data["headers"], data["rows"], data["loading"])
+
+    def row_locator(self, row: TableRow) -> Locator:
+        """快照行对应的页面行（优先按 data-row-key 定位，没有 key 时按位置）"""
+        if row.key is not None:
+            return self.root.locator(f'.ant-table-tbody > tr[data-row-key="{row.key}"]')
+        return self.root.locator(".ant-table-tbody > tr:not(.ant-table-placeholder):not(.ant-table-measure-row)").nth(row.index)
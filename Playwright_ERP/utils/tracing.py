@@ -0,0 +1,183 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 按用例分段的 Playwright trace：每个用例一个 chunk，只保存失败/不稳定用例，统计各级别的开销
+
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import allure
+from playwright.sync_api import BrowserContext
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.parallel import selection_key, worker_id
+from Playwright_ERP.utils.profiles import active_profile
+from Playwright_ERP.utils.reporting import item_failed
+from Playwright_ERP.utils.settings import TEST_LOG_DIR, TRACE_DIR, TRACE_LEVEL
+
+logger = logging.getLogger(__name__)
+
+SECTION = "tracing"
+
+# trace 级别 -> context.tracing.start() 参数（off 表示不录制）
+TRACE_LEVELS: Dict[str, Optional[dict]] = {
+    "off": None,
+    # 只记录操作、网络与控制台日志
+    "actions": {"screenshots": False, "snapshots": False, "sources": False},
+    # 额外记录截屏胶片
+    "screenshots": {"screenshots": True, "snapshots": False, "sources": False},
+    # 额外记录每个操作前后的 DOM 快照
+    "snapshots": {"screenshots": False, "snapshots": True, "sources": False},
+    # 全部开启（含测试源码）
+    "full": {"screenshots": True, "snapshots": True, "sources": True},
+}
+
+# 各级别最近一次的平均用例耗时，用于跨级别对比开销
+OVERHEAD_HISTORY_FILE = os.path.join(TEST_LOG_DIR, "trace_overhead.json")
+
+
+class TraceRecorder:
+    """
+    已登录上下文的分段 trace（每个进程一个实例）：
+    - start_session()：上下文创建后 tracing.start() 一次
+    - start_test() / stop_test()：每个用例一个 chunk；失败或重跑后才通过（不稳定）的用例写出 zip，其余直接丢弃
+    - 统计：chunk 开始/结束的耗时、写出耗时与大小、用例本身（call 阶段）的平均耗时
+    """
+
+    def __init__(self, level: Optional[str] = None, directory: str = TRACE_DIR):
+        self.level = level or TRACE_LEVEL or active_profile().tracing
+        if self.level not in TRACE_LEVELS:
+            raise ValueError(f"不支持的 trace 级别: {self.level}，可选: {', '.join(TRACE_LEVELS)}")
+        self.directory = directory
+        self.stats = Counter()
+        self.nodeids: List[str] = []
+        self._chunk_started: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return TRACE_LEVELS[self.level] is not None
+
+    def start_session(self, context: BrowserContext) -> None:
+        if self.enabled:
+            context.tracing.start(**TRACE_LEVELS[self.level])
+
+    def stop_session(self, context: BrowserContext) -> None:
+        # 最后一个用例之后没有未结束的 chunk，直接停止并丢弃
+        if self.enabled:
+            context.tracing.stop()
+
+    def start_test(self, context: BrowserContext, item) -> None:
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        context.tracing.start_chunk(title=item.nodeid)
+        self.stats["start_ms"] += (time.perf_counter() - start) * 1000
+        self._chunk_started = start
+
+    def stop_test(self, context: BrowserContext, item) -> Optional[str]:
+        """结束当前用例的 chunk，需要保留时返回 trace 文件路径"""
+        call = getattr(item, "rep_call", None)
+        if call is not None:
+            self.stats["tests"] += 1
+            self.stats["call_ms"] += call.duration * 1000
+            self.nodeids.append(item.nodeid)
+        if not self.enabled or self._chunk_started is None:
+            return None
+        self._chunk_started = None
+
+        failed = item_failed(item)
+        # pytest-rerunfailures 重跑后通过：不稳定用例，同样保留
+        flaky = not failed and getattr(item, "execution_count", 1) > 1
+        start = time.perf_counter()
+        if not (failed or flaky):
+            context.tracing.stop_chunk()
+            self.stats["discarded"] += 1
+            self.stats["discard_ms"] += (time.perf_counter() - start) * 1000
+            return None
+
+        stem = re.sub(r"[^\w\-]+", "_", item.name)
+        path = os.path.join(self.directory, f"{stem}_{worker_id()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip")
+        os.makedirs(self.directory, exist_ok=True)
+        context.tracing.stop_chunk(path=path)
+        self.stats["saved_failed" if failed else "saved_flaky"] += 1
+        self.stats["save_ms"] += (time.perf_counter() - start) * 1000
+        self.stats["bytes"] += os.path.getsize(path) if os.path.exists(path) else 0
+        logger.info(f"🧵 Trace 已保存（{'失败' if failed else '不稳定'}用例）: {path}，"
+                    f"查看: playwright show-trace {path}")
+        allure.attach(f"playwright show-trace {path}", name="Playwright Trace", attachment_type=allure.attachment_type.TEXT)
+        return path
+
+    def flush(self) -> None:
+        if self.stats:
+            reporting.publish(SECTION, {"level": self.level, "nodeids": self.nodeids,
+                                        **{k: round(v, 1) for k, v in self.stats.items()}})
+            self.stats.clear()
+            self.nodeids = []
+
+
+# 进程内共享的 trace 管理
+_recorder: Optional[TraceRecorder] = None
+
+
+def trace_recorder() -> TraceRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = TraceRecorder()
+    return _recorder
+
+
+def flush_traces() -> None:
+    if _recorder is not None:
+        _recorder.flush()
+
+
+def _record_overhead(key: str, level: str, avg_call_ms: float) -> Dict[str, dict]:
+    """记录本次级别的平均用例耗时，返回同一用例集合下的全部级别记录"""
+    try:
+        with open(OVERHEAD_HISTORY_FILE, encoding="utf-8") as f:
+            history = json.load(f)
+    except (OSError, ValueError):
+        history = {}
+    levels = history.setdefault(key, {})
+    levels[level] = {"avg_call_ms": round(avg_call_ms, 1), "finished_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+    os.makedirs(os.path.dirname(OVERHEAD_HISTORY_FILE) or ".", exist_ok=True)
+    with open(OVERHEAD_HISTORY_FILE, "w", encoding="utf-8") as f:
+        json.dump(history, f, ensure_ascii=False, indent=2)
+    return levels
+
+
+def render_summary(data: dict) -> List[str]:
+    tests = data.get("tests", 0)
+    if not tests:
+        return []
+    level = data.get("level")
+    avg_call = data.get("call_ms", 0) / tests
+    saved = data.get("saved_failed", 0) + data.get("saved_flaky", 0)
+    lines = [f"level: {level}, traced tests: {tests}, avg test call: {avg_call:.0f} ms"]
+    if TRACE_LEVELS.get(level) is not None:
+        discarded = data.get("discarded", 0)
+        lines.append(f"chunks saved: {saved} (failed={data.get('saved_failed', 0)}, flaky={data.get('saved_flaky', 0)}, "
+                     f"{data.get('bytes', 0) / 1024 / 1024:.2f} MiB), discarded: {discarded}")
+        lines.append(f"chunk overhead: start {data.get('start_ms', 0) / tests:.1f} ms avg, "
+                     f"discard {data.get('discard_ms', 0) / max(discarded, 1):.1f} ms avg, "
+                     f"save {data.get('save_ms', 0) / max(saved, 1):.1f} ms avg")
+
+    # 与同一用例集合其他级别的最近一次运行对比（记录型开销体现在用例本身的耗时上）
+    levels = _record_overhead(selection_key(data.get("nodeids", [])), level, avg_call)
+    for other, record in sorted(levels.items()):
+        if other == level or not record.get("avg_call_ms"):
+            continue
+        delta = avg_call - record["avg_call_ms"]
+        lines.append(f"vs level {other} ({record['avg_call_ms']:.0f} ms @ {record['finished_at']}): "
+                     f"{delta:+.0f} ms per test ({delta / record['avg_call_ms']:+.0%})")
+    return lines
+
+
+reporting.register_summary(SECTION, "tracing overhead summary", render_summary)
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 录屏保留策略（off / on-failure / always）与分辨率预设，通过用例的录屏在后台删除
+
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import allure
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.allure_support import reserve_attachment, write_attachment
+from Playwright_ERP.utils.profiles import active_profile
+from Playwright_ERP.utils.settings import VIDEO_DIR, VIDEO_MODE, VIDEO_PRESET
+
+logger = logging.getLogger(__name__)
+
+SECTION = "video"
+
+# 录屏保留策略：
+# - off：不录屏
+# - on-failure：每个用例都录，用例通过后在后台删除，失败才保留并挂到 Allure
+# - always：全部保留
+VIDEO_MODES = ("off", "on-failure", "always")
+
+# 分辨率预设（宽, 高）；录屏编码开销大致与画面面积成正比
+VIDEO_PRESETS: Dict[str, Tuple[int, int]] = {
+    "full": (1280, 800),
+    "medium": (960, 600),
+    "low": (640, 400),
+}
+# 统计节省量时的对照基准：全部用例按 full 分辨率录屏并全部保留（原有行为）
+_BASELINE_PRESET = "full"
+
+
+class VideoRecorder:
+    """
+    录屏管理（每个进程一个实例）：
+    - context_options()：创建上下文时的录屏参数（off 时为空）
+    - finalize()：上下文关闭后按策略处理录屏文件；删除与挂 Allure 附件都在后台线程完成，不阻塞 teardown
+    - 统计：录制时长 × 画面面积（编码开销的近似量）、保留/删除的文件数与字节数
+    """
+
+    def __init__(self, mode: Optional[str] = None, preset: str = VIDEO_PRESET, directory: str = VIDEO_DIR):
+        self.mode = mode or VIDEO_MODE or active_profile().video
+        if self.mode not in VIDEO_MODES:
+            raise ValueError(f"不支持的录屏策略: {self.mode}，可选: {', '.join(VIDEO_MODES)}")
+        if preset not in VIDEO_PRESETS:
+            raise ValueError(f"不支持的录屏分辨率预设: {preset}，可选: {', '.join(VIDEO_PRESETS)}")
+        self.preset = preset
+        self.directory = directory
+        self.stats = Counter()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._pending: List[Future] = []
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    @property
+    def size(self) -> Dict[str, int]:
+        width, height = VIDEO_PRESETS[self.preset]
+        return {"width": width, "height": height}
+
+    def context_options(self) -> dict:
+        """browser.new_context(**recorder.context_options()) 使用的录屏参数"""
+        if not self.enabled:
+            return {}
+        os.makedirs(self.directory, exist_ok=True)
+        return {"record_video_dir": self.directory, "record_video_size": self.size}
+
+    def _executor(self) -> ThreadPoolExecutor:
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="video")
+        return self._pool
+
+    def finalize(self, videos: list, failed: bool, test_name: str, started: float) -> None:
+        """
+        上下文关闭后调用（此时录屏文件已写完）
+        :param videos: 关闭前从各页面取到的 page.video 对象
+        :param started: 上下文创建时的 time.monotonic()，用于统计录制时长
+        """
+        self.stats["tests"] += 1
+        if not self.enabled:
+            return
+
+        seconds = (time.monotonic() - started) * len(videos)
+        width, height = VIDEO_PRESETS[self.preset]
+        base_width, base_height = VIDEO_PRESETS[_BASELINE_PRESET]
+        self.stats["recorded"] += len(videos)
+        self.stats["recorded_ms"] += int(seconds * 1000)
+        self.stats["pixel_seconds"] += int(seconds * width * height)
+        self.stats["baseline_pixel_seconds"] += int(seconds * base_width * base_height)
+
+        keep = failed or self.mode == "always"
+        for index, video in enumerate(videos):
+            try:
+                path = video.path()
+            except Exception as e:
+                logger.warning(f"⚠️ 获取录屏文件失败: {e}")
+                continue
+            if keep:
+                stem = re.sub(r"[^\w\-]+", "_", test_name) + (f"_{index}" if len(videos) > 1 else "")
+                target = os.path.join(self.directory, f"{stem}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.webm")
+                # 失败录屏挂到 Allure（在测试线程登记，后台线程读文件写附件）
+                file_name = reserve_attachment(f"录屏 {test_name}", allure.attachment_type.WEBM) if failed else None
+                self._submit(self._keep, path, target, file_name)
+            else:
+                self._submit(self._delete, path)
+
+    def _submit(self, fn, *args) -> None:
+        future = self._executor().submit(fn, *args)
+        with self._lock:
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(future)
+
+    def _keep(self, path: str, target: str, file_name: Optional[str]) -> None:
+        try:
+            os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+            shutil.move(path, target)
+            size = os.path.getsize(target)
+            if file_name:
+                with open(target, "rb") as f:
+                    write_attachment(file_name, f.read())
+            logger.info(f"🎬 录屏已保留: {target}")
+        except OSError as e:
+            logger.warning(f"⚠️ 录屏保存失败 {path}: {e}")
+            return
+        with self._lock:
+            self.stats["kept"] += 1
+            self.stats["kept_bytes"] += size
+
+    def _delete(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError as e:
+            logger.warning(f"⚠️ 录屏删除失败 {path}: {e}")
+            return
+        with self._lock:
+            self.stats["deleted"] += 1
+            self.stats["deleted_bytes"] += size
+
+    def flush(self) -> None:
+        """等待后台删除/保存完成并上报统计"""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for future in pending:
+            future.result()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+        if self.stats:
+            reporting.publish(SECTION, {"mode": self.mode, "preset": self.preset, **self.stats})
+            self.stats.clear()
+
+
+# 进程内共享的录屏管理
+_recorder: Optional[VideoRecorder] = None
+
+
+def video_recorder() -> VideoRecorder:
+    global _recorder
+    if _recorder is None:
+        _recorder = VideoRecorder()
+    return _recorder
+
+
+def flush_videos() -> None:
+    if _recorder is not None:
+        _recorder.flush()
+
+
+def render_summary(data: dict) -> List[str]:
+    tests = data.get("tests", 0)
+    if not tests:
+        return []
+    mode, preset = data.get("mode"), data.get("preset")
+    if mode == "off":
+        return [f"mode: off, {tests} tests ran without recording (no encoder CPU, no disk)"]
+
+    recorded = data.get("recorded", 0)
+    kept_bytes = data.get("kept_bytes", 0)
+    deleted_bytes = data.get("deleted_bytes", 0)
+    baseline = data.get("baseline_pixel_seconds", 0)
+    area_ratio = data.get("pixel_seconds", 0) / baseline if baseline else 1.0
+    width, height = VIDEO_PRESETS.get(preset, VIDEO_PRESETS[_BASELINE_PRESET])
+    return [
+        f"mode: {mode}, preset: {preset} ({width}x{height}), recorded: {recorded} videos, "
+        f"{data.get('recorded_ms', 0) / 1000:.1f}s",
+        f"kept: {data.get('kept', 0)} ({kept_bytes / 1024 / 1024:.2f} MiB), "
+        f"deleted after passing: {data.get('deleted', 0)} ({deleted_bytes / 1024 / 1024:.2f} MiB disk saved)",
+        f"encoded pixel-seconds vs full-size baseline: {area_ratio:.0%} "
+        f"(~{1 - area_ratio:.0%} less encoder CPU)",
+    ]
+
+
+reporting.register_summary(SECTION, "video retention summary", render_summary)
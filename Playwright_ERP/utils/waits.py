@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 基于接口响应的等待（替代 wait_for_load_state("networkidle")）
+
+import logging
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from playwright.sync_api import Page, Response
+
+from Playwright_ERP.utils.settings import API_PREFIX, RESOURCES
+
+logger = logging.getLogger(__name__)
+
+# 默认等待超时（毫秒）
+DEFAULT_TIMEOUT = 15000
+
+# 表格加载中的遮罩（ant-design Table 的 loading 状态）
+TABLE_SPINNING = ".ant-table-wrapper .ant-spin-spinning"
+TABLE_BODY = ".ant-table-tbody"
+
+# 表格“静止”判定窗口（毫秒）：tbody 与 loading 遮罩在该时间内无任何 DOM 变化即视为渲染完成
+TABLE_QUIET_MS = int(os.getenv("ERP_TABLE_QUIET_MS", "150"))
+
+# 页面内的表格静止检测：首次调用时在 document 上挂一个 MutationObserver，
+# 只记录表格区域（.ant-table-wrapper / .ant-spin-nested-loading）内最后一次变化的时间；
+# 之后每帧判断：没有 loading 遮罩、tbody 存在、且距最后一次变化已超过静止窗口
+_TABLE_SETTLED_JS = """
+({ quiet, spinning, body }) => {
+    let state = window.__erpTableSettle;
+    if (!state) {
+        state = window.__erpTableSettle = { last: performance.now() };
+        new MutationObserver((mutations) => {
+            for (const m of mutations) {
+                const el = m.target.nodeType === 1 ? m.target : m.target.parentElement;
+                if (el && el.closest('.ant-table-wrapper, .ant-spin-nested-loading')) {
+                    state.last = performance.now();
+                    return;
+                }
+            }
+        }).observe(document.body, {
+            subtree: true, childList: true, characterData: true,
+            attributes: true, attributeFilter: ['class', 'style'],
+        });
+    }
+    if (document.querySelector(spinning) || !document.querySelector(body)) {
+        return false;
+    }
+    return performance.now() - state.last >= quiet;
+}
+"""
+
+
+@dataclass(frozen=True)
+class ApiCall:
+    """一个业务动作触发的后端接口：HTTP 方法 + 路径正则 + 可选的查询参数条件（参数名 -> 值列表，空值不计入）"""
+    methods: Tuple[str, ...]
+    path: "re.Pattern"
+    query: Optional[Callable[[Dict[str, List[str]]], bool]] = None
+
+    def matches(self, response: Response) -> bool:
+        parsed = urlparse(response.url)
+        return self.matches_request(response.request.method, parsed.path, parsed.query)
+
+    def matches_request(self, method: str, path: str, query: str = "") -> bool:
+        if method not in self.methods or not self.path.search(path):
+            return False
+        return self.query is None or self.query(parse_qs(query))
+
+
+def _has_search(params: Dict[str, List[str]]) -> bool:
+    return "search" in params
+
+
+def _build_endpoints() -> Dict[str, ApiCall]:
+    prefix = re.escape(API_PREFIX)
+    endpoints = {
+        "auth.login": ApiCall(("POST",), re.compile(prefix + r"user/get_token/?$")),
+    }
+    for module, resource in RESOURCES.items():
+        collection = re.compile(prefix + re.escape(resource) + r"/?$")
+        detail = re.compile(prefix + re.escape(resource) + r"/[^/]+/?$")
+        # 搜索与列表是同一个接口，按是否带非空的 search 参数区分
+        endpoints[f"{module}.list"] = ApiCall(("GET",), collection, lambda params: not _has_search(params))
+        endpoints[f"{module}.search"] = ApiCall(("GET",), collection, _has_search)
+        endpoints[f"{module}.create"] = ApiCall(("POST",), collection)
+        endpoints[f"{module}.update"] = ApiCall(("PUT", "PATCH"), detail)
+        endpoints[f"{module}.delete"] = ApiCall(("DELETE",), detail)
+    return endpoints
+
+
+# 动作名 -> 接口，例如 "role.list"、"goods_category.create"
+ENDPOINTS: Dict[str, ApiCall] = _build_endpoints()
+
+
+def register_endpoint(action: str, methods: Tuple[str, ...], path_regex: str,
+                      query: Callable[[Dict[str, List[str]]], bool] = None) -> None:
+    """注册/覆盖一个动作对应的接口（接口路径与默认约定不一致时使用），query 为可选的查询参数条件"""
+    ENDPOINTS[action] = ApiCall(tuple(m.upper() for m in methods), re.compile(path_regex), query)
+
+
+def wait_for_table_settled(page: Page, quiet_ms: int = None, timeout: float = DEFAULT_TIMEOUT) -> None:
+    """
+    等待 ant-design 表格渲染稳定（替代 wait_for_timeout 固定等待）：
+    - loading 遮罩已消失，且 tbody 在 quiet_ms 内没有任何 DOM 变化
+    - 检测逻辑全部在页面内按帧执行，只有一次协议往返；表格多快稳定就多快返回
+    - 在搜索/删除等动作之后调用时，建议先用 wait_for_api 等到接口返回，避免在请求发出前就判定为“静止”
+    """
+    quiet = TABLE_QUIET_MS if quiet_ms is None else quiet_ms
+    page.wait_for_function(_TABLE_SETTLED_JS, arg={"quiet": quiet, "spinning": TABLE_SPINNING, "body": TABLE_BODY},
+                           timeout=timeout)
+
+
+@contextmanager
+def wait_for_api(page: Page, action: str, timeout: float = DEFAULT_TIMEOUT, table: bool = True):
+    """
+    等待某个业务动作触发的接口返回（在 with 块内执行触发动作）：
+
+        with wait_for_api(page, "role.list"):
+            page.goto(url("/role"))
+
+    - 接口一返回立即结束等待，不再像 networkidle 那样额外等 500ms 的网络空闲，也不受轮询/websocket 干扰
+    - table=True 时再等表格渲染稳定（见 wait_for_table_settled），保证后续断言读到的是新数据
+    - 接口返回非 2xx 时直接断言失败，错误信息中带上状态码与地址
+    """
+    if action not in ENDPOINTS:
+        raise KeyError(f"未注册的接口动作: '{action}'，可选: {', '.join(sorted(ENDPOINTS))}")
+    endpoint = ENDPOINTS[action]
+
+    with page.expect_response(endpoint.matches, timeout=timeout) as response_info:
+        yield response_info
+    response = response_info.value
+    assert response.ok, f"接口 {action} 返回异常: {response.status} {response.request.method} {response.url}"
+
+    if table:
+        wait_for_table_settled(page, timeout=timeout)
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# @Author: 熊🐻来个🥬
+# @Date:  2026/10/18
+# @Description: 页面性能采集与预算：每次整页导航后采集导航耗时、LCP、CLS、长任务与 JS 堆大小，按路由对比预算
+
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+import allure
+from playwright.sync_api import BrowserContext, Page
+
+from Playwright_ERP.utils import reporting
+from Playwright_ERP.utils.log_setup import current_test
+from Playwright_ERP.utils.parallel import worker_id
+from Playwright_ERP.utils.profiles import active_profile
+from Playwright_ERP.utils.screenshots import open_pages
+from Playwright_ERP.utils.settings import VITALS_BUDGETS_FILE, VITALS_DIR, VITALS_MODE
+
+logger = logging.getLogger(__name__)
+
+SECTION = "web_vitals"
+
+# 预算处理方式：off 不采集；warn 超预算只记录告警；fail 超预算的用例判为失败
+VITALS_MODES = ("off", "warn", "fail")
+
+# 指标 -> 终端汇总中的显示格式
+METRICS = {
+    "ttfb_ms": "{:.0f}",
+    "dom_content_loaded_ms": "{:.0f}",
+    "load_ms": "{:.0f}",
+    "lcp_ms": "{:.0f}",
+    "cls": "{:.3f}",
+    "long_task_ms": "{:.0f}",
+    "heap_mb": "{:.1f}",
+}
+
+# 默认预算（所有路由），ROUTE_BUDGETS 中按路由覆盖；可通过 ERP_VITALS_BUDGETS 指定的 JSON 文件再覆盖：
+# {"*": {"lcp_ms": 3000}, "/role": {"long_task_ms": 200}}
+DEFAULT_BUDGET: Dict[str, float] = {
+    "load_ms": 3000,
+    "lcp_ms": 2500,
+    "cls": 0.1,
+    "long_task_ms": 300,
+    "heap_mb": 150,
+}
+ROUTE_BUDGETS: Dict[str, Dict[str, float]] = {
+    "/home": {},
+    "/role": {},
+    "/account": {},
+    "/goods/classification": {},
+    "/basicData/warehouse": {},
+}
+
+# 页面离开当前文档（pagehide）时上报指标用的绑定名，由 install() 通过 context.expose_binding 注册
+_REPORT_BINDING = "__erpReportVitals"
+
+# 注入到每个文档的采集脚本：PerformanceObserver 持续累计 LCP / CLS / 长任务；
+# path 在文档创建时记录，SPA 之后 pushState 切换路由也仍按加载该文档的路由计入预算；
+# 每个文档只上报一次：离开文档（reload、点击链接、goto 等任何整页导航）时由 pagehide 推送，或由 collect() 主动读取
+_INIT_SCRIPT = """
+(() => {
+    if (window !== window.top || window.__erpVitals) return;
+    const state = window.__erpVitals = { path: location.pathname, lcp: 0, cls: 0, longTasks: 0, longTaskMs: 0,
+                                         reported: false, observers: [] };
+    const handlers = {
+        'largest-contentful-paint': (e) => { state.lcp = e.startTime; },
+        'layout-shift': (e) => { if (!e.hadRecentInput) state.cls += e.value; },
+        'longtask': (e) => { state.longTasks += 1; state.longTaskMs += e.duration; },
+    };
+    for (const [type, handle] of Object.entries(handlers)) {
+        try {
+            const observer = new PerformanceObserver((list) => list.getEntries().forEach(handle));
+            observer.observe({ type, buffered: true });
+            state.observers.push([observer, handle]);
+        } catch (e) {}
+    }
+    // 读取本文档的指标（先 takeRecords() 取出尚未回调的条目），已上报过返回 null
+    state.collect = () => {
+        if (state.reported) return null;
+        state.reported = true;
+        for (const [observer, handle] of state.observers) observer.takeRecords().forEach(handle);
+        const nav = performance.getEntriesByType('navigation')[0] || {};
+        return {
+            path: state.path,
+            ttfb_ms: nav.responseStart || 0,
+            dom_content_loaded_ms: nav.domContentLoadedEventEnd || 0,
+            load_ms: nav.loadEventEnd || 0,
+            lcp_ms: state.lcp,
+            cls: state.cls,
+            long_tasks: state.longTasks,
+            long_task_ms: state.longTaskMs,
+            heap_mb: performance.memory ? performance.memory.usedJSHeapSize / 1048576 : null,
+        };
+    };
+    addEventListener('pagehide', () => {
+        const report = window.""" + _REPORT_BINDING + """;
+        const metrics = state.collect();
+        if (metrics && report) report(metrics);
+    });
+})();
+"""
+
+# 主动读取当前文档的指标（用例结束时）
+_COLLECT_JS = "() => window.__erpVitals ? window.__erpVitals.collect() : null"
+
+
+def load_budgets(path: str = VITALS_BUDGETS_FILE) -> Dict[str, Dict[str, float]]:
+    """路由 -> 预算（默认预算 + 路由覆盖 + JSON 文件覆盖），"*" 为未列出路由使用的预算"""
+    overrides: Dict[str, dict] = {}
+    if path:
+        with open(path, encoding="utf-8") as f:
+            overrides = json.load(f)
+    default = {**DEFAULT_BUDGET, **overrides.get("*", {})}
+    budgets = {"*": default}
+    for route in set(ROUTE_BUDGETS) | (set(overrides) - {"*"}):
+        budgets[route.rstrip("/") or "/"] = {**default, **ROUTE_BUDGETS.get(route, {}), **overrides.get(route, {})}
+    return budgets
+
+
+class WebVitalsMonitor:
+    """
+    页面性能采集（每个进程一个实例）：
+    - install()：给已登录上下文注入采集脚本，并注册 pagehide 上报绑定（任何整页导航离开旧文档时推送其指标）
+    - collect()：读取页面当前文档的指标并对比预算；用例 call 阶段结束时自动调用
+    - 超预算记录到当前用例，fail 模式下由 conftest 在用例 teardown 时判为失败
+    """
+
+    def __init__(self, mode: Optional[str] = None, budgets: Optional[Dict[str, Dict[str, float]]] = None):
+        self.mode = mode or VITALS_MODE or active_profile().vitals
+        if self.mode not in VITALS_MODES:
+            raise ValueError(f"不支持的页面性能预算模式: {self.mode}，可选: {', '.join(VITALS_MODES)}")
+        self.budgets = budgets if budgets is not None else load_budgets()
+        self.records: List[dict] = []
+        self.violations: List[str] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode != "off"
+
+    def install(self, context: BrowserContext) -> None:
+        if self.enabled:
+            context.expose_binding(_REPORT_BINDING, lambda source, metrics: self.record(metrics))
+            context.add_init_script(script=_INIT_SCRIPT)
+
+    def budget_for(self, path: str) -> Dict[str, float]:
+        return self.budgets.get(path.rstrip("/") or "/", self.budgets["*"])
+
+    def collect(self, page: Page) -> Optional[dict]:
+        if not self.enabled or page.is_closed():
+            return None
+        try:
+            metrics = page.evaluate(_COLLECT_JS)
+        except Exception as e:
+            logger.debug(f"页面性能指标读取失败: {e}")
+            return None
+        return self.record(metrics)
+
+    def record(self, metrics: Optional[dict]) -> Optional[dict]:
+        """记录一个文档的指标并对比预算（collect() 读取的，或 pagehide 时页面推送的）"""
+        if not metrics:
+            return None
+        metrics = dict(metrics)
+        route = metrics.pop("path").rstrip("/") or "/"
+        budget = self.budget_for(route)
+        over = {name: (metrics[name], limit) for name, limit in budget.items()
+                if metrics.get(name) is not None and metrics[name] > limit}
+        record = {"test": current_test(), "worker": worker_id(), "route": route,
+                  **{name: round(value, 3) for name, value in metrics.items() if value is not None},
+                  "over_budget": sorted(over)}
+        self.records.append(record)
+
+        if over:
+            detail = ", ".join(f"{name}={value:g} > {limit:g}" for name, (value, limit) in over.items())
+            message = f"{route} 超出性能预算: {detail}"
+            self.violations.append(message)
+            logger.warning(f"🐢 {message}")
+            allure.attach(json.dumps(record, ensure_ascii=False, indent=2), name=f"页面性能超预算 {route}",
+                          attachment_type=allure.attachment_type.JSON)
+        return record
+
+    def collect_test(self, item) -> None:
+        """用例 call 阶段结束：采集用例用到的各页面当前文档的指标"""
+        for page in open_pages(item):
+            self.collect(page)
+
+    def pop_violations(self) -> List[str]:
+        violations, self.violations = self.violations, []
+        return violations
+
+    def flush(self) -> None:
+        """写出本进程的采集明细，并按路由上报指标样本"""
+        if not self.records:
+            return
+        records, self.records = self.records, []
+        os.makedirs(VITALS_DIR, exist_ok=True)
+        path = os.path.join(VITALS_DIR, f"{worker_id()}.jsonl")
+        with open(path, "w", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        logger.info(f"📈 页面性能明细已写入: {path}")
+
+        routes: Dict[str, dict] = defaultdict(lambda: {"loads": 0, "over_budget": 0, "samples": defaultdict(list)})
+        for record in records:
+            data = routes[record["route"]]
+            data["loads"] += 1
+            data["over_budget"] += bool(record["over_budget"])
+            for name in METRICS:
+                if record.get(name) is not None:
+                    data["samples"][name].append(record[name])
+        reporting.publish(SECTION, {"mode": self.mode, "routes": {route: {**data, "samples": dict(data["samples"])}
+                                                                  for route, data in routes.items()}})
+
+
+# 进程内共享的页面性能采集
+_monitor: Optional[WebVitalsMonitor] = None
+
+
+def web_vitals_monitor() -> WebVitalsMonitor:
+    global _monitor
+    if _monitor is None:
+        _monitor = WebVitalsMonitor()
+    return _monitor
+
+
+def flush_web_vitals() -> None:
+    if _monitor is not None:
+        _monitor.flush()
+
+
+def render_summary(data: dict) -> List[str]:
+    routes = data.get("routes", {})
+    if not routes:
+        return []
+    lines = [f"mode: {data.get('mode')}, values are p50 / p95 per route"]
+    for route in sorted(routes):
+        stats = routes[route]
+        parts = []
+        for name, fmt in METRICS.items():
+            samples = stats.get("samples", {}).get(name)
+            if samples:
+                parts.append(f"{name} {fmt.format(reporting.percentile(samples, 50))}/{fmt.format(reporting.percentile(samples, 95))}")
+        over = stats.get("over_budget", 0)
+        lines.append(f"{route} ({stats.get('loads', 0)} loads{f', {over} over budget' if over else ''}): "
+                     + ", ".join(parts))
+    return lines
+
+
+reporting.register_summary(SECTION, "web vitals per route", render_summary)